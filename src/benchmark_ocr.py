@@ -0,0 +1,165 @@
+"""
+Benchmark de Inferência - EasyOCR na CPU
+Descrição: Compara os modelos float32 originais com a quantização dinâmica
+          int8 (detector e reconhecedor) e diferentes números de threads do
+          PyTorch. Reporta tempo por página e a diferença de precisão em
+          relação ao float32 (similaridade de caracteres e campos extraídos).
+
+Uso:
+    python src/benchmark_ocr.py certificado1.pdf certificado2.pdf --threads 1,2,4
+"""
+
+import sys
+import time
+import argparse
+import difflib
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+from pdf2image import convert_from_path
+
+from extractors import CertificateDataExtractor
+from main import OCRExtractor, configure_torch_threads
+
+
+FIELDS = ['nome', 'curso', 'duracao', 'data']
+
+
+def render_documents(paths: List[str], dpi: int) -> List[List[np.ndarray]]:
+    """
+    Renderiza todos os PDFs uma única vez (fora da medição).
+
+    Args:
+        paths: Caminhos dos PDFs
+        dpi: Resolução da conversão
+
+    Returns:
+        Lista de documentos, cada um com suas páginas
+    """
+    return [[np.array(page) for page in convert_from_path(path, dpi=dpi)] for path in paths]
+
+
+def run_config(extractor: OCRExtractor, documents: List[List[np.ndarray]],
+               repeats: int) -> Dict:
+    """
+    Mede o reconhecimento de todas as páginas com um extrator.
+
+    Args:
+        extractor: Extrator já inicializado
+        documents: Páginas renderizadas por documento
+        repeats: Número de repetições da medição
+
+    Returns:
+        Dicionário com segundos por página e textos por documento
+    """
+    pages = [page for doc in documents for page in doc]
+
+    # Aquecimento (alocação de buffers, caches de kernels)
+    extractor.extract_from_image(pages[0], preprocess=False)
+
+    texts: List[str] = []
+    start = time.perf_counter()
+    for repeat in range(repeats):
+        for doc in documents:
+            doc_text = '\n\n'.join(extractor.extract_from_image(page, preprocess=False) for page in doc)
+            if repeat == 0:
+                texts.append(doc_text)
+    elapsed = time.perf_counter() - start
+
+    return {'s_por_pagina': elapsed / (len(pages) * repeats), 'textos': texts}
+
+
+def accuracy_delta(reference: List[str], candidate: List[str]) -> Dict:
+    """
+    Compara textos e campos extraídos com a referência float32.
+
+    Args:
+        reference: Textos por documento com float32
+        candidate: Textos por documento com a configuração avaliada
+
+    Returns:
+        Similaridade média de caracteres e concordância de campos (0-1)
+    """
+    data_extractor = CertificateDataExtractor()
+
+    similarities = []
+    matches = 0
+    for ref_text, cand_text in zip(reference, candidate):
+        similarities.append(difflib.SequenceMatcher(None, ref_text, cand_text).ratio())
+        ref_data = data_extractor.extract_all(ref_text)
+        cand_data = data_extractor.extract_all(cand_text)
+        matches += sum(1 for field in FIELDS if ref_data.get(field) == cand_data.get(field))
+
+    return {
+        'similaridade': sum(similarities) / len(similarities) if similarities else 1.0,
+        'campos': matches / (len(reference) * len(FIELDS)) if reference else 1.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Executa o benchmark e imprime a tabela comparativa.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark float32 x int8 do EasyOCR na CPU")
+    parser.add_argument('pdfs', nargs='+', help='PDFs de amostra')
+    parser.add_argument('--threads', default='', help='Lista de threads a testar (ex: 1,2,4)')
+    parser.add_argument('--repeticoes', type=int, default=1, help='Repetições por configuração')
+    parser.add_argument('--dpi', type=int, default=400, help='Resolução da renderização')
+    args = parser.parse_args(argv)
+
+    # Silencia o log detalhado da extração durante a medição
+    logging.basicConfig(level=logging.WARNING)
+
+    thread_counts = [int(t) for t in args.threads.split(',') if t.strip()] or [configure_torch_threads()]
+
+    print(f"📄 Renderizando {len(args.pdfs)} PDF(s) a {args.dpi} DPI...")
+    documents = render_documents(args.pdfs, args.dpi)
+    total_pages = sum(len(doc) for doc in documents)
+    print(f"   {total_pages} página(s)\n")
+
+    rows = []
+    reference: Optional[List[str]] = None
+
+    for quantize in (False, True):
+        label = 'int8' if quantize else 'float32'
+
+        load_start = time.perf_counter()
+        extractor = OCRExtractor(languages=['pt', 'en'], quantize=quantize)
+        load_time = time.perf_counter() - load_start
+
+        for threads in thread_counts:
+            configure_torch_threads(threads)
+            result = run_config(extractor, documents, args.repeticoes)
+
+            if reference is None:
+                reference = result['textos']
+            delta = accuracy_delta(reference, result['textos'])
+
+            rows.append({
+                'modelo': label,
+                'threads': threads,
+                'carga_s': load_time,
+                's_por_pagina': result['s_por_pagina'],
+                **delta,
+            })
+
+        del extractor
+
+    base = rows[0]['s_por_pagina']
+    print("=" * 84)
+    print(f"{'Modelo':<8} {'Threads':>7} {'Carga (s)':>10} {'s/página':>9} {'Ganho':>7} "
+          f"{'Similaridade':>13} {'Campos iguais':>14}")
+    print("-" * 84)
+    for row in rows:
+        print(f"{row['modelo']:<8} {row['threads']:>7} {row['carga_s']:>10.2f} "
+              f"{row['s_por_pagina']:>9.2f} {base / row['s_por_pagina']:>6.2f}x "
+              f"{row['similaridade'] * 100:>12.2f}% {row['campos'] * 100:>13.1f}%")
+    print("=" * 84)
+    print("Referência de precisão: float32 com a primeira contagem de threads.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+"""
+Modo Monitor - Gerenciador de Certificados
+Descrição: Observação da pasta de entrada (inotify ou varredura) e processo
+          contínuo que entrega os PDFs novos a um CertificateProcessor.
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import ctypes
+import ctypes.util
+import select
+import signal
+import struct
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+# ==============================================================================
+# CLASSE: FolderWatcher
+# ==============================================================================
+
+class FolderWatcher:
+    """
+    Observa uma pasta e entrega PDFs novos apenas quando terminaram de chegar.
+
+    No Linux usa inotify (sem custo enquanto a pasta está parada); nos demais
+    sistemas, ou se inotify não estiver disponível, faz varredura periódica.
+    Em ambos os casos um arquivo só é liberado depois que tamanho e data de
+    modificação ficam estáveis por `settle_seconds` (debounce de cópias
+    parciais vindas de compartilhamentos de rede).
+    """
+
+    # Máscaras do inotify (sys/inotify.h)
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, folder: str, settle_seconds: float = 3.0,
+                 poll_interval: float = 2.0, force_polling: bool = False):
+        """
+        Inicializa o observador.
+
+        Args:
+            folder: Pasta observada
+            settle_seconds: Tempo sem alterações para considerar o arquivo completo
+            poll_interval: Intervalo da varredura (modo polling) e dos testes de estabilidade
+            force_polling: Ignora inotify mesmo quando disponível
+        """
+        self.folder = folder
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+
+        # Arquivos aguardando estabilizar: nome -> (tamanho, mtime, visto_em, estável_desde)
+        self._pending: Dict[str, Tuple[int, float, float, float]] = {}
+        # Estado da última varredura (modo polling): nome -> (tamanho, mtime)
+        self._snapshot: Dict[str, Tuple[int, float]] = {}
+
+        self._inotify_fd = None if force_polling else self._init_inotify()
+        self.backend = 'inotify' if self._inotify_fd is not None else 'polling'
+
+        if self.backend == 'polling':
+            # Estado inicial: arquivos já existentes não são "novos"
+            self._snapshot = self._scan()
+
+    def _init_inotify(self) -> Optional[int]:
+        """Cria o descritor inotify via libc; retorna None se indisponível."""
+        if not sys.platform.startswith('linux'):
+            return None
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return None
+
+            mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE | self.IN_MODIFY
+            wd = libc.inotify_add_watch(fd, os.fsencode(self.folder), mask)
+            if wd < 0:
+                os.close(fd)
+                return None
+
+            return fd
+        except (OSError, AttributeError) as e:
+            self.logger.debug(f"inotify indisponível: {e}")
+            return None
+
+    def _scan(self) -> Dict[str, Tuple[int, float]]:
+        """Lista os PDFs da pasta com tamanho e mtime (uma chamada scandir)."""
+        entries = {}
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if entry.name.lower().endswith('.pdf') and entry.is_file():
+                    stat = entry.stat()
+                    entries[entry.name] = (stat.st_size, stat.st_mtime)
+        return entries
+
+    def add_existing(self):
+        """Agenda os PDFs que já estavam na pasta antes do início."""
+        for name in self._scan():
+            self._touch(name)
+
+    def _touch(self, name: str):
+        """Registra atividade em um arquivo (reinicia a contagem de estabilidade)."""
+        now = time.time()
+        seen_at = self._pending[name][2] if name in self._pending else now
+        self._pending[name] = (-1, 0.0, seen_at, now)
+
+    def _read_inotify(self, timeout: float):
+        """Lê eventos do inotify (bloqueia até `timeout` segundos)."""
+        readable, _, _ = select.select([self._inotify_fd], [], [], timeout)
+        if not readable:
+            return
+
+        try:
+            buffer = os.read(self._inotify_fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(buffer):
+            _, mask, _, length = self.EVENT_HEADER.unpack_from(buffer, offset)
+            offset += self.EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # Fila do kernel estourou: recupera o estado varrendo a pasta
+                self.add_existing()
+            elif name.lower().endswith('.pdf'):
+                self._touch(name)
+
+    def _poll_changes(self, timeout: float):
+        """Compara a varredura atual com a anterior (modo polling)."""
+        time.sleep(timeout)
+        current = self._scan()
+        for name, state in current.items():
+            if self._snapshot.get(name) != state:
+                self._touch(name)
+        self._snapshot = current
+
+    def wait_ready(self, timeout: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        Aguarda eventos e devolve arquivos prontos para processamento.
+
+        Args:
+            timeout: Tempo máximo de espera (padrão: poll_interval)
+
+        Returns:
+            Lista de (caminho, instante em que o arquivo foi visto pela primeira vez)
+        """
+        timeout = self.poll_interval if timeout is None else timeout
+        if self._pending:
+            # Há arquivos estabilizando: acorda a tempo de liberá-los
+            timeout = min(timeout, self.poll_interval)
+
+        if self._inotify_fd is not None:
+            self._read_inotify(timeout)
+        else:
+            self._poll_changes(timeout)
+
+        ready = []
+        now = time.time()
+        for name, (size, mtime, seen_at, stable_since) in list(self._pending.items()):
+            path = os.path.join(self.folder, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                del self._pending[name]  # Removido/renomeado antes de estabilizar
+                continue
+
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                # Ainda mudando: guarda o novo estado e reinicia a contagem
+                self._pending[name] = (stat.st_size, stat.st_mtime, seen_at, now)
+            elif stat.st_size > 0 and now - stable_since >= self.settle_seconds:
+                del self._pending[name]
+                ready.append((path, seen_at))
+
+        return ready
+
+    def close(self):
+        """Libera o descritor inotify."""
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+
+
+# ==============================================================================
+# CLASSE: CertificateDaemon
+# ==============================================================================
+
+class CertificateDaemon:
+    """
+    Modo monitor: processo de longa duração que mantém o EasyOCR carregado e
+    processa cada PDF que chega à pasta em poucos segundos.
+
+    A carga do modelo (vários segundos) é paga uma única vez por dia em vez de
+    a cada execução. Uma thread observa a pasta e outra consome a fila; o
+    estado (fila, latências, totais) é registrado periodicamente no log e em
+    `monitor_status.json`.
+    """
+
+    def __init__(self, folder: str, processor: 'CertificateProcessor',
+                 settle_seconds: float = 3.0, poll_interval: float = 2.0,
+                 force_polling: bool = False, include_existing: bool = False,
+                 stats_interval: float = 60.0):
+        """
+        Inicializa o monitor.
+
+        Args:
+            folder: Pasta observada
+            processor: Processador já inicializado (leitor EasyOCR carregado)
+            settle_seconds: Tempo sem alterações para considerar o arquivo completo
+            poll_interval: Intervalo de varredura/estabilidade
+            force_polling: Não usa inotify
+            include_existing: Processa também os PDFs já presentes na pasta
+            stats_interval: Intervalo (segundos) entre registros de estatísticas
+        """
+        self.folder = folder
+        self.processor = processor
+        self.stats_interval = stats_interval
+        self.logger = logging.getLogger(__name__)
+
+        self.watcher = FolderWatcher(folder, settle_seconds=settle_seconds,
+                                     poll_interval=poll_interval, force_polling=force_polling)
+        if include_existing:
+            self.watcher.add_existing()
+
+        self.queue: 'queue.Queue[Tuple[str, float]]' = queue.Queue()
+        self.stop_event = threading.Event()
+
+        # Arquivos gerados pelo próprio monitor (renomeios) não devem ser reprocessados
+        self._own_outputs: set = set()
+        self._lock = threading.Lock()
+
+        # Estatísticas
+        self.started_at = time.time()
+        self.processed = 0
+        self.failed = 0
+        self.latencies: deque = deque(maxlen=1000)   # chegada -> resultado gravado
+        self.durations: deque = deque(maxlen=1000)   # tempo de processamento
+
+        self.status_file = os.path.join(folder, 'monitor_status.json')
+
+    def stats(self) -> Dict:
+        """
+        Retorna um retrato do estado do monitor.
+
+        Returns:
+            Dicionário com profundidade da fila, totais e latências (s)
+        """
+        def percentile(values, pct):
+            if not values:
+                return None
+            ordered = sorted(values)
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 2)
+
+        with self._lock:
+            latencies = list(self.latencies)
+            durations = list(self.durations)
+            processed, failed = self.processed, self.failed
+
+        return {
+            'backend': self.watcher.backend,
+            'fila': self.queue.qsize(),
+            'aguardando_estabilizar': len(self.watcher._pending),
+            'processados': processed,
+            'falhas': failed,
+            'latencia_media_s': round(sum(latencies) / len(latencies), 2) if latencies else None,
+            'latencia_p95_s': percentile(latencies, 0.95),
+            'processamento_medio_s': round(sum(durations) / len(durations), 2) if durations else None,
+            'ativo_desde': datetime.fromtimestamp(self.started_at).isoformat(),
+            'atualizado_em': datetime.now().isoformat(),
+        }
+
+    def _write_status(self):
+        """Grava o estado em JSON (substituição atômica) e no log."""
+        snapshot = self.stats()
+        tmp_path = self.status_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.status_file)
+
+        self.logger.info(
+            f"📈 Monitor: fila={snapshot['fila']} processados={snapshot['processados']} "
+            f"falhas={snapshot['falhas']} latência média={snapshot['latencia_media_s']}s "
+            f"p95={snapshot['latencia_p95_s']}s"
+        )
+
+    def _worker(self):
+        """
+        Consome a fila processando um PDF por vez com o leitor já carregado.
+
+        Ao encerrar, termina só o arquivo em andamento; os demais continuam na
+        pasta com o nome original e entram na próxima execução.
+        """
+        while not self.stop_event.is_set():
+            try:
+                path, seen_at = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            start_time = time.time()
+            try:
+                ok = self.processor.process_single_pdf(path)
+                self.processor.flush_outputs()
+            except Exception as e:
+                self.logger.error(f"❌ Erro no monitor ao processar {path}: {e}", exc_info=True)
+                ok = False
+
+            finished_at = time.time()
+            with self._lock:
+                if ok:
+                    self.processed += 1
+                else:
+                    self.failed += 1
+                # Mesmo com falha posterior, um arquivo já renomeado não volta à fila
+                if self.processor.last_output:
+                    self._own_outputs.add(self.processor.last_output)
+                self.latencies.append(finished_at - seen_at)
+                self.durations.append(finished_at - start_time)
+
+            self.queue.task_done()
+
+    def _handle_signal(self, signum, frame):
+        """Encerra o monitor de forma ordenada (SIGINT/SIGTERM)."""
+        self.logger.info("🛑 Encerrando monitor (aguardando arquivo em andamento)...")
+        self.stop_event.set()
+
+    def run(self):
+        """
+        Executa o monitor até receber SIGINT/SIGTERM.
+        """
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                signal.signal(signum, self._handle_signal)
+            except ValueError:
+                pass  # Fora da thread principal
+
+        self.logger.info(f"👀 Monitorando {self.folder} (backend: {self.watcher.backend})")
+
+        worker = threading.Thread(target=self._worker, name='monitor-worker', daemon=True)
+        worker.start()
+
+        last_status = time.time()
+        try:
+            while not self.stop_event.is_set():
+                for path, seen_at in self.watcher.wait_ready(timeout=1.0):
+                    name = os.path.basename(path)
+                    with self._lock:
+                        if name in self._own_outputs:
+                            self._own_outputs.discard(name)
+                            continue
+                    self.logger.debug(f"📥 Novo arquivo: {name}")
+                    self.queue.put((path, seen_at))
+
+                if time.time() - last_status >= self.stats_interval:
+                    self._write_status()
+                    last_status = time.time()
+        finally:
+            self.stop_event.set()
+            worker.join()
+            self.watcher.close()
+            remaining = self.queue.qsize()
+            if remaining:
+                self.logger.info(f"⏸️  {remaining} arquivo(s) na fila ficam para a próxima execução "
+                                 f"(--incluir-existentes)")
+            self._write_status()
+            self.processor.save_results()
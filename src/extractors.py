@@ -0,0 +1,567 @@
+"""
+Extratores de Dados - Gerenciador de Certificados
+Descrição: Extratores por emissor (Udemy, Alura, Coursera e genérico) e o
+          classificador que escolhe um deles pelo texto do OCR.
+"""
+
+import os
+import re
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from records import CertificateRecord, TextNormalizer
+
+
+# ==============================================================================
+# CLASSE: IssuerExtractor (extratores por emissor)
+# ==============================================================================
+
+# Extratores especializados registrados, consultados pelo classificador
+ISSUER_EXTRACTORS: List[type] = []
+
+
+def register_issuer(cls: type) -> type:
+    """
+    Registra um extrator de emissor (usado como decorador).
+    
+    Args:
+        cls: Subclasse de IssuerExtractor
+        
+    Returns:
+        A própria classe
+    """
+    ISSUER_EXTRACTORS.append(cls)
+    return cls
+
+
+class IssuerExtractor:
+    """
+    Base dos extratores por emissor, e extrator genérico.
+    
+    Cada emissor declara uma impressão digital barata (palavras-chave e
+    padrões curtos procurados no texto sem acentos e em minúsculas) e os
+    próprios padrões.
+    O classificador escolhe um único extrator por documento, então cada
+    arquivo só executa os padrões do seu emissor. Emissores desconhecidos
+    usam o `GenericExtractor`.
+    """
+    
+    name = 'emissor'
+    keywords: Tuple[str, ...] = ()
+    # Regex de impressão digital, para marcas que não são palavras (ex: IDs)
+    keyword_patterns: Tuple[str, ...] = ()
+    min_keywords = 1
+    # Campos que o extrator genérico completa quando este emissor não os acha
+    # (registrados em 'complemento_generico'; tupla vazia desativa)
+    generic_fallback: Tuple[str, ...] = ('nome', 'curso')
+    
+    NAME_PATTERNS = [
+        # "Certificamos que [NOME] concluiu..."
+        r'(?:certificamos|certifica)\s+que\s+([\w\s]+?)\s+(?:concluiu|participou|completou)',
+        # "Conferido a [NOME]"
+        r'(?:conferido|concedido|outorgado)\s+a\s+([\w\s]+?)\s+(?:por|pela|pelo|que)\b',
+        # "Nome: [NOME]"
+        r'(?:Nome|Aluno|Participante)\s*:\s*([\w\s]+?)(?:\s+(?:Curso|CPF|RG|Data|Carga)\b|[,.])',
+        # "[NAME] has successfully completed"
+        r'([\w\s]+?)\s+has\s+(?:successfully\s+)?completed',
+        # "[NOME] Data [DIA] de"
+        r'([\w\s]+?)\s+Data\s+\d+\s+de',
+    ]
+    
+    COURSE_PATTERNS = [
+        r'[Cc]urso\s+(?:online\s+)?(?:de\s+)?([^\.,]+?)(?:\s+(?:com|Instrutor|Instrutores|Número|Carga|realizado|no\s+per[íi]odo|ministrado)\b|[\.,])',
+        r'(?:completed|concluiu)\s+(?:the\s+course\s+|o\s+curso\s+)?([^\.,]+?)(?:\s+(?:com|with|an\s+online|offered)\b|[\.,])',
+    ]
+    
+    DURATION_PATTERNS = [
+        r'(\d+)\s*(?:horas?|h)\s+(?:no\s+)?total',
+        r'[Cc]arga\s+hor[áa]ria\s*(?:de\s+)?(\d+)\s*h?',
+        r'[Dd]ura[çc][ãa]o:\s*(\d+)\s*h',
+        r'\b(\d{2,3})h\b',
+    ]
+    
+    DATE_PATTERNS = [
+        # DD de MÊS de YYYY
+        r'(\d{1,2}\s+de\s+(?:janeiro|fevereiro|mar[çc]o|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro)\s+de\s+\d{4})',
+        
+        # DD/MM/YYYY
+        r'\b(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})\b',
+        
+        # Data: formato
+        r'Data:\s*(\d{1,2}\s+de\s+[A-Za-zçãõáéíóú]+\s+de\s+\d{4})',
+    ]
+    
+    ID_PATTERNS = [
+        # Udemy: UC-xxxxxxxx (também presente em ude.my/UC-...)
+        r'\b(UC-[A-Za-z0-9\-]{6,})\b',
+        
+        # "Número do certificado: XXXX" / "Código: XXXX"
+        r'(?:N[úu]mero\s+(?:do\s+|de\s+)?certificado|C[óo]digo(?:\s+de\s+verifica[çc][ãa]o)?)\s*:?\s*([A-Za-z0-9][A-Za-z0-9\-]{5,})',
+    ]
+    
+    def __init__(self):
+        self.normalizer = TextNormalizer()
+        self.logger = logging.getLogger(__name__)
+        self._keyword_res = [re.compile(pattern) for pattern in self.keyword_patterns]
+    
+    def fingerprint(self, folded_text: str) -> int:
+        """
+        Conta as palavras-chave e padrões do emissor presentes no texto.
+        
+        Args:
+            folded_text: Texto sem acentos e em minúsculas
+            
+        Returns:
+            Número de marcas encontradas
+        """
+        return (sum(1 for keyword in self.keywords if keyword in folded_text)
+                + sum(1 for regex in self._keyword_res if regex.search(folded_text)))
+    
+    def extract(self, text: str) -> Dict:
+        """
+        Extrai os campos do certificado com os padrões deste emissor.
+        
+        Args:
+            text: Texto normalizado
+            
+        Returns:
+            Dicionário com nome, curso, duração, data e identificador
+        """
+        return {
+            'nome': self._extract_name(text),
+            'curso': self._extract_course(text),
+            'duracao': self._extract_duration(text),
+            'data': self._extract_date(text),
+            'id_certificado': self._extract_certificate_id(text),
+        }
+    
+    def _extract_name(self, text: str) -> Optional[str]:
+        """
+        Extrai nome do aluno com os padrões do emissor.
+        
+        Args:
+            text: Texto normalizado
+            
+        Returns:
+            Nome encontrado ou None
+        """
+        for pattern in self.NAME_PATTERNS:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if not match:
+                continue
+            
+            name = re.sub(r'\d+', '', match.group(1))
+            name = re.sub(r'\s+', ' ', name).strip()
+            # Texto anterior ao nome (cabeçalhos) fica no começo: mantém o final
+            words = name.split()
+            if len(words) > 5:
+                name = ' '.join(words[-4:])
+            
+            if self._is_valid_name(name):
+                self.logger.debug(f"  🔍 Nome encontrado: {name}")
+                return name
+        
+        self.logger.debug("  ⚠️  Nome não encontrado")
+        return None
+    
+    def _is_valid_name(self, name: str) -> bool:
+        """Valida se o texto parece ser um nome válido (tolerante)."""
+        if not name or len(name) < 5:
+            return False
+        
+        # Palavras que NÃO devem aparecer em nomes
+        invalid_words = {
+            'curso', 'python', 'java', 'certificado', 'conclusão', 'instrutor',
+            'professor', 'completo', 'avançado', 'básico', 'data', 'duração',
+            'carga', 'horária', 'udemy', 'desenvolvimento', 'programação',
+            'sql', 'javascript', 'excel', 'access'
+        }
+        
+        words = name.lower().split()
+        
+        # Deve ter 2-5 palavras
+        if not (2 <= len(words) <= 5):
+            return False
+        
+        # Não pode conter muitos números
+        digit_count = sum(1 for c in name if c.isdigit())
+        if digit_count > 2:
+            return False
+        
+        # Não pode conter palavras inválidas
+        if any(invalid in name.lower() for invalid in invalid_words):
+            return False
+        
+        # Cada palavra deve ter pelo menos 2 caracteres (mais tolerante)
+        if any(len(word) < 2 for word in words):
+            return False
+        
+        return True
+    
+    def _extract_course(self, text: str) -> Optional[str]:
+        """
+        Extrai nome do curso com os padrões do emissor.
+        
+        Args:
+            text: Texto normalizado
+            
+        Returns:
+            Nome do curso ou None
+        """
+        for pattern in self.COURSE_PATTERNS:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                course = self._clean_course(match.group(1))
+                if self._is_valid_course(course):
+                    self.logger.debug(f"  🔍 Curso encontrado: {course}")
+                    return course
+        
+        self.logger.debug("  ⚠️  Curso não encontrado")
+        return None
+    
+    def _clean_course(self, course_text: str) -> str:
+        """Limpa texto do curso removendo metadados."""
+        # Remove quebras de linha e normaliza espaços
+        course = re.sub(r'[\n\r]+', ' ', course_text)
+        course = re.sub(r'\s+', ' ', course)
+        
+        # Remove metadados de certificado
+        course = re.sub(r'\b(?:UC-[A-Za-z0-9\-]+|ude\.my/\S+|Udemy|certificado)\b', '', course, flags=re.IGNORECASE)
+        course = re.sub(r'Número\s+(?:de\s+)?(?:certificado|referência)[^\w]*', '', course, flags=re.IGNORECASE)
+        
+        # Remove tudo após "Instrutores"
+        course = re.split(r'\s+[Ii]nstrutor(?:es)?\b', course)[0]
+        
+        # Remove caracteres especiais
+        course = re.sub(r'[_*|•]+', '', course)
+        course = re.sub(r'^[:\-\s]+|[:\-\s]+$', '', course)
+        
+        return course.strip()
+    
+    def _is_valid_course(self, course: str) -> bool:
+        """Valida se o texto parece ser um curso válido (mais tolerante)."""
+        if not course:
+            return False
+        
+        # Aceitamais variações: 5-300 caracteres (era 10-200)
+        if len(course) < 5 or len(course) > 300:
+            return False
+        
+        # Não pode começar com palavras indesejadas
+        if re.match(r'^\s*(?:Instrutores|Professor|Data|Dura[çc][ãa]o|Carga|Número|De)\b', course, re.IGNORECASE):
+            return False
+        
+        # Deve conter pelo menos uma palavra com 5+ caracteres ou termo técnico
+        words = course.split()
+        has_long_word = any(len(word) >= 5 for word in words)
+        has_tech_term = any(term in course.lower() for term in [
+            'python', 'java', 'sql', 'javascript', 'excel', 'power', 'access',
+            'html', 'css', 'react', 'angular', 'node', 'django', 'flask'
+        ])
+        
+        return has_long_word or has_tech_term
+    
+    def _extract_duration(self, text: str) -> Optional[int]:
+        """
+        Extrai duração do curso.
+        
+        Args:
+            text: Texto normalizado
+            
+        Returns:
+            Duração em horas ou None
+        """
+        for pattern in self.DURATION_PATTERNS:
+            try:
+                match = re.search(pattern, text, re.IGNORECASE)
+                if match:
+                    hours = match.group(1)
+                    if hours.isdigit() and 1 <= int(hours) <= 999:
+                        self.logger.debug(f"  🔍 Duração encontrada: {hours}h")
+                        return int(hours)
+            except Exception as e:
+                self.logger.warning(f"Erro ao aplicar padrão de duração: {e}")
+                continue
+        
+        return None
+    
+    def _extract_date(self, text: str) -> Optional[str]:
+        """
+        Extrai data do certificado.
+        
+        Args:
+            text: Texto normalizado
+            
+        Returns:
+            Data formatada ou None
+        """
+        for pattern in self.DATE_PATTERNS:
+            try:
+                match = re.search(pattern, text, re.IGNORECASE)
+                if match:
+                    date_text = match.group(1).strip()
+                    if re.search(r'\d{4}', date_text):  # Valida presença de ano
+                        self.logger.debug(f"  🔍 Data encontrada: {date_text}")
+                        return date_text
+            except Exception as e:
+                self.logger.warning(f"Erro ao aplicar padrão de data: {e}")
+                continue
+        
+        return None
+    
+    def _extract_certificate_id(self, text: str) -> Optional[str]:
+        """
+        Extrai identificador único do certificado (ex: "UC-1a2b3c4d").
+        
+        Args:
+            text: Texto normalizado
+            
+        Returns:
+            Identificador ou None
+        """
+        for pattern in self.ID_PATTERNS:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                cert_id = match.group(1).strip('-')
+                self.logger.debug(f"  🔍 Identificador encontrado: {cert_id}")
+                return cert_id
+        
+        return None
+
+
+class GenericExtractor(IssuerExtractor):
+    """
+    Caminho genérico, para emissores desconhecidos.
+    
+    Mantém a heurística original do programa sem alterações: nome ancorado em
+    "[NOME] Data [DIA] de" (as 3 últimas palavras quando há mais de 4) e curso
+    em "Curso de ..." ou no nome da tecnologia.
+    """
+    
+    name = 'generico'
+    generic_fallback = ()
+    
+    def _extract_name(self, text: str) -> Optional[str]:
+        """
+        Extrai nome do aluno procurando padrão: "[NOME] Data [DIA] de"
+        
+        Args:
+            text: Texto normalizado
+            
+        Returns:
+            Nome encontrado ou None
+        """
+        try:
+            # Padrão testado: procura por "[tudo] Data [dia] de"
+            # Captura o texto até a palavra "Data"
+            match = re.search(r'([\w\s]+?)\s+Data\s+(\d+)\s+de', text, re.IGNORECASE)
+            
+            if match:
+                name = match.group(1).strip()
+                # Remove números extras
+                name = re.sub(r'\d+', '', name).strip()
+                # Remove múltiplos espaços
+                name = re.sub(r'\s+', ' ', name).strip()
+                # Remove lixo como "Malaquias" ou nomes de instrutores
+                # Mantém as 3-4 últimas palavras antes de "Data" que provavelmente é o nome
+                words = name.split()
+                if len(words) > 4:
+                    # Se tiver muitas palavras, pega apenas as últimas 3-4
+                    name = ' '.join(words[-3:])
+                
+                if self._is_valid_name(name):
+                    self.logger.debug(f"  🔍 Nome encontrado: {name}")
+                    return name
+            
+            self.logger.debug("  ⚠️  Nome não encontrado")
+            return None
+            
+        except Exception as e:
+            self.logger.error(f"  ❌ Erro ao extrair nome: {e}")
+            return None
+    
+    def _extract_course(self, text: str) -> Optional[str]:
+        """
+        Extrai nome do curso procurando padrões comuns:
+        - "Curso de [COURSE]" 
+        - "[COURSE]: [descricao]"
+        
+        Args:
+            text: Texto normalizado
+            
+        Returns:
+            Nome do curso ou None
+        """
+        try:
+            # Padrão 1: "Curso de Python 3 do básico..."
+            match = re.search(r'[Cc]urso\s+de\s+([^\.]+?)(?:\s+(?:com|Instrutor|Instrutores|Número|Carga))', text, re.IGNORECASE)
+            if match:
+                course = self._clean_course(match.group(1))
+                if self._is_valid_course(course):
+                    self.logger.debug(f"  🔍 Curso encontrado: {course}")
+                    return course
+            
+            # Padrão 2: "SQL: Vá do ZERO..." ou "[TECNOLOGIA]: [descricao]"
+            match = re.search(r'((?:Python|SQL|JavaScript|Java|C\+\+|PHP|Excel|Power\s+BI)[^\.]*?)(?:\s+(?:Instrutor|Instrutores|Completo|com|Data))', text, re.IGNORECASE)
+            if match:
+                course = self._clean_course(match.group(1))
+                if self._is_valid_course(course):
+                    self.logger.debug(f"  🔍 Curso encontrado: {course}")
+                    return course
+            
+            self.logger.debug("  ⚠️  Curso não encontrado")
+            return None
+            
+        except Exception as e:
+            self.logger.error(f"  ❌ Erro ao extrair curso: {e}")
+            return None
+
+
+
+@register_issuer
+class UdemyExtractor(GenericExtractor):
+    """
+    Certificados da Udemy: o formato para o qual a heurística original
+    (`GenericExtractor`) foi escrita; só acrescenta a impressão digital.
+    """
+    
+    name = 'udemy'
+    keywords = ('udemy', 'ude. my')
+    # Identificador do certificado: UC-<uuid>
+    keyword_patterns = (r'\buc-[0-9a-f]{8}',)
+
+
+@register_issuer
+class AluraExtractor(IssuerExtractor):
+    """
+    Certificados da Alura: "Certificamos que [NOME] concluiu o curso online
+    [CURSO] com carga horária estimada em [N]h".
+    """
+    
+    name = 'alura'
+    keywords = ('alura',)
+    
+    NAME_PATTERNS = [
+        r'[Cc]ertificamos\s+que\s+([\w\s]+?)\s+conclu[ií]u',
+    ]
+    
+    COURSE_PATTERNS = [
+        r'conclu[ií]u\s+(?:o\s+)?(?:curso\s+)?(?:online\s+)?(?:de\s+)?(.+?)\s+com\s+carga',
+        r'[Ff]orma[çc][ãa]o\s+(.+?)\s+com\s+carga',
+    ]
+    
+    DURATION_PATTERNS = [
+        r'carga\s+hor[áa]ria\s+(?:estimada\s+)?(?:em|de)\s+(\d+)\s*h',
+    ] + IssuerExtractor.DURATION_PATTERNS
+    
+    ID_PATTERNS = [
+        r'alura\.\s?com\.\s?br/certificate/\s?([A-Za-z0-9\-]{8,})',
+    ] + IssuerExtractor.ID_PATTERNS
+
+
+@register_issuer
+class CourseraExtractor(IssuerExtractor):
+    """
+    Certificados da Coursera (em inglês): "[NAME] has successfully completed
+    [COURSE] an online non-credit course..." e verificação em coursera.org/verify.
+    """
+    
+    name = 'coursera'
+    keywords = ('coursera',)
+    
+    NAME_PATTERNS = [
+        r'([\w\s]+?)\s+has\s+successfully\s+completed',
+    ]
+    
+    COURSE_PATTERNS = [
+        r'successfully\s+completed\s+(?:the\s+online\s+course\s+)?(.+?)\s+(?:an\s+online|a\s+course|offered|authorized)',
+    ]
+    
+    DATE_PATTERNS = [
+        # Mar 5, 2024 / March 5, 2024
+        r'((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{1,2},?\s+\d{4})',
+    ] + IssuerExtractor.DATE_PATTERNS
+    
+    ID_PATTERNS = [
+        r'coursera\.\s?org/(?:account/accomplishments/)?(?:verify|certificate)/\s?([A-Z0-9]{6,})',
+    ]
+
+
+# ==============================================================================
+# CLASSE: CertificateDataExtractor
+# ==============================================================================
+
+class CertificateDataExtractor:
+    """
+    Extrai dados estruturados de certificados usando regex tolerante.
+    
+    Um classificador compara a impressão digital de cada emissor registrado
+    e só o extrator escolhido roda seus padrões; emissores desconhecidos usam
+    o extrator genérico. Campos que o especializado não encontrou (dentre os
+    do seu `generic_fallback`) são completados pelo genérico e listados em
+    'complemento_generico'.
+    """
+    
+    def __init__(self):
+        self.normalizer = TextNormalizer()
+        self.logger = logging.getLogger(__name__)
+        self.extractors = [cls() for cls in ISSUER_EXTRACTORS]
+        self.generic = GenericExtractor()
+    
+    def classify(self, text: str) -> IssuerExtractor:
+        """
+        Escolhe o extrator do emissor pelo texto do certificado.
+        
+        Args:
+            text: Texto normalizado
+            
+        Returns:
+            Extrator com mais palavras-chave encontradas (ou o genérico)
+        """
+        folded = TextNormalizer.fold_for_search(text)
+        best, best_hits = self.generic, 0
+        for extractor in self.extractors:
+            hits = extractor.fingerprint(folded)
+            if hits >= extractor.min_keywords and hits > best_hits:
+                best, best_hits = extractor, hits
+        return best
+    
+    def extract_all(self, text: str) -> Dict:
+        """
+        Extrai todos os campos do certificado.
+        
+        Args:
+            text: Texto extraído do certificado
+            
+        Returns:
+            Dicionário com dados extraídos (duração em horas, data em ISO)
+        """
+        # Normaliza texto primeiro
+        normalized_text = self.normalizer.normalize(text)
+        
+        extractor = self.classify(normalized_text)
+        self.logger.debug(f"  🏷️  Emissor: {extractor.name}")
+        data = extractor.extract(normalized_text)
+        
+        # Campos que o extrator especializado não achou: tenta o caminho genérico
+        # e registra quais vieram dele
+        completed = []
+        if extractor is not self.generic:
+            generic_fields = {'nome': self.generic._extract_name, 'curso': self.generic._extract_course}
+            for field in extractor.generic_fallback:
+                if not data[field]:
+                    data[field] = generic_fields[field](normalized_text)
+                    if data[field]:
+                        completed.append(field)
+            if completed:
+                self.logger.debug(f"  ↩️  {extractor.name}: {', '.join(completed)} pelo extrator genérico")
+        data['complemento_generico'] = completed
+        
+        # Data em ISO (AAAA-MM-DD); o texto original fica quando não é reconhecida
+        parsed = CertificateRecord.parse_date(data['data'])
+        if parsed:
+            data['data'] = parsed.isoformat()
+        
+        data['emissor'] = extractor.name
+        data['status'] = 'completo' if data['nome'] and data['curso'] else 'incompleto'
+        return data
@@ -11,9 +11,19 @@ Data: Janeiro 2026
 import os
 import re
 import sys
+import json
 import time
+import queue
+import signal
+import subprocess
+import hashlib
 import logging
-from pathlib import Path
+import atexit
+import multiprocessing
+import argparse
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from http.server import ThreadingHTTPServer
 from datetime import datetime
 from tkinter import filedialog
 import tkinter as tk
@@ -24,7 +34,7 @@ try:
     import cv2
     import numpy as np
     from PIL import Image, ImageEnhance, ImageFilter
-    from pdf2image import convert_from_path
+    from pdf2image import convert_from_path, convert_from_bytes, pdfinfo_from_bytes
     import easyocr
     import pandas as pd
 except ImportError as e:
@@ -33,35 +43,126 @@ except ImportError as e:
     print("pip install opencv-python numpy pillow pdf2image easyocr pandas")
     sys.exit(1)
 
+# Módulos do projeto (não dependem da pilha de OCR)
+from records import TextNormalizer, CertificateRecord, ResultWriter
+from extractors import CertificateDataExtractor
+from storage import DEFAULT_ARCHIVE_PATH, CertificateArchive, TextSearchIndex
+from pdf_io import read_pdf, PdfPrefetcher, ArchiveReader, RenamedArchiveWriter
+from scheduler import WorkScheduler
+from organizer import FileOrganizer
+from daemon import CertificateDaemon
+from work_queue import SharedWorkQueue
+from service import ExtractionService, ExtractionRequestHandler
+
 
 # ==============================================================================
 # CONFIGURAÇÃO DE LOGGING
 # ==============================================================================
 
-def setup_logging(output_folder: str) -> logging.Logger:
+# Listener ativo (thread de escrita dos logs); substituído a cada configuração
+_log_listener: Optional[QueueListener] = None
+
+# Loggers do programa e dos seus módulos (o modo verboso vale para todos)
+PROJECT_LOGGERS = (__name__, 'records', 'extractors', 'storage', 'pdf_io', 'scheduler',
+                   'organizer', 'daemon', 'work_queue', 'service')
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formata registros estruturados (atributo `registro`) como uma linha JSON.
+    """
+    
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+        }
+        payload.update(getattr(record, 'registro', {}))
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def _is_structured(record: logging.LogRecord) -> bool:
+    """Filtro: aceita apenas registros estruturados (um por arquivo)."""
+    return hasattr(record, 'registro')
+
+
+def stop_logging():
+    """
+    Descarrega a fila de logs e encerra a thread de escrita.
+    """
+    global _log_listener
+    
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
+
+
+def setup_logging(output_folder: str, verbose: int = 0,
+                  max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5) -> logging.Logger:
     """
     Configura sistema de logging para registrar erros e processamento.
     
+    Quem registra apenas enfileira a mensagem (QueueHandler); uma thread
+    separada (QueueListener) grava no console e nos arquivos, tirando a E/S
+    do caminho crítico do OCR. Além do log de texto, cada arquivo processado
+    gera um registro JSON (campos + tempos por etapa) em `processamento_*.jsonl`.
+    Os dois arquivos são rotacionados por tamanho.
+    
     Args:
         output_folder: Pasta onde salvar os logs
+        verbose: 0 = resumo por arquivo; 1+ = detalhes de cada etapa (DEBUG)
+        max_bytes: Tamanho máximo de cada arquivo de log antes da rotação
+        backup_count: Número de arquivos rotacionados mantidos
         
     Returns:
         Logger configurado
     """
-    log_file = os.path.join(output_folder, f'processamento_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler()
-        ]
-    )
+    global _log_listener
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_file = os.path.join(output_folder, f'processamento_{timestamp}.log')
+    records_file = os.path.join(output_folder, f'processamento_{timestamp}.jsonl')
+    
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    
+    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes,
+                                       backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    
+    records_handler = RotatingFileHandler(records_file, maxBytes=max_bytes,
+                                          backupCount=backup_count, encoding='utf-8', delay=True)
+    records_handler.setFormatter(JsonLinesFormatter())
+    records_handler.addFilter(_is_structured)
+    
+    # Reconfiguração: encerra o listener anterior antes de trocar os handlers
+    stop_logging()
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    
+    _log_listener = QueueListener(log_queue, file_handler, console_handler, records_handler,
+                                  respect_handler_level=True)
+    _log_listener.start()
+    
+    # Detalhes por etapa apenas no modo verboso (bibliotecas continuam em INFO)
+    for name in PROJECT_LOGGERS:
+        logging.getLogger(name).setLevel(logging.DEBUG if verbose else logging.INFO)
     
     return logging.getLogger(__name__)
 
 
+atexit.register(stop_logging)
+
+
 # ==============================================================================
 # CLASSE: ImagePreprocessor
 # ==============================================================================
@@ -179,6 +280,70 @@ class ImagePreprocessor:
             return image
 
 
+# ==============================================================================
+# CONFIGURAÇÃO DE INFERÊNCIA (CPU)
+# ==============================================================================
+
+def resolve_torch_threads(num_threads: Optional[int] = None, workers: int = 1) -> int:
+    """
+    Número de threads de inferência por trabalhador, sem configurar nada.
+    
+    Sem valor explícito, um OMP_NUM_THREADS já definido no ambiente é
+    respeitado; senão os núcleos são divididos entre os trabalhadores.
+    
+    Args:
+        num_threads: Threads intra-op por trabalhador (None = OMP_NUM_THREADS
+                     ou núcleos / workers)
+        workers: Número de trabalhadores rodando OCR simultaneamente na máquina
+        
+    Returns:
+        Número de threads por trabalhador
+    """
+    if num_threads:
+        return num_threads
+    env_threads = os.environ.get('OMP_NUM_THREADS', '')
+    if env_threads.isdigit() and int(env_threads) > 0:
+        return int(env_threads)
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def configure_torch_threads(num_threads: Optional[int] = None, workers: int = 1) -> int:
+    """
+    Ajusta o paralelismo do PyTorch/OpenCV para não disputar núcleos.
+    
+    Com vários processos (ou leitores) rodando OCR ao mesmo tempo, cada um
+    usando todos os núcleos, o sistema fica sobrecarregado e a vazão cai. Os
+    núcleos são divididos entre os trabalhadores (ver `resolve_torch_threads`)
+    e o paralelismo entre operadores (inter-op) é fixado em 1. Deve rodar no
+    processo que executa o modelo.
+    
+    Args:
+        num_threads: Threads intra-op por trabalhador (None = OMP_NUM_THREADS
+                     ou núcleos / workers)
+        workers: Número de trabalhadores rodando OCR simultaneamente na máquina
+        
+    Returns:
+        Número de threads configurado
+    """
+    num_threads = resolve_torch_threads(num_threads, workers)
+    
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # Só pode ser definido antes do primeiro uso; mantém o atual
+    except ImportError:
+        pass
+    
+    # Com vários trabalhadores o OpenCV não deve abrir seu próprio pool
+    if workers > 1:
+        cv2.setNumThreads(1)
+    
+    return num_threads
+
+
 # ==============================================================================
 # CLASSE: OCRExtractor
 # ==============================================================================
@@ -188,19 +353,35 @@ class OCRExtractor:
     Extrai texto de imagens usando EasyOCR com suporte a múltiplos idiomas.
     """
     
-    def __init__(self, languages: List[str] = ['pt', 'en']):
+    # Triagem de páginas: resolução das miniaturas, fração mínima de pixels
+    # escuros (abaixo disso a página está em branco) e mínimo de regiões de texto
+    TRIAGE_DPI = 50
+    TRIAGE_MIN_INK = 0.004
+    TRIAGE_MIN_REGIONS = 3
+    
+    def __init__(self, languages: List[str] = ['pt', 'en'], quantize: bool = True,
+                 num_threads: Optional[int] = None):
         """
         Inicializa o leitor EasyOCR.
         
         Args:
             languages: Lista de idiomas para reconhecimento
+            quantize: Quantização dinâmica int8 dos modelos (detector e
+                      reconhecedor) na CPU; False usa os pesos float32 originais
+            num_threads: Threads intra-op do PyTorch (None mantém a configuração atual)
         """
         self.logger = logging.getLogger(__name__)
         self.preprocessor = ImagePreprocessor()
+        self.quantize = quantize
+        
+        if num_threads:
+            configure_torch_threads(num_threads)
         
         try:
-            self.logger.info(f"🔄 Inicializando EasyOCR (idiomas: {', '.join(languages)})...")
-            self.reader = easyocr.Reader(languages, gpu=False)  # GPU=False para compatibilidade
+            self.logger.info(f"🔄 Inicializando EasyOCR (idiomas: {', '.join(languages)}, "
+                             f"{'int8' if quantize else 'float32'})...")
+            # GPU=False para compatibilidade
+            self.reader = easyocr.Reader(languages, gpu=False, quantize=quantize)
             self.logger.info("✅ EasyOCR inicializado com sucesso")
         except Exception as e:
             self.logger.error(f"❌ Erro ao inicializar EasyOCR: {e}")
@@ -234,578 +415,1030 @@ class OCRExtractor:
             self.logger.error(f"Erro ao extrair texto: {e}")
             return ""
     
-    def extract_from_pdf(self, pdf_path: str, dpi: int = 300) -> str:
+    def triage_pages(self, thumbnails: List[np.ndarray]) -> List[int]:
         """
-        Extrai texto de todas as páginas de um PDF.
+        Seleciona, pelas miniaturas, as páginas que provavelmente são certificados.
+        
+        Páginas com pouca tinta (versos em branco) são descartadas sem rodar
+        nenhum modelo. Nas demais roda apenas o detector do EasyOCR (sem
+        reconhecimento): páginas com poucas regiões de texto (envelopes,
+        imagens) são descartadas. Entre as restantes ficam as mais parecidas
+        com um certificado: linhas de fonte grande (nome, curso) e formato
+        paisagem, diferente de cartas com texto corrido.
         
         Args:
-            pdf_path: Caminho do arquivo PDF
-            dpi: Resolução para converter PDF em imagem
+            thumbnails: Miniaturas das páginas (RGB)
             
         Returns:
-            Texto extraído de todas as páginas
+            Números das páginas (a partir de 1) a reconhecer em alta resolução
         """
-        try:
-            self.logger.info(f"  📄 Convertendo PDF em imagens (DPI: {dpi})...")
-            
-            # Converte PDF para imagens com DPI aumentado para melhor qualidade
-            # DPI 400 oferece bom balanço entre qualidade e tempo de processamento
-            images = convert_from_path(pdf_path, dpi=400)
-            
-            all_text = []
-            
-            # Processa cada página
-            for page_num, pil_image in enumerate(images, 1):
-                self.logger.info(f"  ⚙️  Processando página {page_num}/{len(images)}...")
-                
-                # Converte PIL para numpy array
-                img_array = np.array(pil_image)
-                
-                # Extrai texto (sem pré-processamento - piora o OCR)
-                text = self.extract_from_image(img_array, preprocess=False)
-                
-                if text:
-                    all_text.append(text)
-            
-            # Junta texto de todas as páginas
-            full_text = '\n\n'.join(all_text)
-            
-            self.logger.info(f"  ✅ Texto extraído: {len(full_text)} caracteres")
+        all_pages = list(range(1, len(thumbnails) + 1))
+        if len(thumbnails) <= 1:
+            return all_pages
+        
+        candidates = []
+        for page_num, thumb in enumerate(thumbnails, 1):
+            gray = cv2.cvtColor(thumb, cv2.COLOR_RGB2GRAY) if thumb.ndim == 3 else thumb
+            ink = np.count_nonzero(gray < 160) / gray.size
+            if ink < self.TRIAGE_MIN_INK:
+                self.logger.debug(f"  ⏭️  Página {page_num}: em branco (tinta {ink:.2%})")
+                continue
             
-            return full_text
+            horizontal_list, free_list = self.reader.detect(thumb)
+            boxes = horizontal_list[0] if horizontal_list else []
+            regions = len(boxes) + (len(free_list[0]) if free_list else 0)
+            if regions < self.TRIAGE_MIN_REGIONS:
+                self.logger.debug(f"  ⏭️  Página {page_num}: {regions} região(ões) de texto")
+                continue
             
-        except Exception as e:
-            self.logger.error(f"  ❌ Erro ao processar PDF: {e}")
-            return ""
-
-
-# ==============================================================================
-# CLASSE: TextNormalizer
-# ==============================================================================
-
-class TextNormalizer:
-    """
-    Normaliza e limpa texto extraído por OCR.
-    """
+            height, width = gray.shape
+            large = sum(1 for _, _, y_min, y_max in boxes if y_max - y_min > 0.03 * height)
+            score = large / max(1, len(boxes)) + (0.5 if width > height else 0.0)
+            candidates.append((score, page_num))
+        
+        # Sem candidatas (triagem incerta): reconhece tudo
+        if not candidates:
+            return all_pages
+        
+        best = max(score for score, _ in candidates)
+        return sorted(page for score, page in candidates if score >= best * 0.6)
     
     @staticmethod
-    def normalize(text: str) -> str:
+    def count_pages(pdf_bytes: Optional[bytes]) -> int:
         """
-        Normaliza texto removendo problemas comuns de OCR.
+        Número de páginas de um PDF em memória, sem renderizar.
         
         Args:
-            text: Texto bruto do OCR
+            pdf_bytes: Conteúdo do PDF (None = desconhecido)
             
         Returns:
-            Texto normalizado
+            Número de páginas (0 se não for possível determinar)
         """
-        if not text:
-            return ""
-        
-        # Remove espaços extras e quebras de linha múltiplas
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'\n+', '\n', text)
-        
-        # Remove caracteres especiais problemáticos mas mantém acentos
-        text = re.sub(r'[^\w\sÀ-ÿ\-:,./]', '', text)
-        
-        # Normaliza pontuação
-        text = re.sub(r'\s*([,.:;])\s*', r'\1 ', text)
-        
-        # Remove espaços no início e fim
-        text = text.strip()
-        
-        return text
+        if pdf_bytes is None:
+            return 0
+        pages = WorkScheduler.count_pages(pdf_bytes)
+        if pages:
+            return pages
+        # Árvore de páginas em fluxo comprimido: pdfinfo lê sem renderizar
+        try:
+            return int(pdfinfo_from_bytes(pdf_bytes).get('Pages', 0))
+        except Exception:
+            return 0
     
-    @staticmethod
-    def clean_for_filename(text: str, max_length: int = 100) -> str:
+    def _render_pages(self, render, dpi: int, triage: bool, page_count: int = 0,
+                      first_page: Optional[int] = None, last_page: Optional[int] = None) -> List:
         """
-        Limpa texto para uso em nomes de arquivo.
+        Renderiza em alta resolução apenas as páginas aprovadas na triagem.
         
         Args:
-            text: Texto a ser limpo
-            max_length: Comprimento máximo do nome
+            render: Função de conversão (convert_from_path/bytes com a origem já fixada)
+            dpi: Resolução final
+            triage: Se deve fazer a triagem pelas miniaturas
+            page_count: Páginas do PDF, se conhecidas (0 = desconhecido)
+            first_page: Primeira página a renderizar (limita a faixa, sem triagem)
+            last_page: Última página a renderizar (limita a faixa, sem triagem)
             
         Returns:
-            Texto seguro para nome de arquivo
+            Imagens PIL das páginas selecionadas
         """
-        if not text:
-            return "Desconhecido"
-        
-        # Remove/substitui caracteres inválidos para arquivos
-        text = re.sub(r'[<>:"/\\|?*]', '', text)
-        text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', text)
-        
-        # Remove espaços extras
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # Limita comprimento
-        if len(text) > max_length:
-            text = text[:max_length].strip()
-        
-        return text or "Desconhecido"
-
-
-# ==============================================================================
-# CLASSE: CertificateDataExtractor
-# ==============================================================================
-
-class CertificateDataExtractor:
-    """
-    Extrai dados estruturados de certificados usando regex tolerante.
-    """
-    
-    def __init__(self):
-        self.normalizer = TextNormalizer()
-        self.logger = logging.getLogger(__name__)
+        if first_page or last_page:
+            return render(dpi=dpi, first_page=first_page, last_page=last_page)
+        
+        # PDF de uma página: a triagem aprovaria a página de qualquer forma
+        if not triage or page_count == 1:
+            return render(dpi=dpi)
+        
+        thumbnails = [np.array(page) for page in render(dpi=self.TRIAGE_DPI)]
+        pages = self.triage_pages(thumbnails)
+        if len(pages) == len(thumbnails):
+            return render(dpi=dpi)
+        
+        self.logger.debug(f"  🔎 Triagem: página(s) {pages} de {len(thumbnails)}")
+        
+        # Faixas contíguas viram uma única chamada ao poppler
+        images = []
+        start = previous = pages[0]
+        for page in pages[1:] + [None]:
+            if page is not None and page == previous + 1:
+                previous = page
+                continue
+            images.extend(render(dpi=dpi, first_page=start, last_page=previous))
+            if page is not None:
+                start = previous = page
+        return images
     
-    def extract_all(self, text: str) -> Dict[str, Optional[str]]:
+    def render_pdf(self, pdf_path: str, triage: bool = True, pdf_bytes: Optional[bytes] = None,
+                   first_page: Optional[int] = None, last_page: Optional[int] = None) -> List:
         """
-        Extrai todos os campos do certificado.
+        Converte as páginas selecionadas de um PDF em imagens para o OCR.
         
         Args:
-            text: Texto extraído do certificado
+            pdf_path: Caminho do arquivo PDF
+            triage: Converte só as páginas que parecem certificados
+            pdf_bytes: Conteúdo já lido do PDF (renderiza do buffer, sem reler o arquivo)
+            first_page: Primeira página a converter (None = desde o início)
+            last_page: Última página a converter (None = até o fim)
             
         Returns:
-            Dicionário com dados extraídos
+            Imagens PIL das páginas selecionadas
         """
-        # Normaliza texto primeiro
-        normalized_text = self.normalizer.normalize(text)
-        
-        return {
-            'nome': self._extract_name(normalized_text),
-            'curso': self._extract_course(normalized_text),
-            'duracao': self._extract_duration(normalized_text),
-            'data': self._extract_date(normalized_text),
-            'status': 'completo' if all([
-                self._extract_name(normalized_text),
-                self._extract_course(normalized_text)
-            ]) else 'incompleto'
-        }
+        self.logger.debug(f"  📄 Convertendo PDF em imagens (DPI: 400)...")
+        
+        if pdf_bytes is not None:
+            render = lambda **kwargs: convert_from_bytes(pdf_bytes, **kwargs)
+        else:
+            render = lambda **kwargs: convert_from_path(pdf_path, **kwargs)
+        
+        # Converte PDF para imagens com DPI aumentado para melhor qualidade
+        # DPI 400 oferece bom balanço entre qualidade e tempo de processamento
+        return self._render_pages(render, 400, triage, self.count_pages(pdf_bytes),
+                                  first_page, last_page)
     
-    def _extract_name(self, text: str) -> Optional[str]:
+    def recognize_pages(self, images: List) -> str:
         """
-        Extrai nome do aluno procurando padrão: "[NOME] Data [DIA] de"
+        Reconhece o texto de páginas já convertidas em imagem.
         
         Args:
-            text: Texto normalizado
+            images: Imagens PIL das páginas
             
         Returns:
-            Nome encontrado ou None
+            Texto das páginas, separadas por linha em branco
         """
-        try:
-            # Padrão testado: procura por "[tudo] Data [dia] de"
-            # Captura o texto até a palavra "Data"
-            match = re.search(r'([\w\s]+?)\s+Data\s+(\d+)\s+de', text, re.IGNORECASE)
+        all_text = []
+        
+        # Processa cada página
+        for page_num, pil_image in enumerate(images, 1):
+            self.logger.debug(f"  ⚙️  Processando página {page_num}/{len(images)}...")
             
-            if match:
-                name = match.group(1).strip()
-                # Remove números extras
-                name = re.sub(r'\d+', '', name).strip()
-                # Remove múltiplos espaços
-                name = re.sub(r'\s+', ' ', name).strip()
-                # Remove lixo como "Malaquias" ou nomes de instrutores
-                # Mantém as 3-4 últimas palavras antes de "Data" que provavelmente é o nome
-                words = name.split()
-                if len(words) > 4:
-                    # Se tiver muitas palavras, pega apenas as últimas 3-4
-                    name = ' '.join(words[-3:])
-                
-                if self._is_valid_name(name):
-                    self.logger.info(f"  🔍 Nome encontrado: {name}")
-                    return name
+            # Converte PIL para numpy array
+            img_array = np.array(pil_image)
             
-            self.logger.warning("  ⚠️  Nome não encontrado")
-            return None
+            # Extrai texto (sem pré-processamento - piora o OCR)
+            text = self.extract_from_image(img_array, preprocess=False)
             
-        except Exception as e:
-            self.logger.error(f"  ❌ Erro ao extrair nome: {e}")
-            return None
+            if text:
+                all_text.append(text)
+        
+        # Junta texto de todas as páginas
+        full_text = '\n\n'.join(all_text)
+        
+        self.logger.debug(f"  ✅ Texto extraído: {len(full_text)} caracteres")
+        
+        return full_text
     
-    def _extract_name_old(self, text: str) -> Optional[str]:
+    def extract_from_pdf(self, pdf_path: str, dpi: int = 300, triage: bool = True,
+                         pdf_bytes: Optional[bytes] = None, first_page: Optional[int] = None,
+                         last_page: Optional[int] = None) -> str:
         """
-        Extrai nome do aluno com múltiplos padrões, tolerância a erros OCR e fallback.
+        Extrai texto das páginas de um PDF.
         
         Args:
-            text: Texto normalizado
+            pdf_path: Caminho do arquivo PDF
+            dpi: Resolução para converter PDF em imagem
+            triage: Reconhece só as páginas que parecem certificados
+            pdf_bytes: Conteúdo já lido do PDF (renderiza do buffer, sem reler o arquivo)
+            first_page: Primeira página a reconhecer (None = desde o início)
+            last_page: Última página a reconhecer (None = até o fim)
             
         Returns:
-            Nome extraído ou None
+            Texto extraído das páginas selecionadas
         """
-        # Corrige erros comuns do OCR ANTES dos padrões
-        text = self._fix_ocr_errors(text)
-        
-        # Lista de padrões regex (do mais específico ao mais genérico)
-        patterns = [
-            # Padrão 1: Nome antes de "Data"
-            r'([A-ZÀÁÂÃÉÊÍÓÔÕÚÇ][a-zàáâãéêíóôõúç\s]+(?:[A-ZÀÁÂÃÉÊÍÓÔÕÚÇ][a-zàáâãéêíóôõúç\s]+){1,4})\s+Data',
-            
-            # Padrão 2: Nome antes de "Duração"  
-            r'([A-ZÀÁÂÃÉÊÍÓÔÕÚÇ][a-zàáâãéêíóôõúç\s]+(?:[A-ZÀÁÂÃÉÊÍÓÔÕÚÇ][a-zàáâãéêíóôõúç\s]+){1,4})\s+Dura[çc][ãa]o',
-            
-            # Padrão 3: Após "Nome:" ou "Aluno:"
-            r'(?:Nome|Aluno|Participante):\s*([A-ZÀÁÂÃÉÊÍÓÔÕÚÇ][a-zàáâãéêíóôõúç\s]+)',
-            
-            # Padrão 4: Nome antes de "concluiu"
-            r'([A-ZÀÁÂÃÉÊÍÓÔÕÚÇ][a-zàáâãéêíóôõúç\s]+)\s+concluiu',
-            
-            # Padrão 5: Tolerante - qualquer nome com 2+ palavras capitalizadas
-            r'(?:^|\n)([A-ZÀÁÂÃÉÊÍÓÔÕÚÇ][a-zàáâãéêíóôõúç]+(?:\s+[A-ZÀÁÂÃÉÊÍÓÔÕÚÇ][a-zàáâãéêíóôõúç]+)+)(?:\n|$)',
+        try:
+            images = self.render_pdf(pdf_path, triage, pdf_bytes, first_page, last_page)
+            return self.recognize_pages(images)
             
-            # Padrão 6: Fallback - primeiras 3-5 palavras capitalizadas
-            r'^([A-ZÀÁÂÃÉÊÍÓÔÕÚÇ][a-zàáâãéêíóôõúç]+(?:\s+[A-ZÀÁÂÃÉÊÍÓÔÕÚÇ][a-zàáâãéêíóôõúç]+){1,3})',
-        ]
-        
-        for pattern in patterns:
+        except Exception as e:
+            self.logger.error(f"  ❌ Erro ao processar PDF: {e}")
+            return ""
+
+    def render_pdf_bytes(self, pdf_bytes: bytes, dpi: int = 400, triage: bool = True) -> List[np.ndarray]:
+        """
+        Converte um PDF em memória em imagens (uma por página selecionada).
+
+        Args:
+            pdf_bytes: Conteúdo do PDF
+            dpi: Resolução da conversão
+            triage: Converte só as páginas que parecem certificados
+
+        Returns:
+            Lista de imagens numpy array
+        """
+        render = lambda **kwargs: convert_from_bytes(pdf_bytes, **kwargs)
+        pages = self._render_pages(render, dpi, triage, self.count_pages(pdf_bytes))
+        return [np.array(page) for page in pages]
+
+    def extract_from_images_batch(self, images: List[np.ndarray]) -> List[str]:
+        """
+        Extrai texto de várias imagens compartilhando chamadas de reconhecimento.
+
+        Imagens do mesmo tamanho (páginas renderizadas no mesmo formato e DPI)
+        são enviadas juntas ao `readtext_batched`, que roda a detecção em lote;
+        imagens de tamanho único seguem pelo caminho normal.
+
+        Args:
+            images: Lista de imagens numpy array
+
+        Returns:
+            Texto de cada imagem, na mesma ordem
+        """
+        texts = [''] * len(images)
+
+        # Agrupa índices por formato da imagem
+        groups: Dict[Tuple, List[int]] = {}
+        for idx, image in enumerate(images):
+            groups.setdefault(image.shape, []).append(idx)
+
+        for indexes in groups.values():
             try:
-                match = re.search(pattern, text, re.MULTILINE | re.IGNORECASE)
-                if match:
-                    name = match.group(1).strip()
-                    # Remove números e caracteres extras
-                    name = re.sub(r'\d+', '', name)
-                    name = re.sub(r'\s+', ' ', name).strip()
-                    
-                    if self._is_valid_name(name):
-                        self.logger.info(f"  🔍 Nome encontrado: {name}")
-                        return name
+                if len(indexes) == 1:
+                    texts[indexes[0]] = self.extract_from_image(images[indexes[0]], preprocess=False)
+                    continue
+
+                results = self.reader.readtext_batched(
+                    [images[idx] for idx in indexes],
+                    detail=0, paragraph=True, batch_size=len(indexes)
+                )
+                for idx, result in zip(indexes, results):
+                    texts[idx] = '\n'.join(result)
+
             except Exception as e:
-                self.logger.debug(f"Padrão falhou: {e}")
-                continue
-        
-        self.logger.warning("  ⚠️  Nome não encontrado")
-        return None
+                self.logger.error(f"Erro ao extrair texto em lote: {e}")
+
+        return texts
+
+
+# ==============================================================================
+# CLASSE: ReaderPool
+# ==============================================================================
+
+class ReaderPool:
+    """
+    Mantém leitores EasyOCR por conjunto de idiomas, carregados sob demanda.
     
-    def _fix_ocr_errors(self, text: str) -> str:
+    Sem detecção, é um único leitor com todos os idiomas pedidos (o
+    comportamento clássico). Com detecção, o idioma provável de cada PDF vem
+    da camada de texto (pdftotext) ou do próprio reconhecimento feito com o
+    leitor que já estiver carregado; se o idioma pedir outro leitor, as mesmas
+    páginas são reconhecidas por um leitor só com aquele idioma (+ inglês).
+    Leitores pouco usados são descartados (LRU) quando a memória estimada
+    passa do orçamento.
+    """
+    
+    # Palavras frequentes e pouco ambíguas de cada idioma (sem acentos); palavras
+    # comuns em português (das, por, ha) ficam de fora das outras listas
+    STOPWORDS = {
+        'pt': {'do', 'da', 'dos', 'das', 'em', 'para', 'com', 'uma', 'nao', 'pelo', 'pela',
+               'ao', 'concluiu', 'conclusao', 'certificamos', 'carga', 'horaria',
+               'participou', 'instrutores', 'duracao'},
+        'en': {'the', 'of', 'and', 'to', 'has', 'have', 'successfully', 'completed',
+               'completion', 'certificate', 'certifies', 'this', 'that', 'for', 'with',
+               'hours', 'by', 'awarded', 'presented'},
+        'es': {'el', 'los', 'las', 'del', 'y', 'con', 'una', 'completado',
+               'certifica', 'otorga', 'otorgado', 'duracion', 'fecha', 'al', 'su'},
+        'fr': {'le', 'les', 'des', 'du', 'et', 'pour', 'avec', 'une', 'certifie',
+               'attestation', 'formation', 'heures', 'reussi', 'suivi', 'cette'},
+        'it': {'il', 'gli', 'della', 'di', 'per', 'attestato', 'corso', 'ore',
+               'conseguito', 'completato', 'partecipazione'},
+        'de': {'der', 'die', 'und', 'mit', 'fur', 'hat', 'teilgenommen', 'zertifikat',
+               'bescheinigung', 'stunden', 'erfolgreich', 'kurs', 'den', 'dem'},
+    }
+    # Mínimo de palavras reconhecidas para confiar na detecção
+    MIN_HITS = 3
+    # Estimativa de memória de um leitor quando não é possível medir
+    DEFAULT_READER_MB = 500
+    
+    def __init__(self, languages: List[str] = ['pt', 'en'], quantize: bool = True,
+                 detect: bool = False, memory_budget_mb: int = 2048):
         """
-        Corrige erros comuns cometidos pelo OCR.
+        Inicializa o conjunto de leitores.
         
         Args:
-            text: Texto com possíveis erros de OCR
-            
-        Returns:
-            Texto corrigido
+            languages: Idiomas aceitos (o primeiro é o padrão quando a detecção falha)
+            quantize: Usa modelos quantizados int8
+            detect: Detecta o idioma de cada PDF e usa um leitor por idioma
+                (ignorado com um único idioma)
+            memory_budget_mb: Memória total (MB) dos leitores mantidos carregados
         """
-        # Erros comuns: l (L minúsculo) confundido com J, I, 1
-        # i (i minúsculo) confundido com l, 1
-        # rn confundido com m
-        
-        corrections = {
-            # Nomes comuns corrigidos
-            'AJves': 'Alves',
-            'AIves': 'Alves',  
-            'A1ves': 'Alves',
-            'SiJva': 'Silva',
-            'Si1va': 'Silva',
-            'SiIva': 'Silva',
-            'Alclr': 'Alcir',
-            'A1cir': 'Alcir',
-            'AIcir': 'Alcir',
-            'Sllva': 'Silva',
-            'S1lva': 'Silva',
-            'SIlva': 'Silva',
-            'da Si1va': 'da Silva',
-            'da SiJva': 'da Silva',
-            'Hagge': 'Hagge',  # Normalmente ok, mas padronizar
-            'Certlficado': 'Certificado',
-            'Cert1ficado': 'Certificado',
-        }
+        self.languages = list(dict.fromkeys(languages))
+        self.quantize = quantize
+        self.detect = detect and len(self.languages) > 1
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.logger = logging.getLogger(__name__)
         
-        for wrong, correct in corrections.items():
-            text = text.replace(wrong, correct)
+        # Conjunto de idiomas -> (leitor, memória estimada), do menos ao mais recente
+        self._readers: 'OrderedDict[Tuple[str, ...], Tuple[OCRExtractor, int]]' = OrderedDict()
+        self.stats = {'carregados': 0, 'descartados': 0, 'deteccoes': {}}
         
-        return text
+        self.default_set = self.reader_set(self.languages[0]) if self.detect else tuple(self.languages)
+        if not self.detect:
+            # Leitor único: carregado já na inicialização (modelo aquecido)
+            self.get(self.default_set)
     
-    def _is_valid_name(self, name: str) -> bool:
-        """Valida se o texto parece ser um nome válido (tolerante)."""
-        if not name or len(name) < 5:
-            return False
-        
-        # Palavras que NÃO devem aparecer em nomes
-        invalid_words = {
-            'curso', 'python', 'java', 'certificado', 'conclusão', 'instrutor',
-            'professor', 'completo', 'avançado', 'básico', 'data', 'duração',
-            'carga', 'horária', 'udemy', 'desenvolvimento', 'programação',
-            'sql', 'javascript', 'excel', 'access'
-        }
-        
-        words = name.lower().split()
-        
-        # Deve ter 2-5 palavras
-        if not (2 <= len(words) <= 5):
-            return False
-        
-        # Não pode conter muitos números
-        digit_count = sum(1 for c in name if c.isdigit())
-        if digit_count > 2:
-            return False
-        
-        # Não pode conter palavras inválidas
-        if any(invalid in name.lower() for invalid in invalid_words):
-            return False
-        
-        # Cada palavra deve ter pelo menos 2 caracteres (mais tolerante)
-        if any(len(word) < 2 for word in words):
-            return False
-        
-        return True
+    def reader_set(self, language: str) -> Tuple[str, ...]:
+        """Idiomas do leitor para um idioma detectado (com inglês, se aceito)."""
+        if language == 'en' or 'en' not in self.languages:
+            return (language,)
+        return (language, 'en')
     
-    def _extract_course(self, text: str) -> Optional[str]:
+    def get(self, language_set: Tuple[str, ...]) -> OCRExtractor:
         """
-        Extrai nome do curso procurando padrões comuns:
-        - "Curso de [COURSE]" 
-        - "[COURSE]: [descricao]"
+        Retorna o leitor de um conjunto de idiomas, carregando-o se preciso.
         
         Args:
-            text: Texto normalizado
+            language_set: Idiomas do leitor
             
         Returns:
-            Nome do curso ou None
+            Extrator com o leitor carregado
         """
-        try:
-            # Padrão 1: "Curso de Python 3 do básico..."
-            match = re.search(r'[Cc]urso\s+de\s+([^\.]+?)(?:\s+(?:com|Instrutor|Instrutores|Número|Carga))', text, re.IGNORECASE)
-            if match:
-                course = self._clean_course(match.group(1))
-                if self._is_valid_course(course):
-                    self.logger.info(f"  🔍 Curso encontrado: {course}")
-                    return course
-            
-            # Padrão 2: "SQL: Vá do ZERO..." ou "[TECNOLOGIA]: [descricao]"
-            match = re.search(r'((?:Python|SQL|JavaScript|Java|C\+\+|PHP|Excel|Power\s+BI)[^\.]*?)(?:\s+(?:Instrutor|Instrutores|Completo|com|Data))', text, re.IGNORECASE)
-            if match:
-                course = self._clean_course(match.group(1))
-                if self._is_valid_course(course):
-                    self.logger.info(f"  🔍 Curso encontrado: {course}")
-                    return course
-            
-            self.logger.warning("  ⚠️  Curso não encontrado")
-            return None
-            
-        except Exception as e:
-            self.logger.error(f"  ❌ Erro ao extrair curso: {e}")
-            return None
+        entry = self._readers.get(language_set)
+        if entry is not None:
+            self._readers.move_to_end(language_set)
+            return entry[0]
+        
+        before = _current_rss()
+        extractor = OCRExtractor(languages=list(language_set), quantize=self.quantize)
+        after = _current_rss()
+        size = after - before if before and after and after > before else \
+            self.DEFAULT_READER_MB * 1024 * 1024
+        
+        self._readers[language_set] = (extractor, size)
+        self.stats['carregados'] += 1
+        self._evict()
+        return extractor
     
-    def _clean_course(self, course_text: str) -> str:
-        """Limpa texto do curso removendo metadados."""
-        # Remove quebras de linha e normaliza espaços
-        course = re.sub(r'[\n\r]+', ' ', course_text)
-        course = re.sub(r'\s+', ' ', course)
-        
-        # Remove metadados de certificado
-        course = re.sub(r'\b(?:UC-[A-Za-z0-9\-]+|ude\.my/\S+|Udemy|certificado)\b', '', course, flags=re.IGNORECASE)
-        course = re.sub(r'Número\s+(?:de\s+)?(?:certificado|referência)[^\w]*', '', course, flags=re.IGNORECASE)
-        
-        # Remove tudo após "Instrutores"
-        course = re.split(r'\s+[Ii]nstrutor(?:es)?\b', course)[0]
-        
-        # Remove caracteres especiais
-        course = re.sub(r'[_*|•]+', '', course)
-        course = re.sub(r'^[:\-\s]+|[:\-\s]+$', '', course)
-        
-        return course.strip()
+    def _evict(self):
+        """Descarta os leitores menos usados até caber no orçamento (mantém o atual)."""
+        while len(self._readers) > 1 and \
+                sum(size for _, size in self._readers.values()) > self.memory_budget:
+            language_set, (_, size) = self._readers.popitem(last=False)
+            self.stats['descartados'] += 1
+            self.logger.info(f"♻️  Leitor {'+'.join(language_set)} descartado "
+                             f"({size / (1024 * 1024):.0f} MB, orçamento de leitores)")
     
-    def _is_valid_course(self, course: str) -> bool:
-        """Valida se o texto parece ser um curso válido (mais tolerante)."""
-        if not course:
-            return False
-        
-        # Aceitamais variações: 5-300 caracteres (era 10-200)
-        if len(course) < 5 or len(course) > 300:
-            return False
-        
-        # Não pode começar com palavras indesejadas
-        if re.match(r'^\s*(?:Instrutores|Professor|Data|Dura[çc][ãa]o|Carga|Número|De)\b', course, re.IGNORECASE):
-            return False
-        
-        # Deve conter pelo menos uma palavra com 5+ caracteres ou termo técnico
-        words = course.split()
-        has_long_word = any(len(word) >= 5 for word in words)
-        has_tech_term = any(term in course.lower() for term in [
-            'python', 'java', 'sql', 'javascript', 'excel', 'power', 'access',
-            'html', 'css', 'react', 'angular', 'node', 'django', 'flask'
-        ])
+    def detect_language(self, text: str) -> Optional[str]:
+        """
+        Idioma mais provável de um texto pelas palavras frequentes.
         
-        return has_long_word or has_tech_term
+        Args:
+            text: Texto (camada de texto ou primeira passada de OCR)
+            
+        Returns:
+            Código do idioma ou None se não houver evidência suficiente
+        """
+        words = re.findall(r'[a-z]+', TextNormalizer.fold_for_search(text))
+        scores = {
+            language: sum(1 for word in words if word in self.STOPWORDS[language])
+            for language in self.languages if language in self.STOPWORDS
+        }
+        if not scores:
+            return None
+        best = max(scores, key=scores.get)
+        return best if scores[best] >= self.MIN_HITS else None
+    
+    @staticmethod
+    def _text_layer(pdf_path: str, pdf_bytes: Optional[bytes]) -> str:
+        """Texto da primeira página pela camada de texto do PDF (vazio se não houver)."""
+        if pdf_bytes is not None and b'/Font' not in pdf_bytes:
+            return ''
+        try:
+            result = subprocess.run(
+                ['pdftotext', '-l', '1', '-q', '-' if pdf_bytes is not None else pdf_path, '-'],
+                input=pdf_bytes, capture_output=True, timeout=15
+            )
+        except (OSError, subprocess.SubprocessError):
+            return ''
+        return result.stdout.decode('utf-8', 'ignore') if result.returncode == 0 else ''
     
-    def _extract_duration(self, text: str) -> Optional[str]:
+    def choose_readers(self, text: str, source: str) -> Tuple[str, ...]:
         """
-        Extrai duração do curso.
+        Escolhe o conjunto de idiomas pelo texto de um PDF.
         
         Args:
-            text: Texto normalizado
+            text: Texto do PDF (camada de texto ou reconhecimento já feito)
+            source: Origem do texto, para o log
             
         Returns:
-            Duração em formato "XXh" ou None
+            Idiomas do leitor a usar
         """
-        patterns = [
-            r'(\d+)\s*(?:horas?|h)\s+(?:no\s+)?total',
-            r'[Cc]arga\s+hor[áa]ria\s*(?:de\s+)?(\d+)\s*h?',
-            r'[Dd]ura[çc][ãa]o:\s*(\d+)\s*h',
-            r'\b(\d{2,3})h\b',
-        ]
-        
-        for pattern in patterns:
-            try:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    hours = match.group(1)
-                    if hours.isdigit() and 1 <= int(hours) <= 999:
-                        duration = f"{hours}h"
-                        self.logger.info(f"  🔍 Duração encontrada: {duration}")
-                        return duration
-            except Exception as e:
-                self.logger.warning(f"Erro ao aplicar padrão de duração: {e}")
-                continue
+        language = self.detect_language(text)
+        language_set = self.reader_set(language) if language else self.default_set
         
-        return None
+        key = '+'.join(language_set)
+        self.stats['deteccoes'][key] = self.stats['deteccoes'].get(key, 0) + 1
+        self.logger.debug(f"  🌐 Idioma: {language or 'indefinido'} ({source}) - leitor {key}")
+        return language_set
     
-    def _extract_date(self, text: str) -> Optional[str]:
+    def extract_from_pdf(self, pdf_path: str, dpi: int = 300, triage: bool = True,
+                         pdf_bytes: Optional[bytes] = None) -> str:
         """
-        Extrai data do certificado.
+        Extrai texto de um PDF com o leitor do idioma detectado.
         
         Args:
-            text: Texto normalizado
+            pdf_path: Caminho do arquivo PDF
+            dpi: Resolução para converter PDF em imagem
+            triage: Reconhece só as páginas que parecem certificados
+            pdf_bytes: Conteúdo já lido do PDF
             
         Returns:
-            Data formatada ou None
+            Texto extraído
         """
-        patterns = [
-            # DD de MÊS de YYYY
-            r'(\d{1,2}\s+de\s+(?:janeiro|fevereiro|mar[çc]o|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro)\s+de\s+\d{4})',
-            
-            # DD/MM/YYYY
-            r'\b(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})\b',
-            
-            # Data: formato
-            r'Data:\s*(\d{1,2}\s+de\s+[A-Za-zçãõáéíóú]+\s+de\s+\d{4})',
-        ]
-        
-        for pattern in patterns:
-            try:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    date = match.group(1).strip()
-                    if re.search(r'\d{4}', date):  # Valida presença de ano
-                        self.logger.info(f"  🔍 Data encontrada: {date}")
-                        return date
-            except Exception as e:
-                self.logger.warning(f"Erro ao aplicar padrão de data: {e}")
-                continue
+        if not self.detect:
+            return self.get(self.default_set).extract_from_pdf(pdf_path, dpi=dpi, triage=triage,
+                                                               pdf_bytes=pdf_bytes)
+        
+        text = self._text_layer(pdf_path, pdf_bytes)
+        if len(text.strip()) >= 20:
+            language_set = self.choose_readers(text, 'camada de texto')
+            return self.get(language_set).extract_from_pdf(pdf_path, dpi=dpi, triage=triage,
+                                                           pdf_bytes=pdf_bytes)
+        
+        # Sem camada de texto: o reconhecimento com o leitor mais recente (qualquer
+        # leitor latino acha as palavras) já serve de detecção; só é refeito, sobre
+        # as mesmas imagens, quando o idioma pede outro leitor
+        first_set = next(reversed(self._readers), self.default_set)
+        extractor = self.get(first_set)
+        try:
+            images = extractor.render_pdf(pdf_path, triage, pdf_bytes)
+        except Exception as e:
+            self.logger.error(f"  ❌ Erro ao processar PDF: {e}")
+            return ""
         
-        return None
+        text = extractor.recognize_pages(images)
+        language_set = self.choose_readers(text, 'reconhecimento')
+        if language_set != first_set:
+            text = self.get(language_set).recognize_pages(images)
+        return text
+    
+    def describe(self) -> str:
+        """Resumo dos leitores carregados e das detecções, para o log."""
+        loaded = ', '.join('+'.join(language_set) for language_set in self._readers) or '-'
+        detections = ', '.join(f"{key}: {count}" for key, count in self.stats['deteccoes'].items())
+        return (f"leitores carregados: {loaded} ({self.stats['carregados']} carga(s), "
+                f"{self.stats['descartados']} descarte(s))"
+                + (f"; idiomas: {detections}" if detections else ''))
 
 
 # ==============================================================================
-# CLASSE: CertificateProcessor
+# CLASSE: OCRWorkerPool
 # ==============================================================================
 
-class CertificateProcessor:
+def _current_rss() -> Optional[int]:
+    """Memória residente atual do processo em bytes (None se indisponível)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Sem /proc: pico de memória (KB no Linux, bytes no macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _ocr_worker(tasks, results, quantize: bool, ocr_threads: Optional[int],
+                languages: List[str], detect_language: bool, reader_budget_mb: int,
+                ocr_workers: int = 1):
     """
-    Orquestra o processamento completo de certificados PDF.
+    Laço do processo de OCR: mantém os leitores carregados e extrai o texto dos PDFs recebidos.
     
-    Fluxo:
-    1. Extrai texto via OCR
-    2. Normaliza e extrai dados
-    3. Renomeia arquivo
-    4. Registra em CSV
-    5. Loga erros
+    Args:
+        tasks: Fila de tarefas (task_id, caminho, conteúdo, dpi, triagem); None encerra
+        results: Fila de respostas (task_id, ok, texto ou erro, RSS em bytes)
+        quantize: Usa modelos quantizados int8
+        ocr_threads: Threads do PyTorch
+        languages: Idiomas aceitos
+        detect_language: Usa um leitor por idioma detectado
+        reader_budget_mb: Memória (MB) dos leitores mantidos carregados
+        ocr_workers: Processos de OCR rodando ao mesmo tempo na máquina
     """
+    # Grupo de processos próprio: o supervisor encerra também o pdftoppm filho
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C é tratado pelo supervisor
     
-    def __init__(self, output_folder: str):
-        """
-        Inicializa processador.
-        
-        Args:
-            output_folder: Pasta onde os PDFs estão localizados
-        """
-        self.output_folder = output_folder
-        self.logger = setup_logging(output_folder)
+    # Threads ajustadas aqui, no processo que roda o modelo
+    configure_torch_threads(ocr_threads, workers=ocr_workers)
+    extractor = ReaderPool(languages=languages, quantize=quantize, detect=detect_language,
+                           memory_budget_mb=reader_budget_mb)
+    results.put(('pronto', True, None, _current_rss()))
+    
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        task_id, pdf_path, pdf_bytes, dpi, triage = task
+        try:
+            text = extractor.extract_from_pdf(pdf_path, dpi=dpi, triage=triage, pdf_bytes=pdf_bytes)
+            results.put((task_id, True, text, _current_rss()))
+        except Exception as e:
+            results.put((task_id, False, str(e), _current_rss()))
+
+
+class OCRWorkerPool:
+    """
+    Executa o OCR em um processo separado e supervisionado.
+    
+    - Tempo limite por arquivo: um PDF que trava o poppler tem o processo
+      (e seus filhos) encerrado, e o arquivo é tentado de novo em um processo novo
+    - Reciclagem: o processo é substituído após N arquivos ou quando a memória
+      residente passa do limite, mantendo o consumo estável em lotes longos
+    - Arquivos que esgotam as tentativas geram exceção com o motivo, para serem
+      registrados como falha sem interromper o lote
+    
+    O processo pai não carrega o modelo; renomeio e gravação continuam nele.
+    """
+    
+    def __init__(self, quantize: bool = True, ocr_threads: Optional[int] = None,
+                 timeout: float = 300.0, max_files: int = 200, max_rss_mb: int = 0,
+                 retries: int = 1, languages: List[str] = ['pt', 'en'],
+                 detect_language: bool = False, reader_budget_mb: int = 2048,
+                 ocr_workers: int = 1):
+        """
+        Inicializa o supervisor (o processo de OCR é iniciado sob demanda).
+        
+        Args:
+            quantize: Usa modelos quantizados int8
+            ocr_threads: Threads do PyTorch no processo de OCR
+            timeout: Tempo máximo (s) de OCR por arquivo
+            max_files: Arquivos por processo antes da reciclagem (0 = sem limite)
+            max_rss_mb: Memória residente (MB) que força reciclagem (0 = sem limite)
+            retries: Novas tentativas, em processo novo, após travamento ou queda
+            languages: Idiomas aceitos pelo OCR
+            detect_language: Usa um leitor por idioma detectado
+            reader_budget_mb: Memória (MB) dos leitores mantidos em cada processo
+            ocr_workers: Processos de OCR rodando ao mesmo tempo na máquina
+        """
+        self.quantize = quantize
+        self.languages = languages
+        self.detect_language = detect_language
+        self.reader_budget_mb = reader_budget_mb
+        self.ocr_threads = ocr_threads
+        self.ocr_workers = ocr_workers
+        self.timeout = timeout
+        self.max_files = max_files
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self.retries = max(0, retries)
+        self.logger = logging.getLogger(__name__)
+        
+        # spawn: processo limpo, sem herdar threads/estado do PyTorch do pai
+        self._ctx = multiprocessing.get_context('spawn')
+        self._process = None
+        self._tasks = None
+        self._results = None
+        self._files_done = 0
+        self._task_seq = 0
+        # Processo sempre pronto (modo monitor): iniciado já e reiniciado logo após reciclagem
+        self._keep_warm = False
+        
+        self.stats = {'processos': 0, 'reciclagens': 0, 'tempo_esgotado': 0, 'quedas': 0}
+    
+    def _start(self):
+        """Inicia um processo de OCR e aguarda o modelo carregar."""
+        # Filas novas a cada processo: um processo morto pode deixá-las inconsistentes
+        self._tasks = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_ocr_worker, name='ocr-worker', daemon=True,
+            args=(self._tasks, self._results, self.quantize, self.ocr_threads,
+                  self.languages, self.detect_language, self.reader_budget_mb,
+                  self.ocr_workers)
+        )
+        self._process.start()
+        self._files_done = 0
+        self.stats['processos'] += 1
+        
+        # Carga do modelo não conta no tempo limite dos arquivos
+        while True:
+            try:
+                message = self._results.get(timeout=1.0)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    code = self._process.exitcode
+                    self._process = None
+                    raise RuntimeError(f"Processo de OCR encerrou ao iniciar (código {code})")
+                continue
+            if message[0] == 'pronto':
+                break
+        
+        self.logger.debug(f"🔁 Processo de OCR iniciado (pid {self._process.pid})")
+    
+    def warm_up(self):
+        """
+        Inicia o processo de OCR agora e o mantém carregado.
+        
+        Usado por processos de longa duração que esperam arquivos: o primeiro
+        arquivo (e o seguinte a uma reciclagem) não paga a carga do modelo.
+        """
+        self._keep_warm = True
+        if self._process is None:
+            self._start()
+    
+    def _kill(self):
+        """Encerra imediatamente o processo de OCR e seus filhos."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        
+        if process.is_alive():
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (AttributeError, OSError):
+                process.kill()
+        process.join(5)
+        
+        for q in (self._tasks, self._results):
+            q.cancel_join_thread()
+            q.close()
+    
+    def _retire(self):
+        """Encerra o processo de OCR ao fim da tarefa atual (reciclagem)."""
+        if self._process is None:
+            return
+        self._tasks.put(None)
+        self._process.join(10)
+        self._kill()
+    
+    def _maybe_recycle(self, rss: Optional[int]):
+        """Recicla o processo pelo número de arquivos ou pela memória residente."""
+        by_count = self.max_files and self._files_done >= self.max_files
+        by_memory = self.max_rss and rss and rss > self.max_rss
+        if not (by_count or by_memory):
+            return
+        
+        rss_mb = f"{rss / (1024 * 1024):.0f} MB" if rss else "?"
+        self.logger.info(f"♻️  Reciclando processo de OCR após {self._files_done} arquivo(s) (RSS {rss_mb})")
+        self._retire()
+        self.stats['reciclagens'] += 1
+        if self._keep_warm:
+            self._start()
+    
+    def extract_text(self, pdf_path: str, dpi: int = 400, triage: bool = True,
+                     pdf_bytes: Optional[bytes] = None) -> str:
+        """
+        Extrai o texto de um PDF no processo de OCR, respeitando o tempo limite.
+        
+        Args:
+            pdf_path: Caminho do PDF
+            dpi: Resolução da conversão
+            triage: Reconhece só as páginas que parecem certificados
+            pdf_bytes: Conteúdo já lido (enviado pela fila; o processo de OCR não relê o arquivo)
+            
+        Returns:
+            Texto extraído
+            
+        Raises:
+            TimeoutError: Se todas as tentativas excederem o tempo limite
+            RuntimeError: Se o processo cair em todas as tentativas ou o OCR falhar
+        """
+        attempts = 1 + self.retries
+        filename = os.path.basename(pdf_path)
+        timed_out = False
+        
+        for attempt in range(1, attempts + 1):
+            if self._process is None:
+                self._start()
+            
+            self._task_seq += 1
+            task_id = self._task_seq
+            self._tasks.put((task_id, os.path.abspath(pdf_path), pdf_bytes, dpi, triage))
+            deadline = time.monotonic() + self.timeout
+            
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    reason = f"tempo limite de {self.timeout:.0f}s excedido"
+                    self.stats['tempo_esgotado'] += 1
+                    break
+                
+                try:
+                    message = self._results.get(timeout=min(1.0, remaining))
+                except queue.Empty:
+                    if not self._process.is_alive():
+                        timed_out = False
+                        reason = f"processo de OCR encerrado (código {self._process.exitcode})"
+                        self.stats['quedas'] += 1
+                        break
+                    continue
+                
+                received_id, ok, payload, rss = message
+                if received_id != task_id:
+                    continue  # Resposta atrasada de uma tarefa abandonada
+                
+                self._files_done += 1
+                self._maybe_recycle(rss)
+                if not ok:
+                    raise RuntimeError(payload)
+                return payload
+            
+            self.logger.warning(f"⏱️  {filename}: {reason} - reiniciando processo de OCR "
+                                f"(tentativa {attempt}/{attempts})")
+            self._kill()
+        
+        message = f"{reason[0].upper()}{reason[1:]} em {attempts} tentativa(s)"
+        raise TimeoutError(message) if timed_out else RuntimeError(message)
+    
+    def close(self):
+        """Encerra o processo de OCR."""
+        self._retire()
+
+
+# ==============================================================================
+# CLASSE: CertificateProcessor
+# ==============================================================================
+
+class CertificateProcessor:
+    """
+    Orquestra o processamento completo de certificados PDF.
+    
+    Fluxo:
+    1. Extrai texto via OCR
+    2. Normaliza e extrai dados
+    3. Renomeia arquivo
+    4. Registra em CSV
+    5. Loga erros
+    """
+    
+    # Textos de OCR mantidos por hash para reaproveitar em cópias idênticas
+    TEXT_CACHE_SIZE = 1024
+    
+    def __init__(self, output_folder: str, resume: bool = False, result_format: str = 'csv',
+                 archive_path: Optional[str] = DEFAULT_ARCHIVE_PATH,
+                 quantize: bool = True, ocr_threads: Optional[int] = None, verbose: int = 0,
+                 layout: str = 'plana', rename_batch_size: int = 100,
+                 file_timeout: Optional[float] = None, recycle_after: int = 200,
+                 max_rss_mb: int = 0, source_folder: Optional[str] = None,
+                 order: str = 'sjf', triage: bool = True, prefetch: int = 2,
+                 languages: List[str] = ['pt', 'en'], detect_language: bool = False,
+                 reader_budget_mb: int = 2048, ocr_workers: int = 1,
+                 exclusive_renames: bool = False):
+        """
+        Inicializa processador.
+        
+        Args:
+            output_folder: Pasta onde os PDFs estão localizados
+            resume: Se deve retomar a execução mais recente da pasta
+            result_format: Formato dos arquivos de resultado ('csv' ou 'jsonl')
+            archive_path: Banco SQLite consolidado (None desativa o upsert)
+            quantize: Usa modelos quantizados int8 na CPU
+            ocr_threads: Threads do PyTorch (None = todos os núcleos)
+            verbose: Nível de detalhe do log (0 = uma linha por arquivo)
+            layout: Organização dos renomeados ('plana' ou 'ano_nome')
+            rename_batch_size: Arquivos por lote de renomeação em `process_folder`
+            file_timeout: Tempo máximo (s) de OCR por arquivo; ativa o processo de
+                OCR supervisionado (None = OCR no próprio processo)
+            recycle_after: Arquivos por processo de OCR antes da reciclagem
+            max_rss_mb: Memória residente (MB) que força a reciclagem (0 = sem limite)
+            source_folder: Pasta dos PDFs, quando diferente da pasta de saída e
+                compartilhada com outros processos (modo fila)
+            order: Ordem de processamento da pasta ('sjf', 'ljf' ou 'original')
+            triage: Reconhece só as páginas que parecem certificados
+            prefetch: PDFs lidos antecipadamente em `process_folder` (0 = desativado)
+            languages: Idiomas aceitos pelo OCR
+            detect_language: Detecta o idioma de cada PDF e carrega só os leitores usados
+            reader_budget_mb: Memória (MB) dos leitores mantidos carregados
+            ocr_workers: Processos de OCR rodando ao mesmo tempo nesta máquina
+                (os núcleos são divididos entre eles)
+            exclusive_renames: Renomeações nunca sobrescrevem arquivos criados na
+                pasta por outros processos (modo monitor; implícito no modo fila)
+        """
+        self.output_folder = output_folder
+        self.triage = triage
+        self.prefetch = prefetch
+        # Texto do OCR por hash do conteúdo: cópias idênticas não passam pelo OCR de novo
+        self._text_cache: 'OrderedDict[str, Tuple[str, str]]' = OrderedDict()
+        self.logger = setup_logging(output_folder, verbose=verbose)
         
         # Inicializa componentes
         self.logger.info("🚀 Inicializando componentes...")
-        self.ocr_extractor = OCRExtractor(languages=['pt', 'en'])
+        # Com um único idioma não há o que detectar
+        detect_language = detect_language and len(set(languages)) > 1
+        threads = resolve_torch_threads(ocr_threads, workers=ocr_workers)
+        self.logger.info(f"🧵 Threads de inferência: {threads}")
+        
+        # OCR supervisionado: o modelo vive em um processo separado, com tempo
+        # limite por arquivo e reciclagem; sem ele, o OCR roda aqui mesmo
+        self.ocr_pool: Optional[OCRWorkerPool] = None
+        self.ocr_extractor: Optional[ReaderPool] = None
+        if file_timeout:
+            self.ocr_pool = OCRWorkerPool(quantize=quantize, ocr_threads=threads,
+                                          timeout=file_timeout, max_files=recycle_after,
+                                          max_rss_mb=max_rss_mb, languages=languages,
+                                          detect_language=detect_language,
+                                          reader_budget_mb=reader_budget_mb,
+                                          ocr_workers=ocr_workers)
+            recycling = (f"reciclagem a cada {recycle_after} arquivo(s)" if recycle_after
+                         else "sem reciclagem por contagem")
+            self.logger.info(f"🛡️  OCR supervisionado: limite de {file_timeout:.0f}s por arquivo, {recycling}")
+        else:
+            configure_torch_threads(threads, workers=ocr_workers)
+            self.ocr_extractor = ReaderPool(languages=languages, quantize=quantize,
+                                            detect=detect_language,
+                                            memory_budget_mb=reader_budget_mb)
+        if detect_language:
+            self.logger.info(f"🌐 Detecção de idioma: {', '.join(languages)} "
+                             f"(orçamento de leitores: {reader_budget_mb} MB)")
         self.data_extractor = CertificateDataExtractor()
         self.normalizer = TextNormalizer()
-        
-        # Armazena resultados
-        self.processed_data: List[Dict] = []
-        self.failed_files: List[Dict] = []
+        self.scheduler = WorkScheduler(order)
+        
+        # Resultados são gravados em fluxo, à medida que cada arquivo termina
+        run_id = ResultWriter.latest_run_id(output_folder) if resume else None
+        if resume and not run_id:
+            self.logger.warning("⚠️  Nenhuma execução anterior encontrada - iniciando nova")
+        self.writer = ResultWriter(output_folder, run_id=run_id, fmt=result_format)
+        
+        # Renomeações planejadas em lote, com diário da execução para desfazer
+        self.organizer = FileOrganizer(source_folder or output_folder, layout=layout,
+                                       run_id=self.writer.run_id, journal_folder=output_folder,
+                                       exclusive=exclusive_renames or source_folder is not None)
+        self.rename_batch_size = max(1, rename_batch_size)
+        self._defer_renames = False
+        if run_id and os.path.exists(self.organizer.journal_path):
+            FileOrganizer.recover(self.organizer.journal_path)
+        
+        # Nome do último arquivo gerado (o modo monitor ignora os próprios renomeios)
+        self.last_output: Optional[str] = None
+        
+        # ZIP de saída com cópias renomeadas (entrada compactada, ver `process_archive`)
+        self.archive_output: Optional[RenamedArchiveWriter] = None
+        
+        # Banco consolidado: cada resultado também é incluído (upsert) nele,
+        # junto com o texto do OCR no índice de busca
+        self.archive = CertificateArchive(archive_path) if archive_path else None
+        self.text_index = TextSearchIndex(archive_path, conn=self.archive.conn) if archive_path else None
+        
+        # Arquivos já concluídos em uma execução retomada
+        self.skip_files = self.writer.recorded_files() if run_id else set()
+        if self.skip_files:
+            self.logger.info(f"⏩ Retomando execução {run_id}: "
+                             f"{self.writer.resumed.processados} certificados já gravados")
         
         self.logger.info("✅ Componentes inicializados\n")
     
-    def process_single_pdf(self, pdf_path: str) -> bool:
+    def process_single_pdf(self, pdf_path: str, pdf_bytes: Optional[bytes] = None,
+                           member: Optional[str] = None) -> bool:
         """
         Processa um único arquivo PDF.
         
+        Gera uma única linha de log por arquivo (resumo) e um registro JSON
+        estruturado com os campos e o tempo de cada etapa; o detalhamento
+        etapa a etapa só aparece no modo verboso.
+        
+        O arquivo é lido uma única vez: hash e renderização usam o mesmo buffer.
+        
         Args:
-            pdf_path: Caminho completo do PDF
+            pdf_path: Caminho completo do PDF (ou do arquivo compactado, com `member`)
+            pdf_bytes: Conteúdo já lido (leitura antecipada); None lê o arquivo aqui
+            member: Caminho do PDF dentro do arquivo compactado `pdf_path`; o
+                resultado guarda esse caminho e nada é renomeado em disco
             
         Returns:
             True se processado com sucesso, False caso contrário
         """
-        filename = os.path.basename(pdf_path)
-        self.logger.info(f"📄 Processando: {filename}")
+        filename = member or os.path.basename(pdf_path)
+        source_path = os.path.join(pdf_path, member) if member else pdf_path
+        self.logger.debug(f"📄 Processando: {filename}")
+        self.last_output = None
+        timings: Dict[str, float] = {}
+        stage_start = time.perf_counter()
+        
+        def mark(stage: str):
+            nonlocal stage_start
+            now = time.perf_counter()
+            timings[stage] = round((now - stage_start) * 1000, 1)
+            stage_start = now
         
         try:
-            # 1. Extrai texto via OCR
-            self.logger.info("  🔄 Extraindo texto...")
-            text = self.ocr_extractor.extract_from_pdf(pdf_path, dpi=400)
+            # 1. Lê o arquivo uma única vez
+            if pdf_bytes is None:
+                pdf_bytes = read_pdf(pdf_path)
+            digest = hashlib.sha256(pdf_bytes).hexdigest()
+            mark('leitura')
+            
+            # 2. Extrai texto via OCR (ou reaproveita o de uma cópia idêntica)
+            duplicate_of = None
+            cached = self._text_cache.get(digest)
+            if cached is not None:
+                text, duplicate_of = cached
+                self._text_cache.move_to_end(digest)
+                self.logger.debug(f"  ♻️  Conteúdo idêntico a {duplicate_of} - OCR reaproveitado")
+            else:
+                self.logger.debug("  🔄 Extraindo texto...")
+                if self.ocr_pool:
+                    text = self.ocr_pool.extract_text(source_path, dpi=400, triage=self.triage,
+                                                      pdf_bytes=pdf_bytes)
+                else:
+                    text = self.ocr_extractor.extract_from_pdf(source_path, dpi=400, triage=self.triage,
+                                                               pdf_bytes=pdf_bytes)
+                self._text_cache[digest] = (text, filename)
+                if len(self._text_cache) > self.TEXT_CACHE_SIZE:
+                    self._text_cache.popitem(last=False)
+            mark('ocr')
             
             if not text or len(text) < 20:
-                self.logger.warning(f"  ⚠️  Texto extraído muito curto ou vazio")
-                self.failed_files.append({
-                    'arquivo': filename,
-                    'motivo': 'Texto muito curto ou vazio',
-                    'timestamp': datetime.now().isoformat()
-                })
+                self._record_failure(filename, 'Texto muito curto ou vazio', timings)
                 return False
             
-            # 2. Extrai dados estruturados
-            self.logger.info("  🔍 Extraindo dados...")
+            # 3. Extrai dados estruturados
+            self.logger.debug("  🔍 Extraindo dados...")
             data = self.data_extractor.extract_all(text)
             
-            # 3. Valida dados mínimos
+            # 4. Valida dados mínimos
             if not data.get('nome'):
-                self.logger.warning("  ⚠️  Nome não encontrado - marcando como incompleto")
+                self.logger.debug("  ⚠️  Nome não encontrado - marcando como incompleto")
                 data['nome'] = f"Aluno_Desconhecido_{int(time.time())}"
             
             if not data.get('curso'):
-                self.logger.warning("  ⚠️  Curso não encontrado - marcando como incompleto")
+                self.logger.debug("  ⚠️  Curso não encontrado - marcando como incompleto")
                 data['curso'] = "Curso Não Identificado"
+            mark('extracao')
             
-            # 4. Renomeia arquivo
-            new_path = self._rename_file(pdf_path, data)
-            if new_path:
-                data['arquivo_original'] = filename
-                data['arquivo_novo'] = os.path.basename(new_path)
+            # 5. Renomeia arquivo (membros de arquivo compactado: cópia no ZIP de saída)
+            data['arquivo_original'] = filename
+            if member is not None:
+                data['arquivo_novo'] = (self.archive_output.add(data, pdf_bytes)
+                                        if self.archive_output else member)
             else:
-                data['arquivo_original'] = filename
-                data['arquivo_novo'] = filename
-            
-            # 5. Adiciona timestamp
+                new_path = self._rename_file(pdf_path, data)
+                if new_path:
+                    # Relativo à pasta base (inclui Ano/Nome/ na estrutura 'ano_nome')
+                    data['arquivo_novo'] = os.path.relpath(new_path, self.organizer.base_folder)
+                    self.last_output = os.path.basename(new_path)
+                else:
+                    data['arquivo_novo'] = filename
+                    self.last_output = filename
+            mark('renomeio')
+            
+            # 6. Adiciona timestamp
             data['processado_em'] = datetime.now().isoformat()
             
-            # 6. Armazena resultado
-            self.processed_data.append(data)
-            
-            self.logger.info(f"  ✅ Processado com sucesso")
-            self.logger.info(f"     Nome: {data.get('nome', 'N/A')}")
-            self.logger.info(f"     Curso: {data.get('curso', 'N/A')}")
-            self.logger.info(f"     Duração: {data.get('duracao', 'N/A')}")
-            self.logger.info(f"     Data: {data.get('data', 'N/A')}")
-            self.logger.info(f"     Status: {data.get('status', 'N/A')}\n")
+            # 7. Grava resultado imediatamente (registro tipado; agregados atualizados na gravação)
+            record = CertificateRecord.from_dict(data)
+            self.writer.write_success(record)
+            row = record.to_dict()
+            # Membros de arquivo compactado: a "pasta" é o próprio arquivo
+            folder = os.path.abspath(pdf_path) if member else os.path.dirname(os.path.abspath(pdf_path))
+            if self.archive:
+                self.archive.add(row, folder)
+            if self.text_index:
+                self.text_index.add(CertificateArchive.make_key(row, folder), text,
+                                    record.arquivo_novo, folder)
+            mark('gravacao')
+            
+            total_ms = sum(timings.values())
+            self.logger.info(
+                f"✅ {filename} -> {record.arquivo_novo} [{record.status}] ({total_ms / 1000:.1f}s)",
+                extra={'registro': {
+                    'resultado': 'sucesso',
+                    **row,
+                    'sha256': digest,
+                    'complemento_generico': data.get('complemento_generico'),
+                    'duplicado_de': duplicate_of,
+                    'tempos_ms': timings,
+                    'total_ms': round(total_ms, 1),
+                }}
+            )
             
             return True
             
         except Exception as e:
-            self.logger.error(f"  ❌ Erro ao processar {filename}: {e}", exc_info=True)
-            self.failed_files.append({
-                'arquivo': filename,
-                'motivo': str(e),
-                'timestamp': datetime.now().isoformat()
-            })
+            self.logger.debug(f"  ❌ Erro ao processar {filename}", exc_info=True)
+            mark('erro')
+            self._record_failure(filename, str(e), timings)
             return False
     
+    def _record_failure(self, filename: str, reason: str, timings: Optional[Dict] = None):
+        """
+        Grava um arquivo com falha no fluxo de resultados e no log estruturado.
+        
+        Args:
+            filename: Nome do arquivo
+            reason: Motivo da falha
+            timings: Tempo (ms) de cada etapa executada
+        """
+        self.writer.write_failure({
+            'arquivo': filename,
+            'motivo': reason,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+        timings = timings or {}
+        self.logger.warning(
+            f"❌ {filename}: {reason}",
+            extra={'registro': {
+                'resultado': 'falha',
+                'arquivo_original': filename,
+                'motivo': reason,
+                'tempos_ms': timings,
+                'total_ms': round(sum(timings.values()), 1),
+            }}
+        )
+    
     def process_folder(self, folder_path: str) -> Tuple[int, int]:
         """
         Processa todos os PDFs em uma pasta.
@@ -816,31 +1449,167 @@ class CertificateProcessor:
         Returns:
             Tupla (sucessos, falhas)
         """
-        # Lista todos os PDFs
-        pdf_files = [f for f in os.listdir(folder_path) if f.lower().endswith('.pdf')]
+        # Lista todos os PDFs (o tamanho vem da própria listagem)
+        sizes: Dict[str, int] = {}
+        with os.scandir(folder_path) as it:
+            for entry in it:
+                if entry.name.lower().endswith('.pdf') and entry.is_file():
+                    sizes[entry.name] = entry.stat().st_size
+        pdf_files = list(sizes)
         
         if not pdf_files:
             self.logger.warning("❌ Nenhum arquivo PDF encontrado na pasta")
             return 0, 0
         
         self.logger.info(f"📁 Encontrados {len(pdf_files)} arquivos PDF")
+        
+        # Ignora arquivos já gravados em uma execução retomada
+        if self.skip_files:
+            pending = [f for f in pdf_files if f not in self.skip_files]
+            self.logger.info(f"⏩ {len(pdf_files) - len(pending)} já processados anteriormente")
+            pdf_files = pending
+        
+        # Ordena pelo custo estimado (páginas, camada de texto, tamanho; amostra
+        # do início e do fim de cada PDF, exceto na ordem 'original')
+        schedule = self.scheduler.plan([os.path.join(folder_path, f) for f in pdf_files],
+                                       sizes={os.path.join(folder_path, f): sizes[f] for f in pdf_files})
+        remaining_pages = sum(estimate['paginas'] for _, estimate in schedule)
+        self.logger.info(f"🗂️  Ordem '{self.scheduler.order}': {remaining_pages} página(s) estimada(s)")
         self.logger.info("=" * 70 + "\n")
         
         success_count = 0
         fail_count = 0
+        last_progress = time.monotonic()
+        
+        # Os próximos arquivos são lidos em segundo plano enquanto o atual está no OCR
+        estimates = dict(schedule)
+        paths = [path for path, _ in schedule]
+        if self.prefetch > 0:
+            files = PdfPrefetcher(paths, depth=self.prefetch)
+        else:
+            files = ((path, None, None) for path in paths)
+        
+        # Renomeações são planejadas contra o índice em memória e aplicadas em lotes
+        self._defer_renames = True
+        try:
+            # Processa cada PDF
+            for idx, (pdf_path, pdf_bytes, read_error) in enumerate(files, 1):
+                estimate = estimates[pdf_path]
+                if pdf_bytes is not None:
+                    # Estimativa inicial veio de uma amostra (ou só do tamanho): refina pelo conteúdo
+                    refined = self.scheduler.estimate(pdf_path, data=pdf_bytes)
+                    remaining_pages += refined['paginas'] - estimate['paginas']
+                    estimate = refined
+                self.logger.debug(f"[{idx}/{len(schedule)}] Iniciando processamento "
+                                  f"({estimate['paginas']} página(s) estimada(s))")
+                
+                file_start = time.perf_counter()
+                if read_error is not None:
+                    self._record_failure(os.path.basename(pdf_path), f"Erro de leitura: {read_error}")
+                    fail_count += 1
+                elif self.process_single_pdf(pdf_path, pdf_bytes):
+                    success_count += 1
+                else:
+                    fail_count += 1
+                
+                self.scheduler.record(estimate['paginas'], time.perf_counter() - file_start)
+                remaining_pages -= estimate['paginas']
+                
+                if len(self.organizer.pending) >= self.rename_batch_size:
+                    self._apply_renames()
+                
+                # Progresso a cada 30s, com o tempo restante pela vazão observada
+                if time.monotonic() - last_progress >= 30 and idx < len(schedule):
+                    last_progress = time.monotonic()
+                    self.logger.info(
+                        f"📈 {idx}/{len(schedule)} arquivos "
+                        f"({self.scheduler.seconds_per_page:.1f}s/página) - "
+                        f"restam ~{self.scheduler.format_duration(self.scheduler.eta(remaining_pages))}"
+                    )
+                
+                self.logger.debug("-" * 70 + "\n")
+        finally:
+            files.close()
+            self._apply_renames()
+            self._defer_renames = False
         
-        # Processa cada PDF
-        for idx, filename in enumerate(pdf_files, 1):
-            self.logger.info(f"[{idx}/{len(pdf_files)}] Iniciando processamento")
-            
-            pdf_path = os.path.join(folder_path, filename)
-            
-            if self.process_single_pdf(pdf_path):
-                success_count += 1
-            else:
-                fail_count += 1
+        return success_count, fail_count
+    
+    def process_archive(self, archive_path: str, output_archive: Optional[str] = None) -> Tuple[int, int]:
+        """
+        Processa os PDFs de dentro de um arquivo ZIP/TAR, sem extraí-los.
+        
+        Os resultados guardam o caminho de cada membro. Com `output_archive`,
+        cópias renomeadas são gravadas em um novo ZIP; o arquivo de entrada
+        nunca é alterado.
+        
+        Args:
+            archive_path: Caminho do arquivo compactado
+            output_archive: ZIP de saída com os nomes organizados (opcional)
             
-            self.logger.info("-" * 70 + "\n")
+        Returns:
+            Tupla (sucessos, falhas)
+        """
+        reader = ArchiveReader(archive_path)
+        self.logger.info(f"🗜️  Lendo {os.path.basename(archive_path)} ({reader.kind.upper()}) sem extrair")
+        
+        # Membros já gravados em uma execução retomada são pulados sem ir ao OCR;
+        # com ZIP de saída eles ainda são lidos, para entrar de novo no ZIP
+        # (o da execução anterior é substituído ou nem chegou a ser fechado)
+        recorded: Dict[str, Dict] = {}
+        if output_archive:
+            self.archive_output = RenamedArchiveWriter(output_archive, layout=self.organizer.layout)
+            if self.skip_files:
+                recorded = {row['arquivo_original']: row
+                            for row in self.writer.iter_records('processados')
+                            if row.get('arquivo_original')}
+        
+        source = ((name, data, error) for name, data, error in reader.members()
+                  if name not in self.skip_files or name in recorded)
+        members = PdfPrefetcher(source, depth=max(1, self.prefetch))
+        
+        success_count = 0
+        fail_count = 0
+        last_progress = time.monotonic()
+        try:
+            for idx, (member, pdf_bytes, read_error) in enumerate(members, 1):
+                file_start = time.perf_counter()
+                row = recorded.get(member)
+                if row is not None:
+                    # Processado antes: só a cópia, com o nome já gravado nos resultados
+                    if pdf_bytes is not None:
+                        previous = row.get('arquivo_novo')
+                        self.archive_output.add(row, pdf_bytes,
+                                                name=previous if previous != member else None)
+                    continue
+                
+                if read_error is not None:
+                    self._record_failure(member, f"Erro de leitura: {read_error}")
+                    fail_count += 1
+                    continue
+                
+                pages = self.scheduler.estimate(member, data=pdf_bytes)['paginas']
+                if self.process_single_pdf(archive_path, pdf_bytes, member=member):
+                    success_count += 1
+                else:
+                    fail_count += 1
+                self.scheduler.record(pages, time.perf_counter() - file_start)
+                
+                # Total de membros só é conhecido no fim (TAR em fluxo): mostra a vazão
+                if time.monotonic() - last_progress >= 30:
+                    last_progress = time.monotonic()
+                    self.logger.info(f"📈 {idx} membro(s) processado(s) "
+                                     f"({self.scheduler.seconds_per_page:.1f}s/página)")
+        finally:
+            members.close()
+            if self.archive_output:
+                self.archive_output.close()
+                self.logger.info(f"🗜️  {self.archive_output.count} cópia(s) renomeada(s) em "
+                                 f"{self.archive_output.output_path}")
+                self.archive_output = None
+        
+        if success_count + fail_count == 0 and not self.skip_files:
+            self.logger.warning("❌ Nenhum arquivo PDF encontrado no arquivo compactado")
         
         return success_count, fail_count
     
@@ -848,6 +1617,9 @@ class CertificateProcessor:
         """
         Renomeia arquivo baseado nos dados extraídos.
         
+        O nome é reservado no organizador; durante `process_folder` a
+        renomeação entra no lote corrente, fora dele é aplicada na hora.
+        
         Args:
             original_path: Caminho original do arquivo
             data: Dados extraídos
@@ -856,29 +1628,20 @@ class CertificateProcessor:
             Novo caminho ou None se falhar
         """
         try:
-            folder = os.path.dirname(original_path)
-            
-            # Extrai componentes do nome
-            nome = self.normalizer.clean_for_filename(data.get('nome', 'Desconhecido'))
-            curso = self.normalizer.clean_for_filename(data.get('curso', 'Curso'), max_length=50)
-            
-            # Extrai ano da data
-            year = self._extract_year(data.get('data'))
-            
-            # Constrói novo nome
-            new_filename = f"{nome} - {curso} - {year}.pdf"
-            new_path = os.path.join(folder, new_filename)
-            
-            # Evita sobrescrever arquivos existentes
-            counter = 1
-            while os.path.exists(new_path):
-                new_filename = f"{nome} - {curso} - {year} ({counter}).pdf"
-                new_path = os.path.join(folder, new_filename)
-                counter += 1
-            
-            # Renomeia arquivo
-            os.rename(original_path, new_path)
-            self.logger.info(f"  ✅ Renomeado para: {new_filename}")
+            # Fora de um lote outros processos podem ter criado arquivos na pasta.
+            # A movimentação exclusiva nunca os sobrescreve: a pasta só é relida
+            # quando um deles já ocupa o nome reservado (nada de uma listagem por arquivo)
+            for attempt in range(3):
+                new_path = self.organizer.plan(original_path, data, refresh=attempt > 0)
+                if self._defer_renames:
+                    break
+                try:
+                    self.organizer.apply()
+                    break
+                except FileExistsError:
+                    if attempt == 2:
+                        raise
+            self.logger.debug(f"  ✅ Renomeado para: {os.path.basename(new_path)}")
             
             return new_path
             
@@ -886,87 +1649,101 @@ class CertificateProcessor:
             self.logger.error(f"  ❌ Erro ao renomear arquivo: {e}")
             return None
     
-    def _extract_year(self, date_str: Optional[str]) -> str:
+    def _apply_renames(self):
         """
-        Extrai ano da string de data.
+        Aplica o lote de renomeações pendente.
         
-        Args:
-            date_str: String com data
-            
-        Returns:
-            Ano como string ou ano atual
+        Se o lote falhar ele é revertido por inteiro e fica registrado no
+        diário; a próxima execução com `--retomar` o conclui.
         """
-        if not date_str:
-            return str(datetime.now().year)
-        
-        # Procura por padrão de 4 dígitos (ano)
-        match = re.search(r'\d{4}', date_str)
-        if match:
-            return match.group(0)
+        try:
+            self.organizer.apply()
+        except OSError:
+            self.logger.error("❌ Lote de renomeações revertido - conclua com --retomar "
+                              "ou 'organizar --concluir'")
+    
+    def flush_outputs(self):
+        """
+        Confirma no banco consolidado e no índice de texto o que está pendente.
         
-        return str(datetime.now().year)
+        Usado por execuções longas (modo monitor) para que consultas vejam os
+        certificados recém-processados sem esperar o fim da execução.
+        """
+        if self.text_index:
+            self.text_index.flush()
+        if self.archive:
+            self.archive.flush()
     
     def save_results(self):
         """
-        Salva resultados em arquivos CSV.
+        Finaliza os arquivos de resultado gravados durante o processamento.
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.writer.close()
+        self.organizer.close()
         
-        # 1. Salva certificados processados com sucesso
-        if self.processed_data:
-            success_file = os.path.join(
-                self.output_folder, 
-                f'certificados_processados_{timestamp}.csv'
-            )
-            
-            try:
-                df_success = pd.DataFrame(self.processed_data)
-                df_success.to_csv(success_file, index=False, encoding='utf-8-sig')
-                self.logger.info(f"📊 Resultados salvos em: {success_file}")
-            except Exception as e:
-                self.logger.error(f"❌ Erro ao salvar CSV de sucesso: {e}")
+        if self.ocr_pool:
+            self.ocr_pool.close()
+            stats = self.ocr_pool.stats
+            if stats['tempo_esgotado'] or stats['quedas'] or stats['reciclagens']:
+                self.logger.info(f"🛡️  OCR supervisionado: {stats['tempo_esgotado']} tempo(s) esgotado(s), "
+                                 f"{stats['quedas']} queda(s), {stats['reciclagens']} reciclagem(ns)")
         
-        # 2. Salva log de arquivos com falha
-        if self.failed_files:
-            failed_file = os.path.join(
-                self.output_folder,
-                f'certificados_falhas_{timestamp}.csv'
-            )
-            
-            try:
-                df_failed = pd.DataFrame(self.failed_files)
-                df_failed.to_csv(failed_file, index=False, encoding='utf-8-sig')
-                self.logger.info(f"⚠️  Log de falhas salvo em: {failed_file}")
-            except Exception as e:
-                self.logger.error(f"❌ Erro ao salvar CSV de falhas: {e}")
+        if self.ocr_extractor and self.ocr_extractor.detect:
+            self.logger.info(f"🌐 OCR: {self.ocr_extractor.describe()}")
+        
+        if self.text_index:
+            self.text_index.close()
+        
+        if self.archive:
+            self.archive.close()
+            self.logger.info(f"🗄️  Banco consolidado atualizado: {self.archive.db_path}")
+        
+        # 1. Certificados processados com sucesso
+        for path in self.writer.paths('processados'):
+            self.logger.info(f"📊 Resultados salvos em: {path}")
+        
+        # 2. Arquivos com falha
+        for path in self.writer.paths('falhas'):
+            self.logger.info(f"⚠️  Log de falhas salvo em: {path}")
+        
+        # 3. Diário das renomeações (permite desfazer)
+        if os.path.exists(self.organizer.journal_path):
+            self.logger.info(f"↩️  Diário de renomeações: {self.organizer.journal_path}")
     
-    def generate_report(self, success_count: int, fail_count: int):
+    def generate_report(self):
         """
         Gera relatório final do processamento.
         
-        Args:
-            success_count: Número de sucessos
-            fail_count: Número de falhas
+        Os números vêm dos agregados desta execução, mantidos durante a
+        gravação (registros de uma execução retomada não entram).
         """
-        total = success_count + fail_count
-        success_rate = (success_count / total * 100) if total > 0 else 0
+        stats = self.writer.stats
+        total = stats.processados + stats.falhas
+        success_rate = (stats.processados / total * 100) if total > 0 else 0
         
         self.logger.info("\n" + "=" * 70)
         self.logger.info("       RELATÓRIO FINAL")
         self.logger.info("=" * 70)
         self.logger.info(f"Total de arquivos: {total}")
-        self.logger.info(f"✅ Processados com sucesso: {success_count}")
-        self.logger.info(f"❌ Falhas: {fail_count}")
+        self.logger.info(f"✅ Processados com sucesso: {stats.processados}")
+        self.logger.info(f"❌ Falhas: {stats.falhas}")
         self.logger.info(f"📊 Taxa de sucesso: {success_rate:.1f}%")
+        if self.writer.resumed.processados or self.writer.resumed.falhas:
+            self.logger.info(f"⏩ Já gravados antes da retomada: {self.writer.resumed.processados} "
+                             f"sucesso(s), {self.writer.resumed.falhas} falha(s)")
         
-        # Estatísticas adicionais
-        if self.processed_data:
-            complete_count = sum(1 for d in self.processed_data if d.get('status') == 'completo')
-            incomplete_count = len(self.processed_data) - complete_count
-            
+        # Estatísticas adicionais (agregados mantidos durante a gravação)
+        if stats.processados:
             self.logger.info(f"\n📋 Dados extraídos:")
-            self.logger.info(f"  Completos: {complete_count}")
-            self.logger.info(f"  Incompletos: {incomplete_count}")
+            self.logger.info(f"  Completos: {stats.completos}")
+            self.logger.info(f"  Incompletos: {stats.incompletos}")
+            issuers = ', '.join(f"{name}: {count}" for name, count in
+                                sorted(stats.emissores.items(), key=lambda item: -item[1]))
+            self.logger.info(f"  Emissores: {issuers}")
+            if stats.horas:
+                self.logger.info(f"  Carga horária total: {stats.horas}h")
+            if stats.data_min:
+                self.logger.info(f"  Período: {stats.data_min.isoformat()} a {stats.data_max.isoformat()}")
         
         self.logger.info("=" * 70 + "\n")
 
@@ -991,12 +1768,631 @@ def select_folder() -> Optional[str]:
 
 
 # ==============================================================================
-# FUNÇÃO PRINCIPAL: main
+# FUNÇÃO: run_processing
 # ==============================================================================
 
-def main():
+def run_processing(folder: str, resume: bool = False, result_format: str = 'csv',
+                   archive_path: Optional[str] = None,
+                   quantize: bool = True, ocr_threads: Optional[int] = None,
+                   verbose: int = 0, layout: str = 'plana',
+                   file_timeout: Optional[float] = None, recycle_after: int = 200,
+                   max_rss_mb: int = 0, order: str = 'sjf', triage: bool = True,
+                   prefetch: int = 2, output_archive: Optional[str] = None,
+                   languages: List[str] = ['pt', 'en'], detect_language: bool = False,
+                   reader_budget_mb: int = 2048):
     """
-    Função principal do programa.
+    Executa o processamento completo de uma pasta.
+    
+    Um arquivo .zip/.tar no lugar da pasta é lido sem extração; os resultados
+    ficam na pasta do arquivo compactado.
+    
+    Os padrões mantêm o comportamento do modo interativo (OCR no próprio
+    processo, sem banco consolidado); o subcomando 'processar' ativa a
+    supervisão e o banco explicitamente.
+    
+    Args:
+        folder: Pasta com os certificados PDF (ou arquivo ZIP/TAR)
+        resume: Se deve retomar a execução mais recente da pasta
+        result_format: Formato dos arquivos de resultado ('csv' ou 'jsonl')
+        archive_path: Banco SQLite consolidado (None desativa)
+        quantize: Usa modelos quantizados int8 na CPU
+        ocr_threads: Threads do PyTorch (None = todos os núcleos)
+        verbose: Nível de detalhe do log (0 = uma linha por arquivo)
+        layout: Organização dos renomeados ('plana' ou 'ano_nome')
+        file_timeout: Tempo máximo (s) de OCR por arquivo (None = sem supervisão)
+        recycle_after: Arquivos por processo de OCR antes da reciclagem
+        max_rss_mb: Memória residente (MB) que força a reciclagem (0 = sem limite)
+        order: Ordem de processamento ('sjf', 'ljf' ou 'original')
+        triage: Reconhece só as páginas que parecem certificados
+        prefetch: PDFs lidos antecipadamente (0 = desativado)
+        output_archive: ZIP de saída com cópias renomeadas (entrada compactada)
+        languages: Idiomas aceitos pelo OCR
+        detect_language: Detecta o idioma de cada PDF e carrega só os leitores usados
+        reader_budget_mb: Memória (MB) dos leitores mantidos carregados
+    """
+    try:
+        is_archive = ArchiveReader.is_archive(folder)
+        output_folder = os.path.dirname(os.path.abspath(folder)) if is_archive else folder
+        
+        # Inicializa processador
+        processor = CertificateProcessor(output_folder, resume=resume, result_format=result_format,
+                                         archive_path=archive_path, quantize=quantize,
+                                         ocr_threads=ocr_threads, verbose=verbose,
+                                         layout=layout, file_timeout=file_timeout,
+                                         recycle_after=recycle_after, max_rss_mb=max_rss_mb,
+                                         order=order, triage=triage, prefetch=prefetch,
+                                         languages=languages, detect_language=detect_language,
+                                         reader_budget_mb=reader_budget_mb)
+        
+        # Processa todos os PDFs
+        start_time = time.time()
+        try:
+            if is_archive:
+                success_count, fail_count = processor.process_archive(folder, output_archive)
+            else:
+                success_count, fail_count = processor.process_folder(folder)
+        finally:
+            # Salva resultados (mesmo se o processamento for interrompido)
+            processor.save_results()
+        elapsed_time = time.time() - start_time
+        
+        # Gera relatório
+        processor.generate_report()
+        
+        print(f"\n⏱️  Tempo total: {elapsed_time:.2f} segundos")
+        if success_count + fail_count:
+            print(f"⚡ Média: {elapsed_time/(success_count + fail_count):.2f}s por arquivo\n")
+        
+    except Exception as e:
+        print(f"\n❌ Erro crítico: {e}")
+        logging.error(f"Erro crítico na execução: {e}", exc_info=True)
+
+
+# ==============================================================================
+# FUNÇÃO: run_daemon
+# ==============================================================================
+
+def run_daemon(args: argparse.Namespace):
+    """
+    Inicia o modo monitor sobre uma pasta.
+    
+    Args:
+        args: Argumentos do subcomando 'monitorar'
+    """
+    processor = CertificateProcessor(args.pasta, result_format=args.result_format,
+                                     archive_path=None if args.sem_banco else args.banco,
+                                     quantize=not args.sem_quantizacao,
+                                     ocr_threads=args.threads_ocr, verbose=args.verbose,
+                                     layout=args.estrutura,
+                                     file_timeout=None if args.sem_supervisao else args.tempo_limite,
+                                     recycle_after=args.reciclar_apos,
+                                     max_rss_mb=args.limite_memoria_mb,
+                                     triage=not args.sem_triagem, languages=args.idiomas,
+                                     detect_language=args.detectar_idioma,
+                                     reader_budget_mb=args.orcamento_leitores_mb,
+                                     exclusive_renames=True)
+    # O leitor fica carregado à espera dos arquivos: o processo de OCR sobe já e,
+    # por padrão, não é reciclado por contagem (só pelo limite de memória)
+    if processor.ocr_pool:
+        processor.ocr_pool.warm_up()
+    daemon = CertificateDaemon(
+        args.pasta, processor,
+        settle_seconds=args.estabilizacao,
+        poll_interval=args.intervalo,
+        force_polling=args.polling,
+        include_existing=args.incluir_existentes,
+        stats_interval=args.estatisticas
+    )
+    daemon.run()
+
+
+# ==============================================================================
+# FUNÇÃO: run_server
+# ==============================================================================
+
+def run_server(args: argparse.Namespace):
+    """
+    Inicia o serviço HTTP local de extração.
+    
+    Args:
+        args: Argumentos do subcomando 'servir'
+    """
+    os.makedirs(args.logs, exist_ok=True)
+    logger = setup_logging(args.logs, verbose=args.verbose)
+    
+    # Núcleos divididos entre os leitores que rodam em paralelo
+    configure_torch_threads(workers=max(1, args.concorrencia))
+    quantize = not args.sem_quantizacao
+    
+    service = ExtractionService(
+        lambda: OCRExtractor(languages=args.idiomas, quantize=quantize),
+        concurrency=args.concorrencia,
+        max_queue=args.fila_max,
+        max_batch=args.lote_max,
+        batch_window_ms=args.janela_ms,
+        path_root=args.raiz_caminhos,
+        triage=not args.sem_triagem
+    )
+    
+    server = ThreadingHTTPServer((args.host, args.porta), ExtractionRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    
+    logger.info(f"🌐 Serviço de extração em http://{args.host}:{args.porta} "
+                f"(concorrência={args.concorrencia}, lote até {args.lote_max}, janela {args.janela_ms} ms)")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("🛑 Encerrando serviço...")
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+# ==============================================================================
+# FUNÇÕES: run_query / run_search / run_import
+# ==============================================================================
+
+def run_query(args: argparse.Namespace):
+    """
+    Consulta o banco consolidado e imprime os certificados encontrados.
+    
+    Args:
+        args: Argumentos do subcomando 'consultar'
+    """
+    archive = CertificateArchive(args.banco)
+    
+    try:
+        if args.exportar_parquet:
+            archive.export_parquet(args.exportar_parquet)
+            print(f"📦 Parquet exportado em: {args.exportar_parquet}")
+            return
+        
+        start_time = time.perf_counter()
+        rows = archive.query(nome=args.nome, curso=args.curso, ano=args.ano,
+                             cert_id=args.id, limit=args.limite)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        
+        for row in rows:
+            hours = CertificateRecord.parse_hours(row['duracao'])
+            print(f"{row['nome']} | {row['curso']} | {f'{hours}h' if hours else '-'} | "
+                  f"{row['data'] or '-'} | {row['id_certificado'] or '-'} | "
+                  f"{os.path.join(row['pasta'] or '', row['arquivo_novo'] or '')}")
+        
+        print(f"\n🔎 {len(rows)} certificado(s) em {elapsed_ms:.1f} ms")
+    finally:
+        archive.close()
+
+
+def run_search(args: argparse.Namespace):
+    """
+    Busca certificados pelo texto do OCR e imprime os mais relevantes.
+    
+    Args:
+        args: Argumentos do subcomando 'buscar'
+    """
+    index = TextSearchIndex(args.banco)
+    
+    try:
+        start_time = time.perf_counter()
+        rows = index.search(' '.join(args.termos), limit=args.limite)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        
+        for row in rows:
+            print(f"📄 {os.path.join(row['pasta'] or '', row['arquivo'] or '')}")
+            print(f"   {row['trecho']}")
+        
+        print(f"\n🔎 {len(rows)} certificado(s) em {elapsed_ms:.1f} ms")
+    finally:
+        index.close()
+
+
+def run_import(args: argparse.Namespace):
+    """
+    Importa arquivos de resultado de execuções anteriores para o banco.
+    
+    Args:
+        args: Argumentos do subcomando 'importar'
+    """
+    archive = CertificateArchive(args.banco)
+    
+    try:
+        for path in args.arquivos:
+            count = archive.import_results(path)
+            print(f"✅ {count} registros importados de {os.path.basename(path)}")
+        print(f"🗄️  Total no banco: {archive.count()}")
+    finally:
+        archive.close()
+
+
+# ==============================================================================
+# FUNÇÃO: run_organize
+# ==============================================================================
+
+def run_organize(args: argparse.Namespace):
+    """
+    Desfaz ou conclui as renomeações registradas no diário de uma execução.
+    
+    Args:
+        args: Argumentos do subcomando 'organizar'
+    """
+    journal = args.undo if args.undo is not None else args.concluir
+    journal = journal or FileOrganizer.latest_journal(args.pasta)
+    
+    if not journal or not os.path.exists(journal):
+        print(f"❌ Nenhum diário de renomeações encontrado em {args.pasta}")
+        return
+    
+    if args.undo is not None:
+        count = FileOrganizer.undo(journal)
+        print(f"↩️  {count} arquivo(s) restaurado(s) ao nome original ({os.path.basename(journal)})")
+    else:
+        count = FileOrganizer.recover(journal)
+        print(f"🔧 {count} renomeação(ões) pendente(s) concluída(s) ({os.path.basename(journal)})")
+
+
+# ==============================================================================
+# FUNÇÃO: run_queue
+# ==============================================================================
+
+def run_queue_worker(args: argparse.Namespace):
+    """
+    Processa tarefas da fila compartilhada até ela esvaziar.
+    
+    Args:
+        args: Argumentos do subcomando 'fila trabalhar'
+    """
+    work_queue = SharedWorkQueue(args.fila, worker_id=args.id, lease_seconds=args.posse)
+    source = work_queue.source_folder
+    if not source:
+        print(f"❌ Fila vazia ou não inicializada: {args.fila} (use 'fila enfileirar')")
+        return
+    
+    # Banco SQLite não é compartilhado entre hosts: entra no 'fila mesclar'
+    processor = CertificateProcessor(
+        work_queue.results_folder, result_format=args.result_format, archive_path=None,
+        quantize=not args.sem_quantizacao, ocr_threads=args.threads_ocr, verbose=args.verbose,
+        layout=args.estrutura,
+        file_timeout=None if args.sem_supervisao else args.tempo_limite,
+        recycle_after=args.reciclar_apos, max_rss_mb=args.limite_memoria_mb,
+        source_folder=source, triage=not args.sem_triagem, languages=args.idiomas,
+        detect_language=args.detectar_idioma, reader_budget_mb=args.orcamento_leitores_mb,
+        ocr_workers=args.trabalhadores_locais
+    )
+    processor.logger.info(f"🧺 Processo {work_queue.worker_id} na fila {work_queue.queue_dir}")
+    work_queue.start_heartbeat(args.batimento)
+    
+    success_count = fail_count = 0
+    try:
+        while True:
+            task = work_queue.lease()
+            if task is None:
+                # Outros processos ainda trabalham; suas posses podem expirar
+                if work_queue.has_active():
+                    time.sleep(args.batimento)
+                    continue
+                break
+            
+            # Leitura única: a ausência do arquivo aparece na própria leitura, sem stat prévio
+            pdf_path = os.path.join(source, task['arquivo'])
+            try:
+                pdf_bytes = read_pdf(pdf_path)
+            except FileNotFoundError:
+                # Registrado como falha para que 'fila mesclar' conte a tarefa
+                # (um sucesso de outro processo para o mesmo arquivo prevalece)
+                processor._record_failure(task['arquivo'], "Arquivo não está mais na pasta")
+                fail_count += 1
+            except OSError as e:
+                processor._record_failure(task['arquivo'], f"Erro de leitura: {e}")
+                fail_count += 1
+            else:
+                if processor.process_single_pdf(pdf_path, pdf_bytes):
+                    success_count += 1
+                else:
+                    fail_count += 1
+            
+            # Resultado em disco antes de liberar a tarefa
+            processor.writer.sync()
+            work_queue.complete()
+    except KeyboardInterrupt:
+        work_queue.release()
+    finally:
+        work_queue.close()
+        processor.save_results()
+    
+    processor.logger.info(f"🏁 Processo {work_queue.worker_id}: {success_count} sucesso(s), {fail_count} falha(s)")
+
+
+def run_queue(args: argparse.Namespace):
+    """
+    Enfileira, consulta ou mescla a fila compartilhada.
+    
+    Args:
+        args: Argumentos do subcomando 'fila'
+    """
+    if args.fila_command == 'trabalhar':
+        run_queue_worker(args)
+        return
+    
+    work_queue = SharedWorkQueue(args.fila)
+    
+    if args.fila_command == 'enfileirar':
+        added = work_queue.enqueue(args.pasta, order=args.ordem)
+        print(f"✅ {added} tarefa(s) adicionada(s) à fila {work_queue.queue_dir}")
+    
+    elif args.fila_command == 'situacao':
+        counts = work_queue.counts()
+        print(f"📁 Pasta: {work_queue.source_folder or '-'}")
+        print(f"⏳ Pendentes: {counts['pendentes']}")
+        print(f"⚙️  Em andamento: {counts['em_andamento']}")
+        print(f"✅ Concluídas: {counts['concluidos']}")
+    
+    elif args.fila_command == 'mesclar':
+        output_folder = args.saida or work_queue.queue_dir
+        os.makedirs(output_folder, exist_ok=True)
+        writer = ResultWriter(output_folder, fmt=args.result_format)
+        archive = None if args.sem_banco else CertificateArchive(args.banco)
+        try:
+            success_count, fail_count = work_queue.merge(writer, archive)
+        finally:
+            writer.close()
+            if archive:
+                archive.close()
+        
+        print(f"✅ {success_count} sucesso(s) e {fail_count} falha(s) mesclados")
+        for path in writer.paths('processados') + writer.paths('falhas'):
+            print(f"📊 {path}")
+        pending = work_queue.counts()
+        if pending['pendentes'] or pending['em_andamento']:
+            print(f"⚠️  Fila ainda não terminou: {pending['pendentes']} pendente(s), "
+                  f"{pending['em_andamento']} em andamento")
+
+
+# ==============================================================================
+# FUNÇÃO: build_arg_parser
+# ==============================================================================
+
+def parse_languages(value: str) -> List[str]:
+    """
+    Converte a lista de idiomas da linha de comando (ex: 'pt,es,en').
+
+    Args:
+        value: Códigos separados por vírgula
+
+    Returns:
+        Códigos sem repetição, na ordem informada
+    """
+    languages = list(dict.fromkeys(code.strip().lower() for code in value.split(',') if code.strip()))
+    if not languages:
+        raise argparse.ArgumentTypeError("informe ao menos um idioma (ex: pt,en)")
+    return languages
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """
+    Monta o parser da linha de comando.
+    
+    Sem subcomando, o programa roda no modo interativo (seleção de pasta).
+    
+    Returns:
+        Parser configurado
+    """
+    parser = argparse.ArgumentParser(
+        description="Gerenciador de Certificados - extrai dados de certificados PDF via OCR"
+    )
+    subparsers = parser.add_subparsers(dest='command')
+    
+    # Opções comuns aos modos que processam certificados
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-v', '--verbose', action='count', default=0,
+                        help='Detalha cada etapa no log (padrão: uma linha por arquivo)')
+    common.add_argument('--sem-triagem', action='store_true',
+                        help='Reconhece todas as páginas (sem descartar versos em branco e anexos)')
+    common.add_argument('--idiomas', type=parse_languages, default=['pt', 'en'],
+                        help='Idiomas do OCR separados por vírgula (padrão: pt,en)')
+    
+    # Leitores por idioma (detecção e orçamento de memória)
+    readers = argparse.ArgumentParser(add_help=False)
+    readers.add_argument('--detectar-idioma', action='store_true',
+                         help='Detecta o idioma de cada PDF e carrega só os leitores necessários')
+    readers.add_argument('--orcamento-leitores-mb', type=int, default=2048,
+                         help='Memória dos leitores mantidos carregados (padrão: %(default)s)')
+    
+    # Supervisão do OCR (processo separado com tempo limite e reciclagem); um
+    # parser por padrão de reciclagem, já que subparsers compartilham as ações
+    # dos pais e `set_defaults` alteraria todos
+    def supervision_options(recycle_after: int) -> argparse.ArgumentParser:
+        options = argparse.ArgumentParser(add_help=False)
+        options.add_argument('--tempo-limite', type=float, default=300.0,
+                             help='Segundos máximos de OCR por arquivo (padrão: %(default)s)')
+        options.add_argument('--reciclar-apos', type=int, default=recycle_after,
+                             help='Arquivos por processo de OCR antes de reiniciá-lo '
+                                  '(0 = nunca; padrão: %(default)s)')
+        options.add_argument('--limite-memoria-mb', type=int, default=4096,
+                             help='Memória do processo de OCR que força reinício (0 = sem limite)')
+        options.add_argument('--sem-supervisao', action='store_true',
+                             help='Roda o OCR no próprio processo, sem tempo limite')
+        return options
+    
+    supervision = supervision_options(recycle_after=200)
+    
+    # processar: processamento em lote de uma pasta
+    process_parser = subparsers.add_parser('processar', aliases=['process'],
+                                           parents=[common, supervision, readers],
+                                           help='Processa todos os PDFs de uma pasta')
+    process_parser.add_argument('pasta', help='Pasta com os certificados PDF (ou arquivo .zip/.tar)')
+    process_parser.add_argument('--retomar', '--resume', action='store_true', dest='resume',
+                                help='Retoma a execução mais recente, pulando arquivos já gravados')
+    process_parser.add_argument('--formato', '--format', choices=ResultWriter.FORMATS, default='csv',
+                                dest='result_format', help='Formato dos arquivos de resultado')
+    process_parser.add_argument('--banco', default=DEFAULT_ARCHIVE_PATH,
+                                help='Banco SQLite consolidado (padrão: %(default)s)')
+    process_parser.add_argument('--sem-banco', action='store_true',
+                                help='Não atualiza o banco consolidado')
+    process_parser.add_argument('--threads-ocr', type=int,
+                                help='Threads de inferência do PyTorch (padrão: todos os núcleos)')
+    process_parser.add_argument('--sem-quantizacao', action='store_true',
+                                help='Usa os modelos float32 originais em vez de int8')
+    process_parser.add_argument('--estrutura', choices=FileOrganizer.LAYOUTS, default='plana',
+                                help='plana: renomeia no lugar; ano_nome: move para Ano/Nome/')
+    process_parser.add_argument('--ordem', choices=WorkScheduler.ORDERS, default='sjf',
+                                help='sjf: menores primeiro; ljf: maiores primeiro; original: ordem da pasta')
+    process_parser.add_argument('--leitura-antecipada', type=int, default=2, metavar='N',
+                                help='PDFs lidos em segundo plano à frente do OCR (0 = desativa)')
+    process_parser.add_argument('--saida-zip', metavar='ARQUIVO',
+                                help='Entrada compactada: grava cópias renomeadas neste ZIP')
+    process_parser.set_defaults(func=lambda args: run_processing(
+        args.pasta, resume=args.resume, result_format=args.result_format,
+        archive_path=None if args.sem_banco else args.banco,
+        quantize=not args.sem_quantizacao, ocr_threads=args.threads_ocr,
+        verbose=args.verbose, layout=args.estrutura,
+        file_timeout=None if args.sem_supervisao else args.tempo_limite,
+        recycle_after=args.reciclar_apos, max_rss_mb=args.limite_memoria_mb,
+        order=args.ordem, triage=not args.sem_triagem, prefetch=args.leitura_antecipada,
+        output_archive=args.saida_zip, languages=args.idiomas,
+        detect_language=args.detectar_idioma, reader_budget_mb=args.orcamento_leitores_mb
+    ))
+    
+    # monitorar: processo contínuo observando a pasta
+    daemon_parser = subparsers.add_parser('monitorar', aliases=['watch'],
+                                          parents=[common, supervision_options(recycle_after=0), readers],
+                                          help='Monitora a pasta e processa PDFs assim que chegam')
+    daemon_parser.add_argument('pasta', help='Pasta observada')
+    daemon_parser.add_argument('--estabilizacao', type=float, default=3.0,
+                               help='Segundos sem alteração para considerar o arquivo completo')
+    daemon_parser.add_argument('--intervalo', type=float, default=2.0,
+                               help='Intervalo de varredura em segundos (modo polling)')
+    daemon_parser.add_argument('--polling', action='store_true',
+                               help='Força varredura periódica em vez de inotify')
+    daemon_parser.add_argument('--incluir-existentes', action='store_true',
+                               help='Processa também os PDFs já presentes na pasta')
+    daemon_parser.add_argument('--estatisticas', type=float, default=60.0,
+                               help='Intervalo em segundos entre registros de estatísticas')
+    daemon_parser.add_argument('--formato', '--format', choices=ResultWriter.FORMATS, default='csv',
+                               dest='result_format', help='Formato dos arquivos de resultado')
+    daemon_parser.add_argument('--banco', default=DEFAULT_ARCHIVE_PATH, help='Banco SQLite consolidado')
+    daemon_parser.add_argument('--sem-banco', action='store_true',
+                               help='Não atualiza o banco consolidado')
+    daemon_parser.add_argument('--threads-ocr', type=int,
+                               help='Threads de inferência do PyTorch (padrão: todos os núcleos)')
+    daemon_parser.add_argument('--sem-quantizacao', action='store_true',
+                               help='Usa os modelos float32 originais em vez de int8')
+    daemon_parser.add_argument('--estrutura', choices=FileOrganizer.LAYOUTS, default='plana',
+                               help='plana: renomeia no lugar; ano_nome: move para Ano/Nome/')
+    daemon_parser.set_defaults(func=run_daemon)
+    
+    # servir: serviço HTTP local com modelo residente
+    server_parser = subparsers.add_parser('servir', aliases=['serve'], parents=[common],
+                                          help='Inicia serviço HTTP local de extração')
+    server_parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta')
+    server_parser.add_argument('--porta', type=int, default=8765, help='Porta de escuta')
+    server_parser.add_argument('--concorrencia', type=int, default=1,
+                               help='Lotes processados em paralelo (um leitor EasyOCR cada)')
+    server_parser.add_argument('--fila-max', type=int, default=32,
+                               help='Máximo de requisições aguardando (acima disso: HTTP 503)')
+    server_parser.add_argument('--lote-max', type=int, default=4, help='Máximo de requisições por lote')
+    server_parser.add_argument('--janela-ms', type=float, default=50.0,
+                               help='Espera máxima para completar um lote')
+    server_parser.add_argument('--raiz-caminhos',
+                               help='Permite requisições por caminho dentro desta pasta')
+    server_parser.add_argument('--sem-quantizacao', action='store_true',
+                               help='Usa os modelos float32 originais em vez de int8')
+    server_parser.add_argument('--logs', default='.', help='Pasta dos arquivos de log')
+    server_parser.set_defaults(func=run_server)
+    
+    # consultar: busca indexada no banco consolidado
+    query_parser = subparsers.add_parser('consultar', aliases=['query'],
+                                         help='Consulta certificados no banco consolidado')
+    query_parser.add_argument('--nome', help='Prefixo do nome (sem acentos/maiúsculas)')
+    query_parser.add_argument('--curso', help='Prefixo do curso')
+    query_parser.add_argument('--ano', type=int, help='Ano de conclusão')
+    query_parser.add_argument('--id', help='Identificador do certificado (ex: UC-...)')
+    query_parser.add_argument('--limite', type=int, default=100, help='Máximo de resultados')
+    query_parser.add_argument('--exportar-parquet', metavar='ARQUIVO',
+                              help='Exporta todo o banco para Parquet (requer pyarrow)')
+    query_parser.add_argument('--banco', default=DEFAULT_ARCHIVE_PATH, help='Banco SQLite consolidado')
+    query_parser.set_defaults(func=run_query)
+    
+    # buscar: busca textual (FTS5) no texto do OCR
+    search_parser = subparsers.add_parser('buscar', aliases=['search'],
+                                          help='Busca certificados por qualquer termo do texto')
+    search_parser.add_argument('termos', nargs='+', help='Termos (todos obrigatórios; "termo*" = prefixo)')
+    search_parser.add_argument('--limite', type=int, default=20, help='Máximo de resultados')
+    search_parser.add_argument('--banco', default=DEFAULT_ARCHIVE_PATH, help='Banco SQLite consolidado')
+    search_parser.set_defaults(func=run_search)
+    
+    # importar: carrega CSV/JSONL de execuções anteriores
+    import_parser = subparsers.add_parser('importar', aliases=['import'],
+                                          help='Importa resultados antigos para o banco consolidado')
+    import_parser.add_argument('arquivos', nargs='+', help='Arquivos certificados_processados_*.csv/.jsonl')
+    import_parser.add_argument('--banco', default=DEFAULT_ARCHIVE_PATH, help='Banco SQLite consolidado')
+    import_parser.set_defaults(func=run_import)
+    
+    # organizar: desfaz ou conclui renomeações a partir do diário
+    organize_parser = subparsers.add_parser('organizar', aliases=['organize'],
+                                            help='Desfaz ou conclui renomeações de uma execução')
+    organize_parser.add_argument('pasta', help='Pasta processada')
+    organize_action = organize_parser.add_mutually_exclusive_group(required=True)
+    organize_action.add_argument('--desfazer', '--undo', nargs='?', const='', metavar='DIARIO',
+                                 dest='undo', help='Restaura os nomes originais (padrão: diário mais recente)')
+    organize_action.add_argument('--concluir', nargs='?', const='', metavar='DIARIO',
+                                 help='Conclui lotes interrompidos (padrão: diário mais recente)')
+    organize_parser.set_defaults(func=run_organize)
+    
+    # fila: processamento distribuído por uma pasta compartilhada
+    queue_parser = subparsers.add_parser('fila', aliases=['queue'],
+                                         help='Processamento distribuído por uma pasta compartilhada')
+    queue_commands = queue_parser.add_subparsers(dest='fila_command', required=True)
+    
+    enqueue_parser = queue_commands.add_parser('enfileirar', help='Cria tarefas para os PDFs de uma pasta')
+    enqueue_parser.add_argument('fila', help='Pasta compartilhada da fila')
+    enqueue_parser.add_argument('pasta', help='Pasta com os certificados PDF')
+    enqueue_parser.add_argument('--ordem', choices=WorkScheduler.ORDERS, default='ljf',
+                                help='Ordem de distribuição (padrão: maiores primeiro)')
+    
+    worker_parser = queue_commands.add_parser('trabalhar', parents=[common, supervision, readers],
+                                              help='Processa tarefas da fila até ela esvaziar')
+    worker_parser.add_argument('fila', help='Pasta compartilhada da fila')
+    worker_parser.add_argument('--id', help='Nome deste processo (padrão: host-pid)')
+    worker_parser.add_argument('--posse', type=float, default=600.0,
+                               help='Segundos sem batimento até outro processo assumir a tarefa')
+    worker_parser.add_argument('--batimento', type=float, default=30.0,
+                               help='Intervalo em segundos entre batimentos')
+    worker_parser.add_argument('--formato', '--format', choices=ResultWriter.FORMATS, default='csv',
+                               dest='result_format', help='Formato dos arquivos de resultado')
+    worker_parser.add_argument('--threads-ocr', type=int,
+                               help='Threads de inferência do PyTorch (padrão: núcleos / trabalhadores locais)')
+    worker_parser.add_argument('--trabalhadores-locais', type=int, default=1, metavar='N',
+                               help='Processos da fila rodando nesta máquina (divide os núcleos entre eles)')
+    worker_parser.add_argument('--sem-quantizacao', action='store_true',
+                               help='Usa os modelos float32 originais em vez de int8')
+    worker_parser.add_argument('--estrutura', choices=FileOrganizer.LAYOUTS, default='plana',
+                               help='plana: renomeia no lugar; ano_nome: move para Ano/Nome/')
+    
+    status_parser = queue_commands.add_parser('situacao', help='Mostra o andamento da fila')
+    status_parser.add_argument('fila', help='Pasta compartilhada da fila')
+    
+    merge_parser = queue_commands.add_parser('mesclar', help='Junta os resultados de todos os processos')
+    merge_parser.add_argument('fila', help='Pasta compartilhada da fila')
+    merge_parser.add_argument('--saida', help='Pasta do resultado consolidado (padrão: a da fila)')
+    merge_parser.add_argument('--formato', '--format', choices=ResultWriter.FORMATS, default='csv',
+                              dest='result_format', help='Formato do resultado consolidado')
+    merge_parser.add_argument('--banco', default=DEFAULT_ARCHIVE_PATH, help='Banco SQLite consolidado')
+    merge_parser.add_argument('--sem-banco', action='store_true',
+                              help='Não atualiza o banco consolidado')
+    queue_parser.set_defaults(func=run_queue)
+    
+    return parser
+
+
+# ==============================================================================
+# FUNÇÃO: interactive
+# ==============================================================================
+
+def interactive():
+    """
+    Modo interativo: apresenta o programa e pede a pasta via diálogo.
     """
     print("=" * 70)
     print("       GERENCIADOR DE CERTIFICADOS v3.0")
@@ -1026,27 +2422,7 @@ def main():
     
     print(f"\n✅ Pasta selecionada: {folder}\n")
     
-    try:
-        # Inicializa processador
-        processor = CertificateProcessor(folder)
-        
-        # Processa todos os PDFs
-        start_time = time.time()
-        success_count, fail_count = processor.process_folder(folder)
-        elapsed_time = time.time() - start_time
-        
-        # Salva resultados
-        processor.save_results()
-        
-        # Gera relatório
-        processor.generate_report(success_count, fail_count)
-        
-        print(f"\n⏱️  Tempo total: {elapsed_time:.2f} segundos")
-        print(f"⚡ Média: {elapsed_time/(success_count + fail_count):.2f}s por arquivo\n")
-        
-    except Exception as e:
-        print(f"\n❌ Erro crítico: {e}")
-        logging.error(f"Erro crítico na execução: {e}", exc_info=True)
+    run_processing(folder)
     
     print("\n" + "=" * 70)
     print("       PROCESSAMENTO CONCLUÍDO!")
@@ -1054,9 +2430,30 @@ def main():
     input("\nPressione ENTER para sair...")
 
 
+# ==============================================================================
+# FUNÇÃO PRINCIPAL: main
+# ==============================================================================
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Função principal do programa.
+    
+    Args:
+        argv: Argumentos da linha de comando (padrão: sys.argv)
+    """
+    args = build_arg_parser().parse_args(argv)
+    
+    if args.command is None:
+        interactive()
+    else:
+        args.func(args)
+
+
 # ==============================================================================
 # PONTO DE ENTRADA
 # ==============================================================================
 
 if __name__ == "__main__":
+    # Necessário para os processos de OCR no executável (PyInstaller)
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,381 @@
+"""
+Organização de Arquivos - Gerenciador de Certificados
+Descrição: Planejamento e aplicação em lote das renomeações, com diário para
+          desfazer ou concluir execuções interrompidas.
+"""
+
+import os
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from records import CertificateRecord, TextNormalizer
+
+
+# ==============================================================================
+# CLASSE: FileOrganizer
+# ==============================================================================
+
+class FileOrganizer:
+    """
+    Planeja e aplica renomeações/movimentações em lote, com diário para desfazer.
+
+    Os nomes existentes de cada pasta de destino são lidos uma única vez
+    (um `scandir` por pasta) e mantidos em um índice em memória; colisões são
+    resolvidas no índice com um contador por nome base, sem `os.path.exists`
+    em laço (importante em compartilhamentos de rede). Cada lote é gravado no
+    diário antes de ser aplicado; se uma operação falhar, as anteriores do lote
+    são revertidas. O diário permite desfazer a execução inteira depois.
+    """
+
+    LAYOUTS = ('plana', 'ano_nome')
+
+    def __init__(self, base_folder: str, layout: str = 'plana',
+                 run_id: Optional[str] = None, journal_folder: Optional[str] = None,
+                 exclusive: bool = False):
+        """
+        Inicializa o organizador.
+
+        Args:
+            base_folder: Pasta base dos certificados
+            layout: 'plana' (renomeia no lugar) ou 'ano_nome' (move para Ano/Nome/)
+            run_id: Identificador da execução (nome do diário)
+            journal_folder: Pasta do diário (padrão: pasta base)
+            exclusive: Nunca sobrescreve um destino criado por outro processo
+                (vários processos organizando a mesma pasta)
+        """
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"Estrutura inválida: {layout} (use {', '.join(self.LAYOUTS)})")
+
+        self.base_folder = os.path.abspath(base_folder)
+        self.layout = layout
+        self.exclusive = exclusive
+        self.logger = logging.getLogger(__name__)
+
+        run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.journal_path = os.path.join(os.path.abspath(journal_folder or base_folder),
+                                         f'organizacao_{run_id}.journal.jsonl')
+        self._journal = None
+        # Execução retomada continua a numeração de lotes do diário existente
+        self._batch = 0
+        if os.path.exists(self.journal_path):
+            operations, done = self._read_journal(self.journal_path)
+            batches = [entry['lote'] for entry in operations] + list(done)
+            self._batch = max(batches) + 1 if batches else 0
+
+        # Índice: pasta -> nomes existentes/reservados (minúsculas, como no Windows/SMB)
+        self._names: Dict[str, set] = {}
+        # Próximo contador a testar por (pasta, nome base)
+        self._counters: Dict[Tuple[str, str], int] = {}
+        # Operações planejadas e ainda não aplicadas: (origem, destino)
+        self.pending: List[Tuple[str, str]] = []
+
+    def _dir_names(self, folder: str) -> set:
+        """Nomes da pasta, listados uma única vez e depois mantidos no índice."""
+        names = self._names.get(folder)
+        if names is None:
+            names = set()
+            try:
+                with os.scandir(folder) as it:
+                    names = {entry.name.lower() for entry in it}
+            except FileNotFoundError:
+                pass  # Pasta será criada na aplicação
+            self._names[folder] = names
+        return names
+
+    @classmethod
+    def relative_target(cls, data: Dict, layout: str = 'plana') -> Tuple[List[str], str]:
+        """
+        Calcula subpastas e nome base de destino, independente da pasta base.
+
+        Args:
+            data: Dados extraídos
+            layout: 'plana' ou 'ano_nome'
+
+        Returns:
+            Tupla (subpastas, nome sem extensão); subpastas vazias na estrutura plana
+        """
+        nome = TextNormalizer.clean_for_filename(data.get('nome') or 'Desconhecido')
+        curso = TextNormalizer.clean_for_filename(data.get('curso') or 'Curso', max_length=50)
+        year = cls.extract_year(data.get('data'))
+
+        parts = [year, nome] if layout == 'ano_nome' else []
+        return parts, f"{nome} - {curso} - {year}"
+
+    def target(self, data: Dict) -> Tuple[str, str]:
+        """
+        Calcula pasta e nome base de destino para os dados de um certificado.
+
+        Args:
+            data: Dados extraídos
+
+        Returns:
+            Tupla (pasta de destino, nome sem extensão)
+        """
+        parts, base = self.relative_target(data, self.layout)
+        return os.path.join(self.base_folder, *parts), base
+
+    @staticmethod
+    def extract_year(date_value) -> str:
+        """
+        Extrai ano da data.
+
+        Args:
+            date_value: Data (ISO, texto ou `datetime.date`)
+
+        Returns:
+            Ano como string ou ano atual
+        """
+        year = CertificateRecord.parse_year(date_value)
+        return str(year or datetime.now().year)
+
+    def plan(self, source_path: str, data: Dict, refresh: bool = False) -> str:
+        """
+        Reserva o nome de destino de um arquivo e agenda a operação.
+
+        Args:
+            source_path: Caminho atual do arquivo
+            data: Dados extraídos
+            refresh: Relê a pasta de destino (quando outros processos podem
+                ter criado arquivos nela desde a última leitura)
+
+        Returns:
+            Caminho de destino reservado
+        """
+        source_path = os.path.abspath(source_path)
+        source_dir, source_name = os.path.split(source_path)
+        folder, base = self.target(data)
+        if refresh:
+            self._names.pop(folder, None)
+
+        # O nome de origem fica livre (operações são aplicadas na ordem do plano)
+        self._dir_names(source_dir).discard(source_name.lower())
+
+        names = self._dir_names(folder)
+        candidate = f"{base}.pdf"
+        if candidate.lower() in names:
+            key = (folder, base.lower())
+            counter = self._counters.get(key, 1)
+            while f"{base} ({counter}).pdf".lower() in names:
+                counter += 1
+            candidate = f"{base} ({counter}).pdf"
+            self._counters[key] = counter + 1
+
+        names.add(candidate.lower())
+        dest_path = os.path.join(folder, candidate)
+
+        if dest_path != source_path:
+            self.pending.append((source_path, dest_path))
+            self._journal_write({'op': 'mover', 'lote': self._batch,
+                                 'origem': source_path, 'destino': dest_path})
+
+        return dest_path
+
+    def _journal_write(self, entry: Dict, sync: bool = False):
+        """Anexa uma linha ao diário (fsync apenas nos marcos de lote)."""
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._journal.flush()
+        if sync:
+            os.fsync(self._journal.fileno())
+
+    def apply(self) -> int:
+        """
+        Aplica o lote planejado (tudo ou nada).
+
+        Returns:
+            Número de arquivos movidos
+
+        Raises:
+            OSError: Se uma operação falhar (o lote é revertido antes)
+        """
+        if not self.pending:
+            return 0
+
+        batch, self.pending = self.pending, []
+        # Plano persistido antes de tocar nos arquivos
+        self._journal_write({'op': 'aplicar', 'lote': self._batch, 'total': len(batch)}, sync=True)
+
+        created_dirs = set()
+        applied: List[Tuple[str, str]] = []
+        try:
+            for source, dest in batch:
+                dest_dir = os.path.dirname(dest)
+                if dest_dir != self.base_folder and dest_dir not in created_dirs:
+                    os.makedirs(dest_dir, exist_ok=True)
+                    created_dirs.add(dest_dir)
+                self._move(source, dest)
+                applied.append((source, dest))
+        except OSError as e:
+            # Colisão com outro processo é esperada no modo exclusivo (o chamador tenta de novo)
+            log = self.logger.debug if self.exclusive and isinstance(e, FileExistsError) else self.logger.error
+            log(f"❌ Falha ao organizar ({e}); revertendo {len(applied)} operação(ões) do lote")
+            for source, dest in reversed(applied):
+                try:
+                    os.rename(dest, source)
+                except OSError as undo_error:
+                    self.logger.error(f"❌ Não foi possível reverter {dest}: {undo_error}")
+            # Sem marca de conclusão: `--retomar` (ou `organizar --concluir`) tenta de novo
+            self._journal_write({'op': 'revertido', 'lote': self._batch}, sync=True)
+            self._batch += 1
+            # Índice pode estar inconsistente: relê as pastas na próxima consulta
+            self._names.clear()
+            raise
+
+        self._journal_write({'op': 'concluido', 'lote': self._batch}, sync=True)
+        self._batch += 1
+        self.logger.debug(f"📦 Lote de organização aplicado: {len(applied)} arquivo(s)")
+        return len(applied)
+
+    def _move(self, source: str, dest: str):
+        """
+        Move um arquivo; no modo exclusivo falha se o destino já existir.
+
+        Raises:
+            FileExistsError: Destino criado por outro processo (modo exclusivo)
+        """
+        if not self.exclusive:
+            os.rename(source, dest)
+            return
+
+        # link + unlink é atômico e não substitui o destino (inclusive em NFS)
+        try:
+            os.link(source, dest)
+        except FileExistsError:
+            raise
+        except OSError:
+            # Sistema de arquivos sem hard links (ex: SMB)
+            if os.path.exists(dest):
+                raise FileExistsError(dest)
+            os.rename(source, dest)
+            return
+        os.unlink(source)
+
+    def close(self):
+        """Fecha o diário."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    @staticmethod
+    def _read_journal(journal_path: str) -> Tuple[List[Dict], set]:
+        """Lê um diário: operações planejadas e lotes concluídos."""
+        operations, done = [], set()
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Linha truncada por queda
+                if entry.get('op') == 'mover':
+                    operations.append(entry)
+                elif entry.get('op') == 'concluido':
+                    done.add(entry['lote'])
+        return operations, done
+
+    @staticmethod
+    def latest_journal(folder: str) -> Optional[str]:
+        """
+        Localiza o diário mais recente de uma pasta.
+
+        Args:
+            folder: Pasta base
+
+        Returns:
+            Caminho do diário ou None
+        """
+        journals = sorted(
+            name for name in os.listdir(folder)
+            if name.startswith('organizacao_') and name.endswith('.journal.jsonl')
+        )
+        return os.path.join(folder, journals[-1]) if journals else None
+
+    @classmethod
+    def journal_destinations(cls, folder: str) -> set:
+        """
+        Destinos planejados em todos os diários de uma pasta.
+
+        Args:
+            folder: Pasta com os diários
+
+        Returns:
+            Caminhos absolutos de destino
+        """
+        destinations = set()
+        for name in os.listdir(folder):
+            if name.startswith('organizacao_') and name.endswith('.journal.jsonl'):
+                operations, _ = cls._read_journal(os.path.join(folder, name))
+                destinations.update(entry['destino'] for entry in operations)
+        return destinations
+
+    @classmethod
+    def undo(cls, journal_path: str) -> int:
+        """
+        Desfaz todas as operações aplicadas de um diário, em ordem reversa.
+
+        Operações não aplicadas ou já desfeitas (destino ausente ou origem
+        presente) são ignoradas, então desfazer duas vezes é seguro.
+
+        Args:
+            journal_path: Caminho do diário
+
+        Returns:
+            Número de arquivos restaurados
+        """
+        operations, _ = cls._read_journal(journal_path)
+
+        restored = 0
+        for entry in reversed(operations):
+            source, dest = entry['origem'], entry['destino']
+            if os.path.exists(dest) and not os.path.exists(source):
+                os.makedirs(os.path.dirname(source), exist_ok=True)
+                os.rename(dest, source)
+                restored += 1
+
+                # Remove pastas Ano/Nome que ficaram vazias
+                for folder in (os.path.dirname(dest), os.path.dirname(os.path.dirname(dest))):
+                    try:
+                        os.rmdir(folder)
+                    except OSError:
+                        break
+
+        with open(journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'op': 'desfeito', 'em': datetime.now().isoformat()}) + '\n')
+
+        return restored
+
+    @classmethod
+    def recover(cls, journal_path: str) -> int:
+        """
+        Conclui lotes planejados mas não concluídos (queda ou lote revertido).
+
+        Args:
+            journal_path: Caminho do diário
+
+        Returns:
+            Número de arquivos movidos
+        """
+        operations, done = cls._read_journal(journal_path)
+
+        moved = 0
+        recovered = set()
+        for entry in operations:
+            if entry['lote'] in done:
+                continue
+            source, dest = entry['origem'], entry['destino']
+            if os.path.exists(source) and not os.path.exists(dest):
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                os.rename(source, dest)
+                moved += 1
+            recovered.add(entry['lote'])
+
+        if recovered:
+            with open(journal_path, 'a', encoding='utf-8') as f:
+                for batch in sorted(recovered):
+                    f.write(json.dumps({'op': 'concluido', 'lote': batch, 'recuperado': True}) + '\n')
+
+        if moved:
+            logging.getLogger(__name__).info(f"🔧 {moved} renomeação(ões) pendente(s) concluída(s)")
+        return moved
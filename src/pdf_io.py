@@ -0,0 +1,287 @@
+"""
+Leitura de PDFs - Gerenciador de Certificados
+Descrição: Leitura única de cada PDF, leitura antecipada em segundo plano,
+          entrada ZIP/TAR sem extração e ZIP de saída com cópias renomeadas.
+"""
+
+import os
+import queue
+import tarfile
+import zipfile
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from organizer import FileOrganizer
+
+
+# ==============================================================================
+# CLASSE: PdfPrefetcher (leitura única dos PDFs)
+# ==============================================================================
+
+def read_pdf(pdf_path: str) -> bytes:
+    """
+    Lê um PDF inteiro em memória com uma única leitura sequencial.
+
+    Hash, sondagem da camada de texto, contagem de páginas e renderização
+    trabalham sobre esse buffer, sem voltar ao disco (ou à rede).
+
+    Args:
+        pdf_path: Caminho do PDF
+
+    Returns:
+        Conteúdo do arquivo
+    """
+    with open(pdf_path, 'rb', buffering=0) as f:
+        return f.readall()
+
+
+class PdfPrefetcher:
+    """
+    Lê antecipadamente os próximos PDFs em uma thread de fundo.
+
+    Enquanto um arquivo está no OCR, os seguintes já estão sendo trazidos do
+    compartilhamento de rede (ou descompactados de um ZIP/TAR), escondendo a
+    latência de E/S. A fila é limitada, então no máximo `depth` arquivos
+    ficam em memória à frente.
+    """
+
+    # Marca de fim da fonte
+    _END = object()
+
+    def __init__(self, source: Iterable, depth: int = 2):
+        """
+        Inicia a leitura antecipada.
+
+        Args:
+            source: Caminhos dos PDFs ou itens (nome, conteúdo, erro) já
+                produzidos por um leitor (ex: membros de um arquivo compactado),
+                na ordem em que serão consumidos
+            depth: Arquivos lidos à frente do consumidor
+        """
+        self.source = source
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._reader, name='leitura-antecipada', daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _load(item) -> Tuple[str, Optional[bytes], Optional[BaseException]]:
+        """Lê um caminho; itens já lidos passam direto."""
+        if not isinstance(item, str):
+            return item
+        try:
+            return item, read_pdf(item), None
+        except OSError as e:
+            return item, None, e
+
+    def _put(self, item) -> bool:
+        """Espera o consumidor, mas desiste se a iteração foi interrompida."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _reader(self):
+        """Lê os arquivos em ordem e os entrega na fila."""
+        try:
+            for item in self.source:
+                if not self._put(self._load(item)):
+                    return
+        except Exception as e:
+            # Fonte corrompida (ex: arquivo compactado truncado): repassada ao consumidor
+            self._error = e
+        self._put(self._END)
+
+    def __iter__(self):
+        """
+        Produz (nome, conteúdo, erro) na ordem original.
+
+        O conteúdo é None (e o erro preenchido) quando a leitura falhou.
+
+        Raises:
+            Exception: Erro da fonte que interrompeu a leitura
+        """
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._END:
+                    break
+                yield item
+            if self._error is not None:
+                raise self._error
+        finally:
+            self.close()
+
+    def close(self):
+        """Interrompe a leitura antecipada."""
+        self._stop.set()
+
+
+# ==============================================================================
+# CLASSE: ArchiveReader (entrada ZIP/TAR)
+# ==============================================================================
+
+class ArchiveReader:
+    """
+    Lê os PDFs de dentro de um arquivo ZIP ou TAR sem extraí-los para o disco.
+
+    Cada membro é descompactado direto para a memória, um de cada vez, e segue
+    para o OCR como buffer. O TAR é lido em fluxo (também funciona com
+    .tar.gz/.tar.bz2/.tar.xz); o ZIP é percorrido pelo diretório central. O
+    espaço em disco usado independe do tamanho do arquivo compactado.
+    """
+
+    EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+    # Membros maiores que isso não são carregados em memória
+    MAX_MEMBER_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, archive_path: str):
+        """
+        Abre o arquivo compactado.
+
+        Args:
+            archive_path: Caminho do .zip ou .tar[.gz|.bz2|.xz]
+
+        Raises:
+            ValueError: Se o arquivo não for ZIP nem TAR
+        """
+        self.archive_path = archive_path
+        if zipfile.is_zipfile(archive_path):
+            self.kind = 'zip'
+        elif tarfile.is_tarfile(archive_path):
+            self.kind = 'tar'
+        else:
+            raise ValueError(f"Arquivo compactado não suportado: {archive_path}")
+
+    @classmethod
+    def is_archive(cls, path: str) -> bool:
+        """Indica se o caminho é um arquivo compactado suportado (pela extensão)."""
+        return os.path.isfile(path) and path.lower().endswith(cls.EXTENSIONS)
+
+    @staticmethod
+    def _wanted(name: str) -> bool:
+        """PDFs, ignorando metadados do macOS."""
+        return name.lower().endswith('.pdf') and not name.startswith('__MACOSX/')
+
+    def _too_large(self, name: str, size: int):
+        """Erro para membros acima do limite de memória."""
+        return name, None, ValueError(
+            f"Membro com {size / (1024 * 1024):.0f} MB excede o limite de "
+            f"{self.MAX_MEMBER_BYTES // (1024 * 1024)} MB"
+        )
+
+    def members(self):
+        """
+        Produz os PDFs do arquivo compactado.
+
+        Yields:
+            Tupla (caminho do membro, conteúdo, erro); conteúdo None quando o
+            membro não pôde ser lido (erro de CRC, criptografia, tamanho)
+        """
+        if self.kind == 'zip':
+            with zipfile.ZipFile(self.archive_path) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or not self._wanted(info.filename):
+                        continue
+                    if info.file_size > self.MAX_MEMBER_BYTES:
+                        yield self._too_large(info.filename, info.file_size)
+                        continue
+                    try:
+                        yield info.filename, archive.read(info), None
+                    except (zipfile.BadZipFile, RuntimeError, OSError) as e:
+                        yield info.filename, None, e
+            return
+
+        # Modo fluxo ('r|*'): sem busca para trás, descompressão sequencial
+        with tarfile.open(self.archive_path, 'r|*') as archive:
+            for info in archive:
+                if not info.isfile() or not self._wanted(info.name):
+                    continue
+                if info.size > self.MAX_MEMBER_BYTES:
+                    yield self._too_large(info.name, info.size)
+                    continue
+                yield info.name, archive.extractfile(info).read(), None
+
+
+# ==============================================================================
+# CLASSE: RenamedArchiveWriter (saída ZIP com os nomes organizados)
+# ==============================================================================
+
+class RenamedArchiveWriter:
+    """
+    Grava cópias renomeadas dos certificados em um novo arquivo ZIP.
+
+    Usado com entradas compactadas: em vez de renomear arquivos em disco, cada
+    PDF é gravado no ZIP de saída com o nome gerado pelos dados extraídos
+    (mesma regra e estrutura do `FileOrganizer`). O ZIP é montado em um
+    arquivo temporário e só assume o nome final quando completo; em uma
+    execução retomada os membros já processados são copiados de novo da
+    entrada, com o nome gravado, para que o ZIP final tenha todos eles.
+    """
+
+    def __init__(self, output_path: str, layout: str = 'plana'):
+        """
+        Cria o arquivo de saída.
+
+        Args:
+            output_path: Caminho do .zip a gerar
+            layout: 'plana' ou 'ano_nome' (pastas Ano/Nome/ dentro do ZIP)
+        """
+        if layout not in FileOrganizer.LAYOUTS:
+            raise ValueError(f"Estrutura inválida: {layout} (use {', '.join(FileOrganizer.LAYOUTS)})")
+
+        self.output_path = output_path
+        self.layout = layout
+        self.count = 0
+        self._names: set = set()
+        self._counters: Dict[str, int] = {}
+        self._partial_path = output_path + '.parcial'
+        # PDFs já são comprimidos: armazenar sem compressão poupa CPU
+        self._zip = zipfile.ZipFile(self._partial_path, 'w', zipfile.ZIP_STORED, allowZip64=True)
+
+    def add(self, data: Dict, pdf_bytes: bytes, name: Optional[str] = None) -> str:
+        """
+        Grava um certificado com o nome derivado dos dados.
+
+        Args:
+            data: Dados extraídos
+            pdf_bytes: Conteúdo do PDF
+            name: Nome já atribuído em uma execução anterior (retomada); é
+                mantido se ainda estiver livre
+
+        Returns:
+            Caminho do membro no ZIP de saída
+        """
+        if name and name.lower() not in self._names:
+            self._names.add(name.lower())
+            self._zip.writestr(name, pdf_bytes)
+            self.count += 1
+            return name
+
+        parts, base = FileOrganizer.relative_target(data, self.layout)
+        stem = '/'.join(parts + [base])
+
+        name = f"{stem}.pdf"
+        if name.lower() in self._names:
+            counter = self._counters.get(stem.lower(), 1)
+            while f"{stem} ({counter}).pdf".lower() in self._names:
+                counter += 1
+            name = f"{stem} ({counter}).pdf"
+            self._counters[stem.lower()] = counter + 1
+
+        self._names.add(name.lower())
+        self._zip.writestr(name, pdf_bytes)
+        self.count += 1
+        return name
+
+    def close(self):
+        """Finaliza o ZIP (diretório central) e o move para o nome definitivo."""
+        if self._zip is None:
+            return
+        self._zip.close()
+        self._zip = None
+        os.replace(self._partial_path, self.output_path)
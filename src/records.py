@@ -0,0 +1,588 @@
+"""
+Registros de Resultado - Gerenciador de Certificados
+Descrição: Normalização de texto, registro tipado de certificado, agregados
+          da execução e gravação em fluxo dos resultados (CSV/JSONL).
+          Não depende da pilha de OCR.
+"""
+
+import os
+import re
+import csv
+import sys
+import json
+import logging
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import ClassVar, Dict, List, Optional, Tuple
+
+
+# ==============================================================================
+# CLASSE: TextNormalizer
+# ==============================================================================
+
+class TextNormalizer:
+    """
+    Normaliza e limpa texto extraído por OCR.
+    """
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normaliza texto removendo problemas comuns de OCR.
+        
+        Args:
+            text: Texto bruto do OCR
+            
+        Returns:
+            Texto normalizado
+        """
+        if not text:
+            return ""
+        
+        # Remove espaços extras e quebras de linha múltiplas
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'\n+', '\n', text)
+        
+        # Remove caracteres especiais problemáticos mas mantém acentos
+        text = re.sub(r'[^\w\sÀ-ÿ\-:,./]', '', text)
+        
+        # Normaliza pontuação
+        text = re.sub(r'\s*([,.:;])\s*', r'\1 ', text)
+        
+        # Remove espaços no início e fim
+        text = text.strip()
+        
+        return text
+    
+    @staticmethod
+    def clean_for_filename(text: str, max_length: int = 100) -> str:
+        """
+        Limpa texto para uso em nomes de arquivo.
+        
+        Args:
+            text: Texto a ser limpo
+            max_length: Comprimento máximo do nome
+            
+        Returns:
+            Texto seguro para nome de arquivo
+        """
+        if not text:
+            return "Desconhecido"
+        
+        # Remove/substitui caracteres inválidos para arquivos
+        text = re.sub(r'[<>:"/\\|?*]', '', text)
+        text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', text)
+        
+        # Remove espaços extras
+        text = re.sub(r'\s+', ' ', text).strip()
+        
+        # Limita comprimento
+        if len(text) > max_length:
+            text = text[:max_length].strip()
+        
+        return text or "Desconhecido"
+    
+    @staticmethod
+    def fold_for_search(text: Optional[str]) -> str:
+        """
+        Gera forma canônica para busca: minúsculas, sem acentos e espaços simples.
+        
+        Args:
+            text: Texto original
+            
+        Returns:
+            Texto normalizado para comparação ("José Conceição" -> "jose conceicao")
+        """
+        if not text:
+            return ""
+        
+        decomposed = unicodedata.normalize('NFKD', text)
+        text = ''.join(c for c in decomposed if not unicodedata.combining(c))
+        
+        return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+# ==============================================================================
+# CLASSE: CertificateRecord (registro tipado de resultado)
+# ==============================================================================
+
+@dataclass(slots=True)
+class CertificateRecord:
+    """
+    Resultado de um certificado com tipos normalizados.
+
+    A data é um `datetime.date` (gravada em ISO, AAAA-MM-DD) e a duração um
+    inteiro de horas. Com `__slots__` e valores nativos cada registro ocupa
+    uma fração de um dicionário de strings, o que importa onde muitos ficam
+    em memória (ex: `fila mesclar`).
+    """
+
+    nome: Optional[str] = None
+    curso: Optional[str] = None
+    duracao: Optional[int] = None
+    data: Optional[date] = None
+    id_certificado: Optional[str] = None
+    emissor: Optional[str] = None
+    status: Optional[str] = None
+    arquivo_original: Optional[str] = None
+    arquivo_novo: Optional[str] = None
+    processado_em: Optional[str] = None
+    # Texto original da data quando não foi possível interpretá-la
+    data_texto: Optional[str] = None
+
+    # Tabela de meses pré-calculada (português e inglês, sem acentos)
+    MONTHS: ClassVar[Dict[str, int]] = {
+        name: number
+        for number, names in enumerate([
+            ('janeiro', 'jan', 'january'),
+            ('fevereiro', 'fev', 'february', 'feb'),
+            ('marco', 'mar', 'march'),
+            ('abril', 'abr', 'april', 'apr'),
+            ('maio', 'mai', 'may'),
+            ('junho', 'jun', 'june'),
+            ('julho', 'jul', 'july'),
+            ('agosto', 'ago', 'august', 'aug'),
+            ('setembro', 'set', 'september', 'sep', 'sept'),
+            ('outubro', 'out', 'october', 'oct'),
+            ('novembro', 'nov', 'november'),
+            ('dezembro', 'dez', 'december', 'dec'),
+        ], 1)
+        for name in names
+    }
+
+    _ISO_RE: ClassVar = re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b')
+    _NUMERIC_RE: ClassVar = re.compile(r'\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})\b')
+    _DAY_MONTH_RE: ClassVar = re.compile(r'\b(\d{1,2})(?:st|nd|rd|th)?\s+(?:de\s+)?([a-z]+)\.?,?\s+(?:de\s+)?(\d{4})\b')
+    _MONTH_DAY_RE: ClassVar = re.compile(r'\b([a-z]+)\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})\b')
+    _HOURS_RE: ClassVar = re.compile(r'\d+')
+    _YEAR_RE: ClassVar = re.compile(r'\b(?:19|20)\d{2}\b')
+
+    @classmethod
+    def parse_date(cls, value) -> Optional[date]:
+        """
+        Converte uma data de certificado em `datetime.date`.
+
+        Aceita "27 de Maio de 2025", "May 27, 2025", "27 May 2025",
+        "27/05/2025" (dia primeiro) e ISO.
+
+        Args:
+            value: Texto da data (ou uma data)
+
+        Returns:
+            Data ou None se não for reconhecida
+        """
+        if isinstance(value, date) or not value:
+            return value or None
+
+        text = TextNormalizer.fold_for_search(str(value))
+        match = cls._ISO_RE.search(text)
+        if match:
+            year, month, day = (int(g) for g in match.groups())
+        else:
+            match = cls._NUMERIC_RE.search(text)
+            if match:
+                day, month, year = (int(g) for g in match.groups())
+            else:
+                match = cls._DAY_MONTH_RE.search(text)
+                if match and match.group(2) in cls.MONTHS:
+                    day, month, year = int(match.group(1)), cls.MONTHS[match.group(2)], int(match.group(3))
+                else:
+                    match = cls._MONTH_DAY_RE.search(text)
+                    if not match or match.group(1) not in cls.MONTHS:
+                        return None
+                    day, month, year = int(match.group(2)), cls.MONTHS[match.group(1)], int(match.group(3))
+
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return None
+
+    @classmethod
+    def parse_hours(cls, value) -> Optional[int]:
+        """
+        Converte uma duração ("141h", "141", 141) em horas inteiras.
+
+        Args:
+            value: Duração em texto ou número
+
+        Returns:
+            Horas (1-999) ou None
+        """
+        if isinstance(value, bool):
+            # bool é subclasse de int: True não é "1 hora"
+            return None
+        if isinstance(value, int):
+            hours = value
+        else:
+            match = cls._HOURS_RE.search(str(value or ''))
+            if not match:
+                return None
+            hours = int(match.group(0))
+        return hours if 1 <= hours <= 999 else None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CertificateRecord':
+        """
+        Cria um registro a partir de um dicionário (extração ou linha gravada).
+
+        Linhas de versões anteriores ("141h", "27 de Maio de 2025") são
+        convertidas para os tipos normalizados.
+
+        Args:
+            data: Dicionário com os campos do certificado
+
+        Returns:
+            Registro tipado
+        """
+        raw_date = data.get('data') or None
+        parsed = cls.parse_date(raw_date)
+        return cls(
+            nome=data.get('nome') or None,
+            curso=data.get('curso') or None,
+            duracao=cls.parse_hours(data.get('duracao')),
+            data=parsed,
+            id_certificado=data.get('id_certificado') or None,
+            # Poucos valores distintos: uma única cópia compartilhada por todos os registros
+            emissor=sys.intern(data['emissor']) if data.get('emissor') else None,
+            status=sys.intern(data['status']) if data.get('status') else None,
+            arquivo_original=data.get('arquivo_original') or None,
+            arquivo_novo=data.get('arquivo_novo') or None,
+            processado_em=data.get('processado_em') or None,
+            data_texto=None if parsed else raw_date,
+        )
+
+    @classmethod
+    def parse_year(cls, value) -> Optional[int]:
+        """
+        Ano de uma data; para textos não reconhecidos, o ano solto no texto.
+
+        Args:
+            value: Data (ISO, texto ou `datetime.date`)
+
+        Returns:
+            Ano ou None
+        """
+        parsed = cls.parse_date(value)
+        if parsed:
+            return parsed.year
+        match = cls._YEAR_RE.search(str(value or ''))
+        return int(match.group(0)) if match else None
+
+    @property
+    def year(self) -> Optional[int]:
+        """Ano de conclusão."""
+        return self.data.year if self.data else self.parse_year(self.data_texto)
+
+    def to_dict(self) -> Dict:
+        """
+        Converte para o formato gravado (data ISO, duração em horas).
+
+        Returns:
+            Dicionário com os campos de `ResultWriter.SUCCESS_FIELDS`
+        """
+        return {
+            'nome': self.nome,
+            'curso': self.curso,
+            'duracao': self.duracao,
+            'data': self.data.isoformat() if self.data else self.data_texto,
+            'id_certificado': self.id_certificado,
+            'emissor': self.emissor,
+            'status': self.status,
+            'arquivo_original': self.arquivo_original,
+            'arquivo_novo': self.arquivo_novo,
+            'processado_em': self.processado_em,
+        }
+
+
+# ==============================================================================
+# CLASSE: RunStats
+# ==============================================================================
+
+@dataclass(slots=True)
+class RunStats:
+    """
+    Agregados de uma execução, mantidos à medida que os resultados são gravados.
+
+    O relatório final lê estes contadores em vez de reler os resultados.
+    """
+
+    processados: int = 0
+    falhas: int = 0
+    completos: int = 0
+    horas: int = 0
+    data_min: Optional[date] = None
+    data_max: Optional[date] = None
+    emissores: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def incompletos(self) -> int:
+        """Certificados processados sem nome ou curso."""
+        return self.processados - self.completos
+
+    def add(self, record: CertificateRecord):
+        """Inclui um certificado processado."""
+        self.processados += 1
+        if record.status == 'completo':
+            self.completos += 1
+        if record.duracao:
+            self.horas += record.duracao
+        if record.data:
+            if self.data_min is None or record.data < self.data_min:
+                self.data_min = record.data
+            if self.data_max is None or record.data > self.data_max:
+                self.data_max = record.data
+        issuer = record.emissor or 'generico'
+        self.emissores[issuer] = self.emissores.get(issuer, 0) + 1
+
+    def add_failure(self):
+        """Inclui um arquivo com falha."""
+        self.falhas += 1
+
+
+# ==============================================================================
+# CLASSE: ResultWriter
+# ==============================================================================
+
+class ResultWriter:
+    """
+    Grava resultados em disco à medida que cada arquivo é concluído.
+
+    Cada registro é anexado imediatamente ao fluxo (CSV ou JSONL), com fsync
+    periódico e rotação por tamanho. Uma queda no meio da execução não perde o
+    que já foi gravado, a memória não cresce com o tamanho da pasta e a
+    execução pode ser retomada a partir dos arquivos existentes.
+    """
+
+    SUCCESS_FIELDS = [
+        'nome', 'curso', 'duracao', 'data', 'id_certificado', 'emissor', 'status',
+        'arquivo_original', 'arquivo_novo', 'processado_em'
+    ]
+    FAILURE_FIELDS = ['arquivo', 'motivo', 'timestamp']
+    KINDS = {'processados': SUCCESS_FIELDS, 'falhas': FAILURE_FIELDS}
+    FORMATS = ('csv', 'jsonl')
+
+    def __init__(self, output_folder: str, run_id: Optional[str] = None,
+                 fmt: str = 'csv', fsync_every: int = 20,
+                 max_bytes: int = 50 * 1024 * 1024):
+        """
+        Inicializa o gravador de resultados.
+
+        Args:
+            output_folder: Pasta onde os arquivos de resultado são gravados
+            run_id: Identificador da execução (timestamp); reutilizar um
+                    identificador existente retoma a gravação
+            fmt: Formato dos arquivos ('csv' ou 'jsonl')
+            fsync_every: Número de registros entre cada fsync
+            max_bytes: Tamanho máximo de cada arquivo antes da rotação
+        """
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Formato inválido: {fmt} (use {', '.join(self.FORMATS)})")
+
+        self.output_folder = output_folder
+        self.run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.fmt = fmt
+        self.fsync_every = max(1, fsync_every)
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+
+        # Estado de cada fluxo aberto: arquivo, parte atual e registros pendentes de fsync
+        self._streams: Dict[str, Dict] = {}
+
+        # Agregados desta execução; registros já gravados (retomada) ficam à parte
+        self.stats = RunStats()
+        self.resumed = RunStats()
+        for row in self.iter_records('processados'):
+            self.resumed.add(CertificateRecord.from_dict(row))
+        self.resumed.falhas = sum(1 for _ in self.iter_records('falhas'))
+
+    RUN_PATTERN = re.compile(
+        r'^certificados_(?:processados|falhas)_(\d{8}_\d{6})(?:_parte\d+)?\.(csv|jsonl)$'
+    )
+
+    @classmethod
+    def list_runs(cls, output_folder: str) -> List[Tuple[str, str]]:
+        """
+        Lista as execuções com arquivos de resultado na pasta.
+
+        Args:
+            output_folder: Pasta com arquivos de resultado
+
+        Returns:
+            Pares (identificador da execução, formato), em ordem cronológica
+        """
+        runs = set()
+        for filename in os.listdir(output_folder):
+            match = cls.RUN_PATTERN.match(filename)
+            if match:
+                runs.add((match.group(1), match.group(2)))
+        return sorted(runs)
+
+    @classmethod
+    def latest_run_id(cls, output_folder: str) -> Optional[str]:
+        """
+        Procura o identificador da execução mais recente na pasta.
+
+        Args:
+            output_folder: Pasta com arquivos de resultado
+
+        Returns:
+            Identificador da execução ou None se não houver resultados
+        """
+        runs = cls.list_runs(output_folder)
+        return runs[-1][0] if runs else None
+
+    def _part_path(self, kind: str, part: int) -> str:
+        """Monta o caminho de uma parte do fluxo (a primeira parte não tem sufixo)."""
+        suffix = '' if part == 1 else f'_parte{part:03d}'
+        return os.path.join(
+            self.output_folder,
+            f'certificados_{kind}_{self.run_id}{suffix}.{self.fmt}'
+        )
+
+    def paths(self, kind: str) -> List[str]:
+        """
+        Lista as partes existentes de um fluxo, em ordem.
+
+        Args:
+            kind: 'processados' ou 'falhas'
+
+        Returns:
+            Caminhos das partes gravadas
+        """
+        paths = []
+        part = 1
+        while os.path.exists(self._part_path(kind, part)):
+            paths.append(self._part_path(kind, part))
+            part += 1
+        return paths
+
+    def _open(self, kind: str) -> Dict:
+        """Abre (ou rotaciona) o arquivo corrente de um fluxo."""
+        stream = self._streams.get(kind)
+
+        if stream and stream['file'].tell() < self.max_bytes:
+            return stream
+
+        if stream:
+            # Rotação: fecha a parte atual garantindo persistência
+            self._sync(stream)
+            stream['file'].close()
+            part = stream['part'] + 1
+        else:
+            # Continua na última parte existente (retomada) ou começa na primeira
+            part = max(1, len(self.paths(kind)))
+            if os.path.exists(self._part_path(kind, part)) and \
+                    os.path.getsize(self._part_path(kind, part)) >= self.max_bytes:
+                part += 1
+
+        path = self._part_path(kind, part)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+
+        encoding = 'utf-8-sig' if self.fmt == 'csv' else 'utf-8'
+        handle = open(path, 'a', encoding=encoding, newline='')
+
+        stream = {'file': handle, 'part': part, 'pending': 0, 'path': path}
+        if self.fmt == 'csv':
+            fieldnames = self.KINDS[kind]
+            if not is_new:
+                # Mantém as colunas de uma parte gravada por versão anterior
+                with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                    fieldnames = next(csv.reader(f), None) or fieldnames
+            stream['csv'] = csv.DictWriter(handle, fieldnames=fieldnames, extrasaction='ignore')
+            if is_new:
+                stream['csv'].writeheader()
+
+        self._streams[kind] = stream
+        return stream
+
+    def _sync(self, stream: Dict):
+        """Descarrega o buffer e força gravação física do arquivo."""
+        stream['file'].flush()
+        os.fsync(stream['file'].fileno())
+        stream['pending'] = 0
+
+    def _write(self, kind: str, record: Dict):
+        """Anexa um registro ao fluxo indicado."""
+        stream = self._open(kind)
+
+        if self.fmt == 'csv':
+            stream['csv'].writerow(record)
+        else:
+            row = {field: record.get(field) for field in self.KINDS[kind]}
+            stream['file'].write(json.dumps(row, ensure_ascii=False) + '\n')
+
+        # Flush a cada registro (sobrevive a queda do processo);
+        # fsync periódico (sobrevive a queda do sistema)
+        stream['file'].flush()
+        stream['pending'] += 1
+        if stream['pending'] >= self.fsync_every:
+            self._sync(stream)
+
+    def sync(self):
+        """Força a gravação física de tudo o que já foi anexado."""
+        for stream in self._streams.values():
+            self._sync(stream)
+
+    def write_success(self, record: CertificateRecord):
+        """Grava o resultado de um certificado processado com sucesso."""
+        self._write('processados', record.to_dict())
+        self.stats.add(record)
+
+    def write_failure(self, data: Dict):
+        """Grava o registro de um arquivo com falha."""
+        self._write('falhas', data)
+        self.stats.add_failure()
+
+    def iter_records(self, kind: str):
+        """
+        Relê os registros gravados de um fluxo, parte por parte.
+
+        Linhas truncadas por uma queda durante a escrita são ignoradas.
+
+        Args:
+            kind: 'processados' ou 'falhas'
+
+        Yields:
+            Dicionário de cada registro
+        """
+        for path in self.paths(kind):
+            stream = self._streams.get(kind)
+            if stream and stream['path'] == path:
+                stream['file'].flush()
+
+            if self.fmt == 'csv':
+                with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                    for row in csv.DictReader(f):
+                        if None in row.values():
+                            continue  # Linha incompleta
+                        yield row
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # Linha incompleta
+
+    def recorded_files(self) -> set:
+        """
+        Retorna os nomes de arquivos que já constam como processados.
+
+        Usado para retomar uma execução interrompida sem reprocessar nada.
+        """
+        names = set()
+        for row in self.iter_records('processados'):
+            names.add(row.get('arquivo_original'))
+            names.add(row.get('arquivo_novo'))
+        names.discard(None)
+        return names
+
+    def close(self):
+        """Sincroniza e fecha todos os fluxos abertos."""
+        for stream in self._streams.values():
+            try:
+                self._sync(stream)
+            finally:
+                stream['file'].close()
+        self._streams.clear()
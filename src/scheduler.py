@@ -0,0 +1,182 @@
+"""
+Escalonamento - Gerenciador de Certificados
+Descrição: Estimativa de custo dos PDFs sem renderizar, ordem de
+          processamento e tempo restante.
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+
+# ==============================================================================
+# CLASSE: WorkScheduler
+# ==============================================================================
+
+class WorkScheduler:
+    """
+    Estima o custo de cada PDF sem renderizar e ordena a fila de processamento.
+
+    O custo vem do número de páginas (lido da árvore de páginas do PDF), da
+    presença de camada de texto (digitalizações, só imagem, custam mais ao
+    OCR) e do tamanho do arquivo. O tempo restante usa a média móvel
+    exponencial dos segundos por página observados na execução.
+
+    Ordens:
+        sjf: menores primeiro (primeiros resultados mais cedo)
+        ljf: maiores primeiro (melhor distribuição entre vários processos)
+        original: ordem da listagem da pasta
+    """
+
+    ORDERS = ('sjf', 'ljf', 'original')
+
+    # Bytes lidos do início e do fim do arquivo (a árvore de páginas costuma
+    # ficar em um dos dois; arquivos pequenos são lidos inteiros)
+    PROBE_BYTES = 256 * 1024
+    # Arquivos amostrados em paralelo no planejamento
+    PROBE_WORKERS = 8
+    # Peso de uma página sem camada de texto em relação a uma com texto
+    SCANNED_FACTOR = 1.5
+
+    _OBJ_RE = re.compile(rb'\bobj\b(.*?)\bendobj\b', re.DOTALL)
+    _PAGES_RE = re.compile(rb'/Type\s*/Pages\b')
+    _COUNT_RE = re.compile(rb'/Count\s+(\d+)')
+    _PAGE_RE = re.compile(rb'/Type\s*/Page(?!s)\b')
+
+    def __init__(self, order: str = 'sjf', alpha: float = 0.2):
+        """
+        Inicializa o escalonador.
+
+        Args:
+            order: 'sjf', 'ljf' ou 'original'
+            alpha: Peso da observação mais recente na média de segundos por página
+        """
+        if order not in self.ORDERS:
+            raise ValueError(f"Ordem inválida: {order} (use {', '.join(self.ORDERS)})")
+
+        self.order = order
+        self.alpha = alpha
+        self.seconds_per_page: Optional[float] = None
+
+    def estimate(self, pdf_path: str, data: Optional[bytes] = None,
+                 size: Optional[int] = None) -> Dict:
+        """
+        Estima páginas, camada de texto e custo relativo de um PDF.
+
+        Args:
+            pdf_path: Caminho do PDF
+            data: Conteúdo já lido (dispensa acesso ao arquivo)
+            size: Tamanho já conhecido; sem `data`, estima só pelo tamanho,
+                sem abrir o arquivo (ordem 'original')
+
+        Returns:
+            Dicionário com 'paginas', 'tamanho', 'texto' e 'custo'
+        """
+        if data is not None:
+            size = len(data)
+        elif size is not None:
+            data = b''
+        else:
+            try:
+                with open(pdf_path, 'rb') as f:
+                    size = os.fstat(f.fileno()).st_size
+                    if size <= 2 * self.PROBE_BYTES:
+                        data = f.read()
+                    else:
+                        head = f.read(self.PROBE_BYTES)
+                        f.seek(-self.PROBE_BYTES, os.SEEK_END)
+                        data = head + f.read()
+            except OSError:
+                return {'paginas': 1, 'tamanho': 0, 'texto': False, 'custo': 1.0}
+
+        pages = self.count_pages(data)
+        if not pages:
+            # Árvore em fluxo comprimido: estimativa pelo tamanho (~500 KB por página)
+            pages = max(1, size // (500 * 1024))
+
+        # Sem conteúdo, nada indica camada de texto: assume digitalização
+        has_text = b'/Font' in data
+        cost = pages * (1.0 if has_text else self.SCANNED_FACTOR) + size / (10 * 1024 * 1024)
+
+        return {'paginas': pages, 'tamanho': size, 'texto': has_text, 'custo': round(cost, 3)}
+
+    @classmethod
+    def count_pages(cls, data: bytes) -> int:
+        """
+        Conta as páginas pela árvore de páginas do PDF (sem renderizar).
+
+        Args:
+            data: Conteúdo (ou início e fim) do PDF
+
+        Returns:
+            Número de páginas (0 se a árvore estiver em fluxo comprimido)
+        """
+        # A raiz da árvore de páginas tem o maior /Count; só nós /Type /Pages
+        # contam (/Outlines também tem /Count, com o número de marcadores)
+        counts = []
+        for body in cls._OBJ_RE.findall(data):
+            if cls._PAGES_RE.search(body):
+                match = cls._COUNT_RE.search(body)
+                if match:
+                    counts.append(int(match.group(1)))
+        return max(counts) if counts else len(cls._PAGE_RE.findall(data))
+
+    def plan(self, paths: List[str], sizes: Optional[Dict[str, int]] = None) -> List[Tuple[str, Dict]]:
+        """
+        Estima e ordena os arquivos.
+
+        Em 'sjf'/'ljf' o início e o fim de cada PDF (até 2 × PROBE_BYTES) são
+        lidos antes de ordenar: páginas e camada de texto pesam mais que o
+        tamanho. As leituras correm em paralelo (`PROBE_WORKERS`), escondendo
+        a latência de NFS/SMB. Na ordem 'original' nada é aberto: a estimativa
+        vem do tamanho da listagem e é refinada depois pelo buffer lido no
+        processamento.
+
+        Args:
+            paths: Caminhos dos PDFs (na ordem da listagem)
+            sizes: Tamanhos já conhecidos da listagem, por caminho (ordem 'original')
+
+        Returns:
+            Lista de (caminho, estimativa) na ordem de processamento
+        """
+        if self.order == 'original':
+            sizes = sizes or {}
+            return [(path, self.estimate(path, size=sizes.get(path, 0))) for path in paths]
+
+        with ThreadPoolExecutor(max_workers=self.PROBE_WORKERS) as executor:
+            schedule = list(zip(paths, executor.map(self.estimate, paths)))
+        schedule.sort(key=lambda item: item[1]['custo'], reverse=self.order == 'ljf')
+        return schedule
+
+    def record(self, pages: int, seconds: float):
+        """
+        Atualiza a média de segundos por página com um arquivo concluído.
+
+        Args:
+            pages: Páginas estimadas do arquivo
+            seconds: Tempo gasto no arquivo
+        """
+        observed = seconds / max(1, pages)
+        if self.seconds_per_page is None:
+            self.seconds_per_page = observed
+        else:
+            self.seconds_per_page += self.alpha * (observed - self.seconds_per_page)
+
+    def eta(self, remaining_pages: int) -> Optional[float]:
+        """Segundos restantes estimados (None antes da primeira observação)."""
+        if self.seconds_per_page is None:
+            return None
+        return remaining_pages * self.seconds_per_page
+
+    @staticmethod
+    def format_duration(seconds: Optional[float]) -> str:
+        """Formata segundos como '1h02min', '3min05s' ou '42s'."""
+        if seconds is None:
+            return '?'
+        seconds = int(seconds)
+        if seconds >= 3600:
+            return f"{seconds // 3600}h{seconds % 3600 // 60:02d}min"
+        if seconds >= 60:
+            return f"{seconds // 60}min{seconds % 60:02d}s"
+        return f"{seconds}s"
@@ -0,0 +1,379 @@
+"""
+Serviço HTTP de Extração - Gerenciador de Certificados
+Descrição: Serviço local com leitores residentes, fila limitada e micro-lotes
+          de reconhecimento. Os leitores são criados por uma fábrica recebida
+          na inicialização.
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler
+from typing import Callable, Dict, List, Optional
+
+from extractors import CertificateDataExtractor
+
+
+# ==============================================================================
+# CLASSE: ExtractionService
+# ==============================================================================
+
+class ExtractionService:
+    """
+    Serviço de extração com modelo residente e micro-lotes.
+
+    Requisições entram em uma fila limitada; cada trabalhador (um leitor
+    EasyOCR por nível de concorrência) retira a primeira requisição e espera
+    até `batch_window_ms` por outras, até `max_batch`. As páginas do lote são
+    reconhecidas em chamadas compartilhadas (`extract_from_images_batch`) e
+    cada requisição recebe seus dados com os tempos de cada etapa.
+    """
+
+    def __init__(self, extractor_factory: Callable[[], object], concurrency: int = 1,
+                 max_queue: int = 32, max_batch: int = 4, batch_window_ms: float = 50.0,
+                 path_root: Optional[str] = None, triage: bool = True):
+        """
+        Inicializa o serviço e carrega os modelos.
+
+        Args:
+            extractor_factory: Cria um leitor (OCRExtractor ou compatível, com
+                `render_pdf_bytes` e `extract_from_images_batch`)
+            concurrency: Número de lotes processados em paralelo (um leitor cada)
+            max_queue: Máximo de requisições aguardando (acima disso: HTTP 503)
+            max_batch: Máximo de requisições por lote
+            batch_window_ms: Tempo máximo de espera para completar um lote
+            path_root: Pasta raiz permitida para requisições por caminho
+                       (None recusa requisições por caminho)
+            triage: Reconhece só as páginas que parecem certificados
+        """
+        self.max_batch = max(1, max_batch)
+        self.triage = triage
+        self.batch_window = batch_window_ms / 1000
+        self.path_root = os.path.realpath(path_root) if path_root else None
+        self.logger = logging.getLogger(__name__)
+
+        self.jobs: 'queue.Queue[Dict]' = queue.Queue(maxsize=max_queue)
+        self.data_extractor = CertificateDataExtractor()
+        self.stop_event = threading.Event()
+
+        # Estatísticas
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.batches = 0
+        self.latencies: deque = deque(maxlen=2000)
+
+        self.workers = []
+        for idx in range(max(1, concurrency)):
+            extractor = extractor_factory()
+            worker = threading.Thread(target=self._worker_loop, args=(extractor,),
+                                      name=f'extracao-{idx}', daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def resolve_path(self, path: str) -> str:
+        """
+        Valida um caminho recebido por requisição.
+
+        Args:
+            path: Caminho do PDF
+
+        Returns:
+            Caminho real do arquivo
+
+        Raises:
+            PermissionError: Se requisições por caminho estiverem desativadas
+                             ou o caminho estiver fora da raiz permitida
+        """
+        if not self.path_root:
+            raise PermissionError("Requisições por caminho desativadas (use --raiz-caminhos)")
+
+        real_path = os.path.realpath(path)
+        if os.path.commonpath([real_path, self.path_root]) != self.path_root:
+            raise PermissionError("Caminho fora da raiz permitida")
+
+        return real_path
+
+    def submit(self, pdf_bytes: bytes, filename: str = 'upload.pdf',
+               timeout: float = 300.0) -> Dict:
+        """
+        Envia um PDF e aguarda o resultado.
+
+        Args:
+            pdf_bytes: Conteúdo do PDF
+            filename: Nome informado pelo cliente (apenas para log)
+            timeout: Tempo máximo de espera pelo resultado
+
+        Returns:
+            Dados extraídos com tempos por etapa
+
+        Raises:
+            queue.Full: Fila cheia (serviço sobrecarregado)
+            TimeoutError: Resultado não ficou pronto a tempo (a requisição é
+                cancelada e não chega ao OCR se ainda estiver na fila)
+            RuntimeError: Falha na extração
+        """
+        job = {
+            'pdf': pdf_bytes,
+            'arquivo': filename,
+            'enviado_em': time.perf_counter(),
+            'done': threading.Event(),
+            'cancelled': False,
+            'result': None,
+            'error': None,
+        }
+
+        try:
+            self.jobs.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise
+
+        if not job['done'].wait(timeout):
+            # Ninguém mais espera o resultado: o trabalhador descarta a requisição
+            job['cancelled'] = True
+            raise TimeoutError("Tempo limite de extração excedido")
+
+        if job['error']:
+            raise RuntimeError(job['error'])
+
+        return job['result']
+
+    def _take(self, timeout: float) -> Optional[Dict]:
+        """
+        Retira a próxima requisição ainda aguardada da fila.
+
+        Requisições canceladas (cliente desistiu por tempo limite) são
+        descartadas sem renderização nem OCR.
+        """
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                job = self.jobs.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                return None
+            if not job['cancelled']:
+                return job
+            job['pdf'] = None
+            with self._lock:
+                self.cancelled += 1
+
+    def _collect_batch(self) -> List[Dict]:
+        """Retira a próxima requisição e agrega outras dentro da janela."""
+        first = self._take(0.5)
+        if first is None:
+            return []
+        batch = [first]
+
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            job = self._take(remaining)
+            if job is None:
+                break
+            batch.append(job)
+
+        return batch
+
+    def _worker_loop(self, extractor):
+        """Processa lotes até o serviço ser encerrado."""
+        while not self.stop_event.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._run_batch(extractor, batch)
+
+    def _run_batch(self, extractor, batch: List[Dict]):
+        """Renderiza, reconhece em lote e extrai os dados de cada requisição."""
+        started = time.perf_counter()
+
+        # 1. Renderiza as páginas de cada PDF
+        pages: List = []
+        owners: List[Dict] = []
+        for job in batch:
+            job['inicio'] = time.perf_counter()
+            try:
+                job_pages = extractor.render_pdf_bytes(job['pdf'], triage=self.triage)
+                job['paginas'] = len(job_pages)
+                pages.extend(job_pages)
+                owners.extend([job] * len(job_pages))
+            except Exception as e:
+                job['error'] = f"PDF inválido: {e}"
+            job['pdf'] = None  # Libera o buffer o quanto antes
+        rendered = time.perf_counter()
+
+        # 2. Reconhecimento compartilhado por todas as páginas do lote
+        texts = extractor.extract_from_images_batch(pages) if pages else []
+        recognized = time.perf_counter()
+
+        page_texts: Dict[int, List[str]] = {}
+        for job, text in zip(owners, texts):
+            if text:
+                page_texts.setdefault(id(job), []).append(text)
+
+        # 3. Extração dos campos por requisição
+        for job in batch:
+            if not job['error']:
+                try:
+                    extract_start = time.perf_counter()
+                    full_text = '\n\n'.join(page_texts.get(id(job), []))
+                    if len(full_text) < 20:
+                        raise ValueError("Texto muito curto ou vazio")
+                    data = self.data_extractor.extract_all(full_text)
+                    done = time.perf_counter()
+                    data['paginas'] = job['paginas']
+                    data['tempos_ms'] = {
+                        'fila': round((job['inicio'] - job['enviado_em']) * 1000, 1),
+                        'renderizacao': round((rendered - started) * 1000, 1),
+                        'ocr': round((recognized - rendered) * 1000, 1),
+                        'extracao': round((done - extract_start) * 1000, 1),
+                        'total': round((done - job['enviado_em']) * 1000, 1),
+                    }
+                    data['tamanho_lote'] = len(batch)
+                    job['result'] = data
+                except Exception as e:
+                    job['error'] = str(e)
+
+            with self._lock:
+                if job['error']:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                    self.latencies.append(job['result']['tempos_ms']['total'])
+            job['done'].set()
+
+        with self._lock:
+            self.batches += 1
+
+        self.logger.debug(f"📦 Lote de {len(batch)} requisição(ões), {len(pages)} página(s) "
+                         f"em {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def stats(self) -> Dict:
+        """
+        Retorna contadores e latências do serviço.
+
+        Returns:
+            Dicionário com fila, totais, média de lote e percentis (ms)
+        """
+        with self._lock:
+            latencies = sorted(self.latencies)
+            snapshot = {
+                'fila': self.jobs.qsize(),
+                'concluidas': self.completed,
+                'falhas': self.failed,
+                'rejeitadas': self.rejected,
+                'canceladas': self.cancelled,
+                'lotes': self.batches,
+                'media_lote': round((self.completed + self.failed) / self.batches, 2) if self.batches else None,
+            }
+
+        for name, pct in (('p50_ms', 0.50), ('p95_ms', 0.95), ('p99_ms', 0.99)):
+            snapshot[name] = latencies[min(len(latencies) - 1, int(len(latencies) * pct))] if latencies else None
+
+        return snapshot
+
+    def shutdown(self):
+        """Encerra os trabalhadores após os lotes em andamento."""
+        self.stop_event.set()
+        for worker in self.workers:
+            worker.join()
+
+
+# ==============================================================================
+# CLASSE: ExtractionRequestHandler
+# ==============================================================================
+
+class ExtractionRequestHandler(BaseHTTPRequestHandler):
+    """
+    Rotas HTTP do serviço de extração.
+
+    - POST /extrair: corpo application/pdf (upload) ou JSON {"caminho": "..."}
+    - GET  /saude: verificação de disponibilidade
+    - GET  /estatisticas: fila, totais e latências
+    """
+
+    MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+    server_version = 'GerenciadorCertificados/3.0'
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        """Envia resposta JSON."""
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Direciona o log de acesso para o logging (nível DEBUG)."""
+        logging.getLogger(__name__).debug(f"HTTP {self.address_string()} - {format % args}")
+
+    def do_GET(self):
+        service: ExtractionService = self.server.service
+
+        if self.path == '/saude':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/estatisticas':
+            self._send_json(200, service.stats())
+        else:
+            self._send_json(404, {'erro': 'Rota não encontrada'})
+
+    def do_POST(self):
+        service: ExtractionService = self.server.service
+
+        if self.path != '/extrair':
+            self._send_json(404, {'erro': 'Rota não encontrada'})
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0:
+            self._send_json(400, {'erro': 'Corpo vazio'})
+            return
+        if length > self.MAX_UPLOAD_BYTES:
+            self._send_json(413, {'erro': 'Arquivo excede o tamanho máximo'})
+            return
+
+        body = self.rfile.read(length)
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip()
+
+        try:
+            if content_type == 'application/json':
+                payload = json.loads(body)
+                if not isinstance(payload, dict) or not isinstance(payload.get('caminho'), str):
+                    raise ValueError('esperado um objeto JSON {"caminho": "..."}')
+                path = service.resolve_path(payload['caminho'])
+                with open(path, 'rb') as f:
+                    pdf_bytes = f.read()
+                filename = os.path.basename(path)
+            else:
+                pdf_bytes = body
+                filename = self.headers.get('X-Nome-Arquivo', 'upload.pdf')
+
+            result = service.submit(pdf_bytes, filename)
+            result['arquivo'] = filename
+            self._send_json(200, result)
+
+        except queue.Full:
+            self._send_json(503, {'erro': 'Serviço sobrecarregado, tente novamente'},
+                            headers={'Retry-After': '1'})
+        except PermissionError as e:
+            self._send_json(403, {'erro': str(e)})
+        except (ValueError, FileNotFoundError) as e:
+            self._send_json(400, {'erro': f'Requisição inválida: {e}'})
+        except TimeoutError as e:
+            self._send_json(504, {'erro': str(e)})
+        except OSError as e:
+            # Pasta, arquivo ilegível etc.
+            self._send_json(422, {'erro': f'Não foi possível ler o arquivo: {e.strerror or e}'})
+        except RuntimeError as e:
+            self._send_json(422, {'erro': str(e)})
@@ -0,0 +1,479 @@
+"""
+Banco Consolidado - Gerenciador de Certificados
+Descrição: Banco SQLite com os certificados de todas as execuções (consultas
+          indexadas, exportação Parquet) e índice de busca textual (FTS5)
+          sobre o texto do OCR.
+"""
+
+import os
+import re
+import csv
+import json
+import sqlite3
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from records import CertificateRecord, TextNormalizer
+
+
+# ==============================================================================
+# CLASSE: CertificateArchive
+# ==============================================================================
+
+# Banco consolidado padrão, compartilhado entre execuções e pastas
+DEFAULT_ARCHIVE_PATH = os.environ.get(
+    'CERTIFICADOS_DB',
+    os.path.join(str(Path.home()), 'GerenciadorCertificados', 'certificados.db')
+)
+
+
+class CertificateArchive:
+    """
+    Arquivo consolidado de certificados em SQLite.
+
+    Cada execução faz upsert dos seus resultados, de modo que consultas como
+    "quais cursos a pessoa X concluiu" leem um único banco indexado em vez de
+    concatenar dezenas de CSVs. Nome e curso são indexados na forma
+    normalizada (sem acentos, minúsculas), permitindo busca por prefixo.
+    """
+
+    COLUMNS = [
+        'chave', 'id_certificado', 'nome', 'nome_busca', 'curso', 'curso_busca',
+        'duracao', 'data', 'ano', 'emissor', 'status', 'arquivo_original', 'arquivo_novo',
+        'pasta', 'processado_em'
+    ]
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS certificados (
+            chave            TEXT PRIMARY KEY,
+            id_certificado   TEXT,
+            nome             TEXT,
+            nome_busca       TEXT,
+            curso            TEXT,
+            curso_busca      TEXT,
+            duracao          INTEGER,
+            data             TEXT,
+            ano              INTEGER,
+            emissor          TEXT,
+            status           TEXT,
+            arquivo_original TEXT,
+            arquivo_novo     TEXT,
+            pasta            TEXT,
+            processado_em    TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_certificados_nome ON certificados(nome_busca);
+        CREATE INDEX IF NOT EXISTS idx_certificados_curso ON certificados(curso_busca);
+        CREATE INDEX IF NOT EXISTS idx_certificados_ano ON certificados(ano);
+        CREATE INDEX IF NOT EXISTS idx_certificados_id ON certificados(id_certificado);
+    """
+
+    def __init__(self, db_path: str = DEFAULT_ARCHIVE_PATH, commit_every: int = 50):
+        """
+        Abre (ou cria) o banco consolidado.
+
+        Args:
+            db_path: Caminho do arquivo SQLite
+            commit_every: Número de registros acumulados antes de cada commit
+        """
+        self.db_path = db_path
+        self.commit_every = max(1, commit_every)
+        self.logger = logging.getLogger(__name__)
+        self._pending: List[Tuple] = []
+
+        folder = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(folder, exist_ok=True)
+
+        # Acesso serializado pelo chamador; o modo monitor grava a partir da thread de trabalho
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # WAL permite consultas enquanto uma execução grava
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(self.SCHEMA)
+
+        # Bancos criados antes da coluna de emissor
+        existing = {row['name'] for row in self.conn.execute('PRAGMA table_info(certificados)')}
+        if 'emissor' not in existing:
+            self.conn.execute('ALTER TABLE certificados ADD COLUMN emissor TEXT')
+
+    @staticmethod
+    def make_key(data: Dict, folder: Optional[str] = None) -> str:
+        """
+        Gera a chave única de um certificado.
+
+        Usa o identificador do certificado quando disponível. Certificados
+        incompletos usam o arquivo de origem (pasta + nome original), já que o
+        nome provisório não identifica o documento; os demais, um hash de
+        nome + curso + data normalizados.
+
+        Args:
+            data: Dados do certificado
+            folder: Pasta onde o arquivo está (padrão: campo 'pasta')
+
+        Returns:
+            Chave para upsert
+        """
+        cert_id = data.get('id_certificado')
+        if cert_id:
+            return f"id:{cert_id.upper()}"
+
+        if data.get('status') == 'incompleto':
+            source = os.path.join(folder or data.get('pasta') or '', data.get('arquivo_original') or '')
+            return 'arquivo:' + hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+        # Data em ISO quando reconhecida: "27 de Maio de 2025" e "2025-05-27" geram a mesma chave
+        fold = TextNormalizer.fold_for_search
+        parsed = CertificateRecord.parse_date(data.get('data'))
+        when = parsed.isoformat() if parsed else fold(data.get('data'))
+        raw = '|'.join([fold(data.get('nome')), fold(data.get('curso')), when])
+        return 'hash:' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _to_row(self, data: Dict, folder: Optional[str]) -> Tuple:
+        """Converte o dicionário de resultado em linha da tabela."""
+        fold = TextNormalizer.fold_for_search
+        # Normaliza também linhas de versões anteriores ("141h", "27 de Maio de 2025")
+        record = CertificateRecord.from_dict(data)
+        normalized = record.to_dict()
+
+        values = {
+            'chave': self.make_key(normalized, folder),
+            'id_certificado': record.id_certificado,
+            'nome': data.get('nome'),
+            'nome_busca': fold(data.get('nome')),
+            'curso': data.get('curso'),
+            'curso_busca': fold(data.get('curso')),
+            'duracao': record.duracao,
+            'data': normalized['data'],
+            'ano': record.year,
+            'emissor': data.get('emissor'),
+            'status': data.get('status'),
+            'arquivo_original': data.get('arquivo_original'),
+            'arquivo_novo': data.get('arquivo_novo'),
+            'pasta': folder or data.get('pasta'),
+            'processado_em': data.get('processado_em'),
+        }
+        return tuple(values[column] for column in self.COLUMNS)
+
+    def add(self, data: Dict, folder: Optional[str] = None):
+        """
+        Agenda o upsert de um certificado (gravado em lotes).
+
+        Args:
+            data: Dados do certificado
+            folder: Pasta onde o arquivo está
+        """
+        self._pending.append(self._to_row(data, folder))
+        if len(self._pending) >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        """Grava os upserts pendentes em uma única transação."""
+        if not self._pending:
+            return
+
+        columns = ', '.join(self.COLUMNS)
+        placeholders = ', '.join('?' for _ in self.COLUMNS)
+        updates = ', '.join(f'{c} = excluded.{c}' for c in self.COLUMNS if c != 'chave')
+
+        with self.conn:
+            self.conn.executemany(
+                f'INSERT INTO certificados ({columns}) VALUES ({placeholders}) '
+                f'ON CONFLICT(chave) DO UPDATE SET {updates}',
+                self._pending
+            )
+        self._pending.clear()
+
+    def import_results(self, path: str) -> int:
+        """
+        Importa um arquivo de resultados existente (CSV ou JSONL).
+
+        Args:
+            path: Caminho do arquivo certificados_processados_*
+
+        Returns:
+            Número de registros importados
+        """
+        folder = os.path.dirname(os.path.abspath(path))
+        count = 0
+
+        if path.lower().endswith('.jsonl'):
+            with open(path, 'r', encoding='utf-8') as f:
+                rows = (json.loads(line) for line in f if line.strip())
+                for row in rows:
+                    self.add(row, folder)
+                    count += 1
+        else:
+            with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                for row in csv.DictReader(f):
+                    self.add(row, folder)
+                    count += 1
+
+        self.flush()
+        return count
+
+    def query(self, nome: Optional[str] = None, curso: Optional[str] = None,
+              ano: Optional[int] = None, cert_id: Optional[str] = None,
+              limit: int = 100) -> List[Dict]:
+        """
+        Consulta certificados usando os índices.
+
+        Nome e curso são comparados por prefixo, sem acentos e sem
+        diferenciar maiúsculas ("jose" encontra "José da Silva").
+
+        Args:
+            nome: Prefixo do nome do aluno
+            curso: Prefixo do nome do curso
+            ano: Ano de conclusão
+            cert_id: Identificador do certificado
+            limit: Número máximo de resultados
+
+        Returns:
+            Lista de certificados encontrados
+        """
+        self.flush()
+
+        clauses = []
+        params: List = []
+
+        # Prefixo como intervalo: usa o índice (LIKE não usaria)
+        for column, value in (('nome_busca', nome), ('curso_busca', curso)):
+            if value:
+                prefix = TextNormalizer.fold_for_search(value)
+                clauses.append(f'{column} >= ? AND {column} < ?')
+                params.extend([prefix, prefix + '\uffff'])
+
+        if ano:
+            clauses.append('ano = ?')
+            params.append(int(ano))
+
+        if cert_id:
+            clauses.append('id_certificado = ?')
+            params.append(cert_id)
+
+        where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+        cursor = self.conn.execute(
+            f'SELECT * FROM certificados{where} ORDER BY nome_busca, ano LIMIT ?',
+            params + [limit]
+        )
+        return [dict(row) for row in cursor]
+
+    def count(self) -> int:
+        """Retorna o total de certificados no banco."""
+        self.flush()
+        return self.conn.execute('SELECT COUNT(*) FROM certificados').fetchone()[0]
+
+    def export_parquet(self, path: str, chunk_size: int = 100_000):
+        """
+        Exporta o banco para Parquet com colunas codificadas em dicionário.
+
+        Requer pyarrow (pip install pyarrow).
+
+        Args:
+            path: Caminho do arquivo .parquet
+            chunk_size: Linhas lidas do banco por vez
+        """
+        import pandas as pd
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Exportação Parquet requer pyarrow: pip install pyarrow")
+
+        self.flush()
+
+        # Colunas de baixa cardinalidade se beneficiam de dicionário
+        categorical = ['nome', 'curso', 'emissor', 'status', 'pasta']
+        columns = [c for c in self.COLUMNS if not c.endswith('_busca')]
+
+        writer = None
+        try:
+            for chunk in pd.read_sql_query(
+                f"SELECT {', '.join(columns)} FROM certificados ORDER BY ano, nome_busca",
+                self.conn, chunksize=chunk_size
+            ):
+                arrays = []
+                for column in columns:
+                    if column == 'ano':
+                        arrays.append(pa.array(chunk[column].astype('Int16'), type=pa.int16()))
+                    elif column == 'duracao':
+                        # Bancos antigos guardavam "141h": normaliza para horas inteiras
+                        hours = chunk[column].map(CertificateRecord.parse_hours).astype('Int16')
+                        arrays.append(pa.array(hours, type=pa.int16()))
+                    elif column in categorical:
+                        arrays.append(pa.array(chunk[column].astype(object), type=pa.string()).dictionary_encode())
+                    else:
+                        arrays.append(pa.array(chunk[column].astype(object), type=pa.string()))
+                table = pa.Table.from_arrays(arrays, names=columns)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression='zstd',
+                                              use_dictionary=True)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        self.logger.info(f"📦 Parquet exportado em: {path}")
+
+    def close(self):
+        """Grava pendências e fecha o banco."""
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+
+# ==============================================================================
+# CLASSE: TextSearchIndex
+# ==============================================================================
+
+class TextSearchIndex:
+    """
+    Índice invertido (SQLite FTS5) sobre o texto bruto extraído pelo OCR.
+
+    Permite encontrar certificados por qualquer termo (instrutor, palavra do
+    curso, carga horária) sem refazer o OCR. O texto é limpo com
+    TextNormalizer e o tokenizador remove acentos, então "conclusao" encontra
+    "Conclusão" do mesmo jeito que a busca do banco consolidado.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS textos_documentos (
+            id      INTEGER PRIMARY KEY,
+            chave   TEXT UNIQUE NOT NULL,
+            arquivo TEXT,
+            pasta   TEXT
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS textos USING fts5(
+            texto,
+            tokenize = 'unicode61 remove_diacritics 2'
+        );
+    """
+
+    def __init__(self, db_path: str = DEFAULT_ARCHIVE_PATH, commit_every: int = 50,
+                 conn: Optional[sqlite3.Connection] = None):
+        """
+        Abre (ou cria) o índice de texto.
+
+        Args:
+            db_path: Caminho do arquivo SQLite (o mesmo do banco consolidado)
+            commit_every: Número de documentos acumulados antes de cada commit
+            conn: Conexão já aberta do banco consolidado (evita disputa de
+                  trava entre duas conexões gravando no mesmo arquivo)
+        """
+        self.db_path = db_path
+        self.commit_every = max(1, commit_every)
+        self.normalizer = TextNormalizer()
+        self.logger = logging.getLogger(__name__)
+        self._pending = 0
+        self._owns_conn = conn is None
+
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+
+        self.conn = conn
+        try:
+            self.conn.executescript(self.SCHEMA)
+        except sqlite3.OperationalError as e:
+            if self._owns_conn:
+                self.conn.close()
+            raise RuntimeError(f"SQLite sem suporte a FTS5 ({sqlite3.sqlite_version}): {e}")
+
+    def add(self, key: str, text: str, filename: str, folder: Optional[str] = None):
+        """
+        Indexa (ou reindexa) o texto de um certificado.
+
+        Args:
+            key: Chave do certificado (a mesma do banco consolidado)
+            text: Texto bruto do OCR
+            filename: Nome atual do arquivo
+            folder: Pasta onde o arquivo está
+        """
+        normalized = self.normalizer.normalize(text)
+
+        row = self.conn.execute(
+            'SELECT id FROM textos_documentos WHERE chave = ?', (key,)
+        ).fetchone()
+
+        if row:
+            doc_id = row[0]
+            self.conn.execute('DELETE FROM textos WHERE rowid = ?', (doc_id,))
+            self.conn.execute(
+                'UPDATE textos_documentos SET arquivo = ?, pasta = ? WHERE id = ?',
+                (filename, folder, doc_id)
+            )
+        else:
+            doc_id = self.conn.execute(
+                'INSERT INTO textos_documentos (chave, arquivo, pasta) VALUES (?, ?, ?)',
+                (key, filename, folder)
+            ).lastrowid
+
+        self.conn.execute('INSERT INTO textos (rowid, texto) VALUES (?, ?)', (doc_id, normalized))
+
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        """Confirma os documentos pendentes."""
+        self.conn.commit()
+        self._pending = 0
+
+    def _build_match(self, query: str) -> str:
+        """
+        Converte a busca do usuário em expressão FTS5 segura.
+
+        Cada termo vira uma frase entre aspas (todos obrigatórios); um '*' no
+        final do termo faz busca por prefixo.
+        """
+        terms = []
+        for term in TextNormalizer.fold_for_search(query).split():
+            prefix = term.endswith('*')
+            term = re.sub(r'[^\w\-]', '', term.rstrip('*'))
+            if term:
+                terms.append(f'"{term}"' + ('*' if prefix else ''))
+        return ' '.join(terms)
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Busca certificados pelo texto, ordenados por relevância (BM25).
+
+        Args:
+            query: Termos de busca
+            limit: Número máximo de resultados
+
+        Returns:
+            Lista com arquivo, pasta, chave, relevância e trecho encontrado
+        """
+        self.flush()
+
+        match = self._build_match(query)
+        if not match:
+            return []
+
+        cursor = self.conn.execute(
+            """
+            SELECT d.chave, d.arquivo, d.pasta, bm25(textos) AS relevancia,
+                   snippet(textos, 0, '[', ']', '…', 12) AS trecho
+            FROM textos
+            JOIN textos_documentos d ON d.id = textos.rowid
+            WHERE textos MATCH ?
+            ORDER BY relevancia
+            LIMIT ?
+            """,
+            (match, limit)
+        )
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def close(self):
+        """Confirma pendências e fecha o índice."""
+        try:
+            self.flush()
+        finally:
+            if self._owns_conn:
+                self.conn.close()
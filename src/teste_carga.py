@@ -0,0 +1,124 @@
+"""
+Teste de Carga - Serviço de Extração
+Descrição: Dispara requisições concorrentes contra o serviço HTTP
+          (python src/main.py servir) e mede vazão e latência (p50/p95/p99).
+          Usa apenas a biblioteca padrão.
+
+Uso:
+    python src/teste_carga.py certificado1.pdf certificado2.pdf --clientes 8 --requisicoes 100
+"""
+
+import sys
+import json
+import time
+import argparse
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+
+def send_request(url: str, pdf_bytes: bytes, filename: str, timeout: float) -> Dict:
+    """
+    Envia um PDF ao serviço e mede a latência observada pelo cliente.
+
+    Args:
+        url: Endereço base do serviço
+        pdf_bytes: Conteúdo do PDF
+        filename: Nome enviado no cabeçalho X-Nome-Arquivo
+        timeout: Tempo máximo da requisição
+
+    Returns:
+        Dicionário com status HTTP, latência (ms) e tempos informados pelo serviço
+    """
+    request = urllib.request.Request(
+        f"{url}/extrair",
+        data=pdf_bytes,
+        headers={'Content-Type': 'application/pdf', 'X-Nome-Arquivo': filename},
+        method='POST'
+    )
+
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            payload = json.loads(response.read())
+            status = response.status
+    except urllib.error.HTTPError as e:
+        payload = {}
+        status = e.code
+    except Exception as e:
+        return {'status': 0, 'latencia_ms': (time.perf_counter() - start) * 1000, 'erro': str(e)}
+
+    return {
+        'status': status,
+        'latencia_ms': (time.perf_counter() - start) * 1000,
+        'tempos_ms': payload.get('tempos_ms'),
+        'tamanho_lote': payload.get('tamanho_lote'),
+    }
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Percentil simples (vizinho mais próximo) de uma lista."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Executa o teste de carga e imprime o resumo.
+    """
+    parser = argparse.ArgumentParser(description="Teste de carga do serviço de extração")
+    parser.add_argument('pdfs', nargs='+', help='PDFs enviados em rodízio')
+    parser.add_argument('--url', default='http://127.0.0.1:8765', help='Endereço do serviço')
+    parser.add_argument('--clientes', type=int, default=4, help='Clientes concorrentes')
+    parser.add_argument('--requisicoes', type=int, default=40, help='Total de requisições')
+    parser.add_argument('--timeout', type=float, default=300.0, help='Tempo máximo por requisição')
+    args = parser.parse_args(argv)
+
+    files = []
+    for path in args.pdfs:
+        with open(path, 'rb') as f:
+            files.append((path, f.read()))
+
+    print(f"🚀 {args.requisicoes} requisições, {args.clientes} clientes concorrentes -> {args.url}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clientes) as executor:
+        futures = [
+            executor.submit(send_request, args.url, files[i % len(files)][1],
+                            files[i % len(files)][0], args.timeout)
+            for i in range(args.requisicoes)
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    ok = [r for r in results if r['status'] == 200]
+    latencies = [r['latencia_ms'] for r in ok]
+    batch_sizes = [r['tamanho_lote'] for r in ok if r.get('tamanho_lote')]
+
+    status_counts: Dict[int, int] = {}
+    for r in results:
+        status_counts[r['status']] = status_counts.get(r['status'], 0) + 1
+
+    print("\n" + "=" * 60)
+    print("       RESULTADO DO TESTE DE CARGA")
+    print("=" * 60)
+    print(f"Tempo total: {elapsed:.2f} s")
+    print(f"Vazão: {len(ok) / elapsed:.2f} req/s")
+    print(f"Status HTTP: {dict(sorted(status_counts.items()))}")
+    if latencies:
+        print(f"Latência p50: {percentile(latencies, 0.50):.0f} ms")
+        print(f"Latência p95: {percentile(latencies, 0.95):.0f} ms")
+        print(f"Latência p99: {percentile(latencies, 0.99):.0f} ms")
+        print(f"Latência máx: {max(latencies):.0f} ms")
+    if batch_sizes:
+        print(f"Tamanho médio do lote: {sum(batch_sizes) / len(batch_sizes):.2f}")
+    print("=" * 60)
+
+    return 0 if len(ok) == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
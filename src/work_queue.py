@@ -0,0 +1,369 @@
+"""
+Fila Compartilhada - Gerenciador de Certificados
+Descrição: Fila de tarefas em uma pasta compartilhada entre hosts, com posse
+          por renomeação atômica, batimentos, expiração e mesclagem dos
+          resultados de todos os processos.
+"""
+
+import os
+import re
+import json
+import time
+import socket
+import hashlib
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from records import CertificateRecord, ResultWriter
+from scheduler import WorkScheduler
+from organizer import FileOrganizer
+
+
+# ==============================================================================
+# CLASSE: SharedWorkQueue
+# ==============================================================================
+
+class SharedWorkQueue:
+    """
+    Fila de trabalho em uma pasta compartilhada (NFS/SMB) para vários hosts.
+    
+    Cada PDF vira um arquivo de tarefa. A posse é obtida com `os.rename`
+    atômico de `pendentes/` para `em_andamento/` (apenas um processo vence) e
+    mantida por batimentos: o mtime do arquivo de posse é atualizado
+    periodicamente. Posses sem batimento há mais de `lease_seconds` pertencem
+    a processos mortos e são tomadas por outro. Cada processo grava seus
+    resultados em `resultados/<processo>/`; `merge` junta tudo no final.
+    
+    Estrutura:
+        fila.json                               pasta de origem dos PDFs
+        pendentes/<ordem>-<id>.json             aguardando
+        em_andamento/<ordem>-<id>.<proc>.json   com posse de um processo
+        concluidos/<ordem>-<id>.json            finalizadas (sucesso ou falha)
+        resultados/<proc>/                      certificados_* e logs de cada processo
+    
+    O prefixo <ordem> vem do escalonador (custo estimado), e as tarefas são
+    distribuídas nessa ordem.
+    """
+    
+    STATES = ('pendentes', 'em_andamento', 'concluidos')
+    
+    def __init__(self, queue_dir: str, worker_id: Optional[str] = None,
+                 lease_seconds: float = 600.0):
+        """
+        Inicializa a fila (cria a estrutura se necessário).
+        
+        Args:
+            queue_dir: Pasta compartilhada da fila
+            worker_id: Nome deste processo (padrão: host-pid)
+            lease_seconds: Tempo sem batimento após o qual a posse expira
+        """
+        self.queue_dir = os.path.abspath(queue_dir)
+        self.worker_id = re.sub(r'[^\w-]', '_', worker_id or f"{socket.gethostname()}-{os.getpid()}")
+        self.lease_seconds = lease_seconds
+        self.logger = logging.getLogger(__name__)
+        
+        for state in self.STATES + ('resultados',):
+            os.makedirs(self._dir(state), exist_ok=True)
+        
+        # Listagem de pendentes reaproveitada entre posses (uma listagem por rodada)
+        self._candidates: deque = deque()
+        
+        # Posse atual, atualizada pela thread de batimento
+        self._lease_path: Optional[str] = None
+        self._lease_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+    
+    def _dir(self, state: str) -> str:
+        """Caminho de uma subpasta da fila."""
+        return os.path.join(self.queue_dir, state)
+    
+    @property
+    def config_path(self) -> str:
+        """Arquivo de configuração da fila."""
+        return os.path.join(self.queue_dir, 'fila.json')
+    
+    @property
+    def source_folder(self) -> Optional[str]:
+        """Pasta de origem dos PDFs (definida no primeiro enfileiramento)."""
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('pasta')
+        except FileNotFoundError:
+            return None
+    
+    @property
+    def results_folder(self) -> str:
+        """Pasta de resultados deste processo."""
+        folder = os.path.join(self._dir('resultados'), self.worker_id)
+        os.makedirs(folder, exist_ok=True)
+        return folder
+    
+    @staticmethod
+    def item_id(filename: str) -> str:
+        """Identificador estável da tarefa de um arquivo."""
+        return hashlib.sha1(filename.encode('utf-8')).hexdigest()[:16]
+    
+    @staticmethod
+    def _write_atomic(path: str, data: Dict):
+        """Grava JSON em arquivo temporário e renomeia (leitores nunca veem meio arquivo)."""
+        tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    
+    def _produced_files(self, folder: str) -> set:
+        """
+        Nomes (minúsculas) dos arquivos da pasta gerados pelos processos da fila.
+
+        Os processos renomeiam os PDFs no lugar; os nomes novos vêm dos
+        resultados gravados e dos diários de organização (renomeações feitas
+        antes de o resultado ser gravado).
+        """
+        paths = set()
+        results_root = self._dir('resultados')
+        for worker in os.listdir(results_root):
+            results = os.path.join(results_root, worker)
+            if not os.path.isdir(results):
+                continue
+            paths.update(FileOrganizer.journal_destinations(results))
+            for run_id, fmt in ResultWriter.list_runs(results):
+                for row in ResultWriter(results, run_id=run_id, fmt=fmt).iter_records('processados'):
+                    if row.get('arquivo_novo'):
+                        paths.add(os.path.join(folder, row['arquivo_novo']))
+        
+        return {
+            os.path.basename(path).lower() for path in paths
+            if os.path.dirname(os.path.abspath(path)) == folder
+        }
+    
+    def enqueue(self, folder: str, order: str = 'ljf') -> int:
+        """
+        Cria tarefas para os PDFs de uma pasta que ainda não estão na fila.
+        
+        Arquivos já renomeados pelos processos da fila não viram tarefas novas.
+        
+        Args:
+            folder: Pasta com os certificados
+            order: Ordem de distribuição ('ljf' equilibra melhor vários processos)
+            
+        Returns:
+            Número de tarefas criadas
+            
+        Raises:
+            ValueError: Se a fila já pertence a outra pasta
+        """
+        folder = os.path.abspath(folder)
+        current = self.source_folder
+        if current and current != folder:
+            raise ValueError(f"A fila já pertence à pasta {current}")
+        if not current:
+            self._write_atomic(self.config_path, {'pasta': folder, 'criada_em': datetime.now().isoformat()})
+        
+        # Uma listagem por estado, em vez de um stat por arquivo
+        known = {
+            name.split('.', 1)[0].rsplit('-', 1)[-1]
+            for state in self.STATES
+            for name in os.listdir(self._dir(state))
+        }
+        
+        produced = self._produced_files(folder)
+        
+        new_files = []
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.lower().endswith('.pdf'):
+                    if self.item_id(entry.name) not in known and entry.name.lower() not in produced:
+                        new_files.append(entry.path)
+        
+        schedule = WorkScheduler(order).plan(new_files)
+        for rank, (path, estimate) in enumerate(schedule):
+            filename = os.path.basename(path)
+            task_id = self.item_id(filename)
+            self._write_atomic(
+                os.path.join(self._dir('pendentes'), f"{rank:07d}-{task_id}.json"),
+                {'id': task_id, 'arquivo': filename, **estimate}
+            )
+        
+        return len(schedule)
+    
+    def _hold(self, lease_path: str) -> Optional[Dict]:
+        """Registra a posse obtida e devolve a tarefa."""
+        os.utime(lease_path)
+        with open(lease_path, 'r', encoding='utf-8') as f:
+            task = json.load(f)
+        with self._lease_lock:
+            self._lease_path = lease_path
+        return task
+    
+    def _lease_name(self, key: str) -> str:
+        """Caminho da posse de uma tarefa (<ordem>-<id>) por este processo."""
+        return os.path.join(self._dir('em_andamento'), f"{key}.{self.worker_id}.json")
+    
+    def lease(self) -> Optional[Dict]:
+        """
+        Obtém a posse da próxima tarefa pendente ou de uma abandonada.
+        
+        Returns:
+            Tarefa ({'id', 'arquivo', 'paginas', 'custo', ...}) ou None se não houver
+        """
+        while True:
+            if not self._candidates:
+                self._candidates.extend(sorted(
+                    name for name in os.listdir(self._dir('pendentes')) if name.endswith('.json')
+                ))
+                if not self._candidates:
+                    break
+            
+            name = self._candidates.popleft()
+            lease_path = self._lease_name(name[:-len('.json')])
+            try:
+                os.rename(os.path.join(self._dir('pendentes'), name), lease_path)
+            except FileNotFoundError:
+                continue  # Outro processo pegou primeiro
+            return self._hold(lease_path)
+        
+        return self._steal()
+    
+    def _steal(self) -> Optional[Dict]:
+        """Toma a posse de uma tarefa cujo processo parou de enviar batimentos."""
+        now = time.time()
+        for name in sorted(os.listdir(self._dir('em_andamento'))):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self._dir('em_andamento'), name)
+            try:
+                idle = now - os.stat(path).st_mtime
+            except FileNotFoundError:
+                continue
+            if idle <= self.lease_seconds:
+                continue
+            
+            key, owner = name[:-len('.json')].split('.', 1)
+            lease_path = self._lease_name(key)
+            try:
+                os.rename(path, lease_path)
+            except FileNotFoundError:
+                continue  # Outro processo tomou primeiro
+            self.logger.warning(f"🪝 Tarefa {key} retomada de {owner} (sem batimento há {idle:.0f}s)")
+            return self._hold(lease_path)
+        
+        return None
+    
+    def has_active(self) -> bool:
+        """Indica se há tarefas com posse de algum processo."""
+        return any(name.endswith('.json') for name in os.listdir(self._dir('em_andamento')))
+    
+    def complete(self) -> bool:
+        """
+        Marca a tarefa atual como concluída.
+        
+        Returns:
+            False se a posse foi perdida (tarefa tomada por outro processo)
+        """
+        with self._lease_lock:
+            lease_path, self._lease_path = self._lease_path, None
+        if lease_path is None:
+            return False
+        
+        key = os.path.basename(lease_path).split('.', 1)[0]
+        try:
+            os.rename(lease_path, os.path.join(self._dir('concluidos'), f"{key}.json"))
+            return True
+        except FileNotFoundError:
+            self.logger.warning(f"⚠️  Posse da tarefa {key} perdida - outro processo a assumiu")
+            return False
+    
+    def release(self):
+        """Devolve a tarefa atual para a fila (interrupção)."""
+        with self._lease_lock:
+            lease_path, self._lease_path = self._lease_path, None
+        if lease_path:
+            key = os.path.basename(lease_path).split('.', 1)[0]
+            try:
+                os.rename(lease_path, os.path.join(self._dir('pendentes'), f"{key}.json"))
+            except FileNotFoundError:
+                pass
+    
+    def start_heartbeat(self, interval: float = 30.0):
+        """
+        Inicia a thread que renova a posse atual periodicamente.
+        
+        Args:
+            interval: Segundos entre batimentos (bem menor que `lease_seconds`)
+        """
+        def beat():
+            while not self._stop.wait(interval):
+                with self._lease_lock:
+                    lease_path = self._lease_path
+                if lease_path:
+                    try:
+                        os.utime(lease_path)
+                    except FileNotFoundError:
+                        self.logger.warning(f"⚠️  Posse perdida: {os.path.basename(lease_path)}")
+        
+        self._heartbeat_thread = threading.Thread(target=beat, name='fila-batimento', daemon=True)
+        self._heartbeat_thread.start()
+    
+    def counts(self) -> Dict[str, int]:
+        """Número de tarefas em cada estado."""
+        return {
+            state: sum(1 for name in os.listdir(self._dir(state)) if name.endswith('.json'))
+            for state in self.STATES
+        }
+    
+    def merge(self, writer: ResultWriter, archive: Optional['CertificateArchive'] = None) -> Tuple[int, int]:
+        """
+        Junta os resultados de todos os processos em um único fluxo.
+        
+        Um arquivo aparece uma única vez: se foi processado mais de uma vez
+        (posse tomada de um processo lento), vale o primeiro sucesso; falhas
+        só entram para arquivos sem nenhum sucesso.
+        
+        Args:
+            writer: Gravador do resultado consolidado
+            archive: Banco consolidado que também recebe os sucessos
+            
+        Returns:
+            Tupla (sucessos, falhas)
+        """
+        # Registros tipados: bem menores que os dicionários lidos (muitos ficam em memória)
+        successes: Dict[str, CertificateRecord] = {}
+        failures: Dict[str, Dict] = {}
+        
+        results_root = self._dir('resultados')
+        for worker in sorted(os.listdir(results_root)):
+            folder = os.path.join(results_root, worker)
+            if not os.path.isdir(folder):
+                continue
+            for run_id, fmt in ResultWriter.list_runs(folder):
+                reader = ResultWriter(folder, run_id=run_id, fmt=fmt)
+                for row in reader.iter_records('processados'):
+                    name = row.get('arquivo_original')
+                    if name not in successes:
+                        successes[name] = CertificateRecord.from_dict(row)
+                for row in reader.iter_records('falhas'):
+                    failures.setdefault(row.get('arquivo'), row)
+        
+        source = self.source_folder
+        for record in successes.values():
+            writer.write_success(record)
+            if archive:
+                archive.add(record.to_dict(), source)
+        
+        failed = [row for name, row in failures.items() if name not in successes]
+        for row in failed:
+            writer.write_failure(row)
+        
+        if archive:
+            archive.flush()
+        return len(successes), len(failed)
+    
+    def close(self):
+        """Encerra a thread de batimento."""
+        self._stop.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join(timeout=5)
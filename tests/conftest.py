@@ -0,0 +1,60 @@
+"""
+Configuração dos testes - Gerenciador de Certificados
+Descrição: Coloca `src/` no caminho de importação e substitui o EasyOCR por
+um leitor falso (os testes nunca baixam modelos nem usam a GPU).
+"""
+
+import os
+import sys
+import time
+import types
+
+import pytest
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+class FakeReader:
+    """Leitor EasyOCR falso: devolve o texto definido em `FakeReader.text`."""
+
+    text = ''
+
+    def __init__(self, languages, gpu=False, **kwargs):
+        self.languages = languages
+
+    def readtext(self, image, detail=0, paragraph=True, **kwargs):
+        return [self.text] if self.text else []
+
+
+sys.modules['easyocr'] = types.SimpleNamespace(Reader=FakeReader)
+
+
+class Interrupted(KeyboardInterrupt):
+    """Queda simulada no meio da execução."""
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    """
+    OCR falso: o "PDF" é o próprio texto.
+
+    `fail_on` simula uma queda no arquivo com esse trecho; `delay` (s) simula
+    o tempo do OCR.
+    """
+    import main
+
+    state = {'fail_on': None, 'calls': [], 'delay': 0.0}
+
+    def extract(self, pdf_path, dpi=300, triage=True, pdf_bytes=None, **kwargs):
+        text = pdf_bytes.decode('utf-8')
+        state['calls'].append(text)
+        time.sleep(state['delay'])
+        if state['fail_on'] and state['fail_on'] in text:
+            raise Interrupted()
+        return text
+
+    monkeypatch.setattr(main.ReaderPool, 'extract_from_pdf', extract)
+    return state
@@ -0,0 +1,70 @@
+"""Testes da retomada de arquivos compactados com ZIP de saída."""
+
+import zipfile
+
+import pytest
+
+from conftest import Interrupted
+from main import CertificateProcessor
+
+
+CERTIFICATES = {
+    'lote/a.pdf': "Certificamos que João Pedro Almeida concluiu o curso online Python para "
+                  "Data Science com carga horária estimada em 8h. São Paulo, 12 de março de 2024 Alura",
+    'lote/b.pdf': "Certificamos que Maria Souza Lima concluiu o curso online SQL Avançado com "
+                  "carga horária estimada em 12h. São Paulo, 3 de janeiro de 2024 Alura",
+    'lote/c.pdf': "Certificamos que Ana Clara Ribeiro concluiu o curso online Git e GitHub com "
+                  "carga horária estimada em 6h. São Paulo, 5 de maio de 2024 Alura",
+}
+
+
+def make_zip(path):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, text in CERTIFICATES.items():
+            archive.writestr(name, text.encode('utf-8'))
+
+
+def run(folder, resume=False):
+    processor = CertificateProcessor(str(folder), resume=resume, archive_path=None, prefetch=0)
+    try:
+        return processor.process_archive(str(folder / 'entrada.zip'), str(folder / 'saida.zip'))
+    finally:
+        processor.writer.close()
+
+
+def test_resume_keeps_previous_members_in_output_zip(tmp_path, fake_ocr):
+    make_zip(tmp_path / 'entrada.zip')
+
+    fake_ocr['fail_on'] = 'Ana Clara'
+    with pytest.raises(Interrupted):
+        run(tmp_path)
+    with zipfile.ZipFile(tmp_path / 'saida.zip') as archive:
+        first_names = sorted(archive.namelist())
+    assert len(first_names) == 2
+
+    fake_ocr['fail_on'] = None
+    fake_ocr['calls'].clear()
+    assert run(tmp_path, resume=True) == (1, 0)
+
+    # Só o membro restante volta ao OCR; os anteriores mantêm o nome
+    assert len(fake_ocr['calls']) == 1
+    with zipfile.ZipFile(tmp_path / 'saida.zip') as archive:
+        names = archive.namelist()
+        assert len(names) == 3
+        assert set(first_names) < set(names)
+        for name in first_names:
+            assert archive.read(name).decode('utf-8') in CERTIFICATES.values()
+    assert not (tmp_path / 'saida.zip.parcial').exists()
+
+
+def test_resume_without_output_zip_skips_members(tmp_path, fake_ocr):
+    make_zip(tmp_path / 'entrada.zip')
+    processor = CertificateProcessor(str(tmp_path), archive_path=None, prefetch=0)
+    assert processor.process_archive(str(tmp_path / 'entrada.zip')) == (3, 0)
+    processor.writer.close()
+
+    fake_ocr['calls'].clear()
+    processor = CertificateProcessor(str(tmp_path), resume=True, archive_path=None, prefetch=0)
+    assert processor.process_archive(str(tmp_path / 'entrada.zip')) == (0, 0)
+    processor.writer.close()
+    assert fake_ocr['calls'] == []
@@ -0,0 +1,35 @@
+"""Testes do modo monitor (encerramento)."""
+
+from daemon import CertificateDaemon
+
+
+class StubProcessor:
+    """Processador falso: pede o encerramento durante o primeiro arquivo."""
+
+    def __init__(self):
+        self.daemon = None
+        self.done = []
+        self.last_output = None
+
+    def process_single_pdf(self, path):
+        self.done.append(path)
+        self.daemon.stop_event.set()
+        return True
+
+    def flush_outputs(self):
+        pass
+
+
+def test_stop_finishes_only_current_file(tmp_path):
+    processor = StubProcessor()
+    daemon = CertificateDaemon(str(tmp_path), processor, force_polling=True)
+    processor.daemon = daemon
+    for i in range(3):
+        daemon.queue.put((str(tmp_path / f"{i}.pdf"), 0.0))
+
+    daemon._worker()
+
+    assert processor.done == [str(tmp_path / '0.pdf')]
+    assert daemon.processed == 1
+    assert daemon.queue.qsize() == 2
+    daemon.watcher.close()
@@ -0,0 +1,73 @@
+"""Testes do classificador de emissores e dos extratores."""
+
+import pytest
+
+from extractors import AluraExtractor, CertificateDataExtractor
+
+
+UDEMY = ("Número do certificado: UC-9f8e7d6c-1234 CERTIFICADO DE CONCLUSÃO SQL: Vá do ZERO ao "
+         "Avançado Instrutores Fulano de Tal Maria Souza Lima Data 3 de Janeiro de 2024 "
+         "Duração 20 horas no total")
+ALURA = ("Certificamos que João Pedro Almeida concluiu o curso online Python para Data Science "
+         "com carga horária estimada em 8h. São Paulo, 12 de março de 2024 Alura")
+COURSERA = ("Mar 5, 2024 Ana Clara Ribeiro has successfully completed Machine Learning "
+            "Specialization an online non-credit course authorized by Stanford University "
+            "and offered through Coursera Verify at coursera.org/verify/ABCD1234EFGH")
+
+
+@pytest.fixture(scope='module')
+def extractor():
+    return CertificateDataExtractor()
+
+
+@pytest.mark.parametrize('text, issuer, nome', [
+    (UDEMY, 'udemy', 'Maria Souza Lima'),
+    (ALURA, 'alura', 'João Pedro Almeida'),
+    (COURSERA, 'coursera', 'Ana Clara Ribeiro'),
+])
+def test_issuer_routing(extractor, text, issuer, nome):
+    data = extractor.extract_all(text)
+    assert data['emissor'] == issuer
+    assert data['nome'] == nome
+    assert data['status'] == 'completo'
+
+
+def test_name_that_looks_like_udemy_id_is_generic(extractor):
+    data = extractor.extract_all("Treinamento interno Luc-Antoine Girard Data 3 de Janeiro de 2024")
+    assert data['emissor'] == 'generico'
+
+
+def test_generic_keeps_original_name_heuristic(extractor):
+    # Heurística original: mais de 4 palavras antes de "Data" -> as 3 últimas
+    data = extractor.extract_all("Treinamento interno Empresa XYZ Joana Maria Pereira dos Santos "
+                                 "Data 3 de Janeiro de 2024 carga horária 20h")
+    assert data['nome'] == 'Pereira dos Santos'
+    assert data['duracao'] == 20
+    assert data['data'] == '2024-01-03'
+    assert data['complemento_generico'] == []
+
+
+def test_generic_ignores_plugin_patterns(extractor):
+    # "Certificamos que ..." é padrão de emissor; o caminho genérico não o usa
+    data = extractor.extract_all("Certificamos que Carlos Eduardo Nunes participou do Curso de "
+                                 "Gestão de Projetos Ágeis, com carga horária de 40h.")
+    assert data['emissor'] == 'generico'
+    assert data['nome'] is None
+    assert data['status'] == 'incompleto'
+
+
+def test_plugin_fallback_is_recorded(extractor):
+    # Alura sem "Certificamos que": o nome vem do extrator genérico
+    data = extractor.extract_all("Alura Formação Python para Dados com carga horária de 30h "
+                                 "Ana Maria Costa Data 2 de Junho de 2024")
+    assert data['emissor'] == 'alura'
+    assert data['nome'] == 'Ana Maria Costa'
+    assert data['complemento_generico'] == ['nome']
+
+
+def test_plugin_fallback_can_be_disabled(extractor, monkeypatch):
+    monkeypatch.setattr(AluraExtractor, 'generic_fallback', ())
+    data = extractor.extract_all("Alura Formação Python para Dados com carga horária de 30h "
+                                 "Ana Maria Costa Data 2 de Junho de 2024")
+    assert data['nome'] is None
+    assert data['complemento_generico'] == []
@@ -0,0 +1,112 @@
+"""Testes do OCR supervisionado sem iniciar processos (modelo não é carregado)."""
+
+import main
+from main import OCRExtractor, OCRWorkerPool, ReaderPool, build_arg_parser, resolve_torch_threads
+
+
+def test_warm_pool_starts_now_and_after_recycling(monkeypatch):
+    pool = OCRWorkerPool(max_files=0, max_rss_mb=100)
+    starts = []
+    monkeypatch.setattr(pool, '_start', lambda: starts.append(1) or setattr(pool, '_process', object()))
+    monkeypatch.setattr(pool, '_retire', lambda: setattr(pool, '_process', None))
+
+    pool.warm_up()
+    assert len(starts) == 1
+
+    # Sem reciclagem por contagem
+    pool._files_done = 10_000
+    pool._maybe_recycle(rss=10 * 1024 * 1024)
+    assert len(starts) == 1
+
+    # Limite de memória: reinicia já carregado
+    pool._maybe_recycle(rss=200 * 1024 * 1024)
+    assert len(starts) == 2
+    assert pool._process is not None
+
+
+def test_cold_pool_starts_on_demand(monkeypatch):
+    pool = OCRWorkerPool(max_files=1)
+    starts = []
+    monkeypatch.setattr(pool, '_start', lambda: starts.append(1))
+    monkeypatch.setattr(pool, '_retire', lambda: None)
+    pool._files_done = 1
+    pool._maybe_recycle(rss=None)
+    assert starts == []
+
+
+def test_monitor_does_not_recycle_by_count():
+    parser = build_arg_parser()
+    assert parser.parse_args(['monitorar', 'pasta']).reciclar_apos == 0
+    assert parser.parse_args(['processar', 'pasta']).reciclar_apos == 200
+
+
+PT_TEXT = 'Certificamos que Ana participou do curso das oito as doze, com carga horaria de 8h'
+ES_TEXT = 'Se certifica que Ana ha completado el curso con una duracion de 8 horas'
+
+
+def _pool_with_fake_pages(monkeypatch, page_text):
+    """Pool com detecção cujo "reconhecimento" devolve o texto da página e anota o leitor."""
+    renders, recognized = [], []
+    monkeypatch.setattr(ReaderPool, '_text_layer', staticmethod(lambda path, data: ''))
+    monkeypatch.setattr(OCRExtractor, 'render_pdf',
+                        lambda self, path, triage=True, data=None, *args: renders.append(path) or ['pagina'])
+    monkeypatch.setattr(OCRExtractor, 'recognize_pages',
+                        lambda self, images: recognized.append(tuple(self.reader.languages)) or page_text)
+    return ReaderPool(languages=['pt', 'es', 'en'], detect=True), renders, recognized
+
+
+def test_detection_reuses_first_recognition(monkeypatch):
+    pool, renders, recognized = _pool_with_fake_pages(monkeypatch, PT_TEXT)
+    assert pool.extract_from_pdf('a.pdf') == PT_TEXT
+    assert renders == ['a.pdf']
+    assert recognized == [('pt', 'en')]
+
+
+def test_other_language_recognizes_same_pages_again(monkeypatch):
+    pool, renders, recognized = _pool_with_fake_pages(monkeypatch, ES_TEXT)
+    pool.extract_from_pdf('a.pdf')
+    assert renders == ['a.pdf']
+    assert recognized == [('pt', 'en'), ('es', 'en')]
+
+    # O leitor mais recente passa a fazer a primeira leitura
+    pool.extract_from_pdf('b.pdf')
+    assert recognized[2:] == [('es', 'en')]
+
+
+def test_portuguese_words_do_not_point_to_other_languages():
+    pool = ReaderPool(languages=['pt', 'es', 'de'], detect=False)
+    text = 'Certificado emitido por Fulano das Neves, ha 10 anos, para o curso das 8h'
+    assert pool.detect_language(text) == 'pt'
+    for language, words in ReaderPool.STOPWORDS.items():
+        if language != 'pt':
+            assert not words & {'das', 'por', 'ha'}
+
+
+def test_single_language_skips_detection(monkeypatch):
+    monkeypatch.setattr(ReaderPool, '_text_layer', staticmethod(lambda path, data: 1 / 0))
+    pool = ReaderPool(languages=['pt'], detect=True)
+    assert not pool.detect
+    assert pool.default_set == ('pt',)
+
+
+def test_torch_threads_set_only_where_the_model_runs(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(main, 'configure_torch_threads', lambda *args, **kwargs: calls.append(kwargs) or 1)
+
+    processor = main.CertificateProcessor(str(tmp_path), archive_path=None, prefetch=0,
+                                          file_timeout=300, ocr_threads=3, ocr_workers=2)
+    assert calls == []
+    assert processor.ocr_pool.ocr_threads == 3
+    assert processor.ocr_pool.ocr_workers == 2
+
+    main.CertificateProcessor(str(tmp_path), archive_path=None, prefetch=0, ocr_threads=3)
+    assert calls == [{'workers': 1}]
+
+
+def test_thread_count_respects_environment(monkeypatch):
+    monkeypatch.setenv('OMP_NUM_THREADS', '5')
+    assert resolve_torch_threads() == 5
+    assert resolve_torch_threads(2) == 2
+    monkeypatch.delenv('OMP_NUM_THREADS')
+    monkeypatch.setattr(main.os, 'cpu_count', lambda: 8)
+    assert resolve_torch_threads(workers=4) == 2
@@ -0,0 +1,49 @@
+"""Testes das renomeações fora de lote (modo monitor e fila)."""
+
+import os
+
+import organizer
+from main import CertificateProcessor
+
+
+TEXT = ("Certificamos que Maria Souza Lima concluiu o curso online SQL Avançado com "
+        "carga horária estimada em 12h. São Paulo, 3 de janeiro de 2024 Alura")
+TARGET = 'Maria Souza Lima - SQL Avançado - 2024'
+
+
+def test_renames_do_not_rescan_folder(tmp_path, fake_ocr, monkeypatch):
+    processor = CertificateProcessor(str(tmp_path), archive_path=None, exclusive_renames=True)
+    scans = []
+    real_scandir = os.scandir
+
+    def counting_scandir(path):
+        scans.append(path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(organizer.os, 'scandir', counting_scandir)
+    for i in range(5):
+        path = tmp_path / f"novo_{i}.pdf"
+        path.write_text(TEXT, encoding='utf-8')
+        assert processor.process_single_pdf(str(path))
+    processor.writer.close()
+
+    assert len(scans) == 1
+    assert len(list(tmp_path.glob(f'{TARGET}*.pdf'))) == 5
+
+
+def test_name_taken_by_other_process_is_not_overwritten(tmp_path, fake_ocr):
+    processor = CertificateProcessor(str(tmp_path), archive_path=None, exclusive_renames=True)
+    first = tmp_path / 'a.pdf'
+    first.write_text(TEXT, encoding='utf-8')
+    assert processor.process_single_pdf(str(first))
+
+    # Outro processo cria o próximo nome depois da listagem
+    (tmp_path / f"{TARGET} (1).pdf").write_text('outro', encoding='utf-8')
+    second = tmp_path / 'b.pdf'
+    second.write_text(TEXT, encoding='utf-8')
+    assert processor.process_single_pdf(str(second))
+    processor.writer.close()
+
+    assert (tmp_path / f"{TARGET} (1).pdf").read_text(encoding='utf-8') == 'outro'
+    assert (tmp_path / f"{TARGET} (2).pdf").read_text(encoding='utf-8') == TEXT
+    assert not second.exists()
@@ -0,0 +1,101 @@
+"""
+Testes da fila com vários processos de verdade (multiprocessing) na mesma pasta.
+
+Os processos são criados por `fork` e herdam o OCR falso do processo de teste.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter
+
+import pytest
+
+import main
+from records import ResultWriter
+from work_queue import SharedWorkQueue
+
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='usa fork')
+
+WORKERS = 4
+NAMES = ['Ana Clara Ribeiro', 'Bruno Costa Lima', 'Carla Dias Souza', 'Diego Alves Rocha',
+         'Elisa Martins Prado', 'Fabio Nunes Teixeira', 'Gabriela Rocha Pinto', 'Heitor Gomes Vieira',
+         'Isabela Freitas Moura', 'Joao Pedro Almeida', 'Karina Lopes Barros', 'Lucas Mendes Cardoso']
+
+
+def certificate(name: str) -> str:
+    return (f"Certificamos que {name} concluiu o curso online Python para Data Science com "
+            f"carga horária estimada em 8h. São Paulo, 12 de março de 2024 Alura")
+
+
+def work(queue_dir: str, worker_id: str):
+    """Um processo `fila trabalhar` (sem supervisão: o OCR falso roda aqui mesmo)."""
+    main.main(['fila', 'trabalhar', queue_dir, '--id', worker_id, '--sem-supervisao',
+               '--posse', '30', '--batimento', '0.2'])
+
+
+def worker_rows(queue_dir: str, kind: str):
+    """Registros gravados por cada processo, sem mesclar."""
+    results_root = os.path.join(queue_dir, 'resultados')
+    for worker in sorted(os.listdir(results_root)):
+        folder = os.path.join(results_root, worker)
+        for run_id, fmt in ResultWriter.list_runs(folder):
+            for row in ResultWriter(folder, run_id=run_id, fmt=fmt).iter_records(kind):
+                yield worker, row
+
+
+def test_workers_share_queue(tmp_path, fake_ocr):
+    fake_ocr['delay'] = 0.02
+    source = tmp_path / 'certificados'
+    source.mkdir()
+    files = []
+    for i, name in enumerate(NAMES):
+        path = source / f"cert_{i:02d}.pdf"
+        path.write_text(certificate(name), encoding='utf-8')
+        files.append(path.name)
+
+    queue_dir = str(tmp_path / 'fila')
+    queue = SharedWorkQueue(queue_dir, worker_id='enfileirador')
+    assert queue.enqueue(str(source)) == len(files)
+
+    # Um processo que morreu segurando uma tarefa (sem batimento há muito tempo)
+    dead = SharedWorkQueue(queue_dir, worker_id='morto', lease_seconds=30)
+    abandoned = dead.lease()
+    old = time.time() - 3600
+    for name in os.listdir(os.path.join(queue_dir, 'em_andamento')):
+        os.utime(os.path.join(queue_dir, 'em_andamento', name), (old, old))
+
+    # Um arquivo removido da pasta depois de enfileirado
+    missing = 'cert_05.pdf' if abandoned['arquivo'] != 'cert_05.pdf' else 'cert_06.pdf'
+    os.remove(source / missing)
+
+    ctx = multiprocessing.get_context('fork')
+    processes = [ctx.Process(target=work, args=(queue_dir, f"w{i}")) for i in range(WORKERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    assert queue.counts() == {'pendentes': 0, 'em_andamento': 0, 'concluidos': len(files)}
+
+    # Cada arquivo foi tomado por exatamente um processo (inclusive o abandonado)
+    successes = list(worker_rows(queue_dir, 'processados'))
+    failures = list(worker_rows(queue_dir, 'falhas'))
+    claims = Counter(row['arquivo_original'] for _, row in successes)
+    claims.update(row['arquivo'] for _, row in failures)
+    assert claims == Counter(files)
+    assert abandoned['arquivo'] in {row['arquivo_original'] for _, row in successes}
+    assert 'morto' not in {worker for worker, _ in successes}
+
+    # O arquivo ausente vira falha registrada
+    assert [(row['arquivo'], row['motivo']) for _, row in failures] == [
+        (missing, 'Arquivo não está mais na pasta')
+    ]
+
+    # Todos os presentes foram renomeados, sem sobrescrever nenhum
+    renamed = sorted(os.listdir(source))
+    assert len(renamed) == len(files) - 1
+    assert not any(name.startswith('cert_') for name in renamed)
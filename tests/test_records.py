@@ -0,0 +1,65 @@
+"""Testes de CertificateRecord (conversão de datas e durações)."""
+
+from datetime import date
+
+import pytest
+
+from records import CertificateRecord, ResultWriter
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('27 de Maio de 2025', date(2025, 5, 27)),
+    ('27 de março de 2024', date(2024, 3, 27)),
+    ('May 27, 2025', date(2025, 5, 27)),
+    ('Sept. 3rd, 2023', date(2023, 9, 3)),
+    ('27 May 2025', date(2025, 5, 27)),
+    ('27/05/2025', date(2025, 5, 27)),
+    ('2025-05-27', date(2025, 5, 27)),
+    (date(2025, 5, 27), date(2025, 5, 27)),
+])
+def test_parse_date(text, expected):
+    assert CertificateRecord.parse_date(text) == expected
+
+
+@pytest.mark.parametrize('text', ['', None, '31/02/2025', 'Maio de 2025', '27 de Foo de 2025'])
+def test_parse_date_rejects(text):
+    assert CertificateRecord.parse_date(text) is None
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('141h', 141),
+    ('141', 141),
+    (' 8 horas', 8),
+    (40, 40),
+    (0, None),
+    (1000, None),
+    ('', None),
+    (None, None),
+    (True, None),
+])
+def test_parse_hours(value, expected):
+    assert CertificateRecord.parse_hours(value) == expected
+
+
+def test_from_dict_normalizes_legacy_row():
+    record = CertificateRecord.from_dict({
+        'nome': 'Maria Silva', 'curso': 'Python', 'duracao': '12h',
+        'data': '27 de Maio de 2025', 'emissor': 'Udemy', 'status': 'sucesso',
+        'arquivo_original': 'a.pdf',
+    })
+    assert record.duracao == 12
+    assert record.data == date(2025, 5, 27)
+    assert record.data_texto is None
+    assert record.id_certificado is None
+    assert record.to_dict()['data'] == '2025-05-27'
+
+
+def test_from_dict_keeps_unparsed_date_text():
+    record = CertificateRecord.from_dict({'data': 'em Maio de 2024'})
+    assert record.data is None
+    assert record.to_dict()['data'] == 'em Maio de 2024'
+    assert record.year == 2024
+
+
+def test_to_dict_matches_success_fields():
+    assert list(CertificateRecord().to_dict()) == list(ResultWriter.SUCCESS_FIELDS)
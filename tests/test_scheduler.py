@@ -0,0 +1,67 @@
+"""Testes da estimativa de custo e da contagem de páginas sem renderizar."""
+
+import pytest
+
+from scheduler import WorkScheduler
+
+
+def pdf(*objects: bytes) -> bytes:
+    body = b''.join(b'%d 0 obj\n%s\nendobj\n' % (n, obj) for n, obj in enumerate(objects, 1))
+    return b'%PDF-1.7\n' + body + b'%%EOF'
+
+
+def test_count_pages_ignores_outline_count():
+    data = pdf(
+        b'<< /Type /Catalog /Pages 2 0 R /Outlines 3 0 R >>',
+        b'<< /Type /Pages /Kids [4 0 R 5 0 R] /Count 2 >>',
+        b'<< /Type /Outlines /First 6 0 R /Last 7 0 R /Count 12 >>',
+        b'<< /Type /Page /Parent 2 0 R >>',
+        b'<< /Type /Page /Parent 2 0 R >>',
+    )
+    assert WorkScheduler.count_pages(data) == 2
+
+
+def test_count_pages_uses_root_of_page_tree():
+    data = pdf(
+        b'<< /Type /Pages /Kids [2 0 R 3 0 R] /Count 7 >>',
+        b'<< /Type /Pages /Parent 1 0 R /Kids [] /Count 4 >>',
+        b'<< /Type /Pages /Parent 1 0 R /Kids [] /Count 3 >>',
+    )
+    assert WorkScheduler.count_pages(data) == 7
+
+
+def test_count_pages_falls_back_to_page_objects():
+    data = pdf(b'<< /Type /Page >>', b'<< /Type /Page >>', b'<< /Type /Page >>')
+    assert WorkScheduler.count_pages(data) == 3
+
+
+def test_count_pages_compressed_tree():
+    assert WorkScheduler.count_pages(b'%PDF-1.7\n1 0 obj\n<< /Type /ObjStm /N 5 >>\nendobj\n') == 0
+
+
+@pytest.mark.parametrize('order, expected', [('sjf', ['a', 'b']), ('ljf', ['b', 'a'])])
+def test_plan_orders_by_cost(tmp_path, order, expected):
+    (tmp_path / 'a').write_bytes(pdf(b'<< /Type /Pages /Count 1 >>', b'<< /Font 1 >>'))
+    (tmp_path / 'b').write_bytes(pdf(b'<< /Type /Pages /Count 9 >>', b'<< /Font 1 >>'))
+    plan = WorkScheduler(order).plan([str(tmp_path / 'a'), str(tmp_path / 'b')])
+    assert [path.rsplit('/', 1)[-1] for path, _ in plan] == expected
+
+
+def test_plan_probes_pages_before_sorting(tmp_path):
+    # Grande com uma página de texto x pequeno digitalizado de 6 páginas
+    big = tmp_path / 'grande.pdf'
+    big.write_bytes(pdf(b'<< /Type /Pages /Count 1 >>', b'<< /Font 1 >>', b'x' * 900_000))
+    small = tmp_path / 'pequeno.pdf'
+    small.write_bytes(pdf(b'<< /Type /Pages /Count 6 >>'))
+    paths = [str(small), str(big)]
+    sizes = {str(small): small.stat().st_size, str(big): big.stat().st_size}
+
+    plan = WorkScheduler('sjf').plan(paths, sizes=sizes)
+    assert [path for path, _ in plan] == [str(big), str(small)]
+    assert [estimate['paginas'] for _, estimate in plan] == [1, 6]
+
+
+def test_original_order_does_not_open_files(tmp_path):
+    missing = str(tmp_path / 'nao_existe.pdf')
+    plan = WorkScheduler('original').plan([missing], sizes={missing: 2_000_000})
+    assert plan[0][1]['paginas'] == 3
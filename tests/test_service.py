@@ -0,0 +1,108 @@
+"""Testes do serviço HTTP de extração com um leitor falso."""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from service import ExtractionRequestHandler, ExtractionService
+
+
+TEXT = ("Certificamos que Maria Souza Lima concluiu o curso online SQL Avançado com "
+        "carga horária estimada em 12h. São Paulo, 3 de janeiro de 2024 Alura")
+
+
+class FakeExtractor:
+    """Leitor falso: o "PDF" é o próprio texto; `gate` segura o reconhecimento."""
+
+    def __init__(self):
+        self.rendered = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def render_pdf_bytes(self, pdf_bytes, triage=True):
+        self.rendered.append(pdf_bytes)
+        return [pdf_bytes]
+
+    def extract_from_images_batch(self, pages):
+        self.gate.wait()
+        return [page.decode('utf-8') for page in pages]
+
+
+@pytest.fixture
+def server(tmp_path):
+    extractor = FakeExtractor()
+    service = ExtractionService(lambda: extractor, max_batch=1, batch_window_ms=0,
+                                path_root=str(tmp_path))
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), ExtractionRequestHandler)
+    httpd.service = service
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, service, extractor
+    extractor.gate.set()
+    httpd.shutdown()
+    httpd.server_close()
+    service.shutdown()
+
+
+def post_json(httpd, body: bytes):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{httpd.server_address[1]}/extrair", data=body,
+        headers={'Content-Type': 'application/json'}, method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.mark.parametrize('body', [b'[]', b'"x"', b'{"caminho": 1}', b'{}', b'{nao json'])
+def test_invalid_json_body_is_400(server, body):
+    httpd, _, _ = server
+    status, payload = post_json(httpd, body)
+    assert status == 400
+    assert 'erro' in payload
+
+
+def test_directory_path_is_422(server, tmp_path):
+    httpd, _, _ = server
+    (tmp_path / 'pasta').mkdir()
+    status, _ = post_json(httpd, json.dumps({'caminho': str(tmp_path / 'pasta')}).encode())
+    assert status == 422
+
+
+def test_path_outside_root_is_403(server, tmp_path):
+    httpd, _, _ = server
+    status, _ = post_json(httpd, json.dumps({'caminho': '/etc/hostname'}).encode())
+    assert status == 403
+
+
+def test_path_request(server, tmp_path):
+    httpd, _, _ = server
+    (tmp_path / 'cert.pdf').write_text(TEXT, encoding='utf-8')
+    status, payload = post_json(httpd, json.dumps({'caminho': str(tmp_path / 'cert.pdf')}).encode())
+    assert status == 200
+    assert payload['nome'] == 'Maria Souza Lima'
+    assert payload['arquivo'] == 'cert.pdf'
+
+
+def test_timed_out_job_is_not_processed(server):
+    _, service, extractor = server
+    extractor.gate.clear()
+
+    # A primeira ocupa o trabalhador; a segunda espera na fila e desiste
+    first = threading.Thread(target=service.submit, args=(b'primeira ' + TEXT.encode(),))
+    first.start()
+    with pytest.raises(TimeoutError):
+        service.submit(b'segunda ' + TEXT.encode(), timeout=0.2)
+
+    extractor.gate.set()
+    first.join(timeout=10)
+    result = service.submit(TEXT.encode(), timeout=10)
+
+    assert result['nome'] == 'Maria Souza Lima'
+    assert [page.split(b' ', 1)[0] for page in extractor.rendered] == [b'primeira', b'Certificamos']
+    assert service.stats()['canceladas'] == 1
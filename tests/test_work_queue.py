@@ -0,0 +1,161 @@
+"""Testes da fila compartilhada (posse, batimento, retomada e mesclagem)."""
+
+import os
+import time
+
+import pytest
+
+from organizer import FileOrganizer
+from records import CertificateRecord, ResultWriter
+from work_queue import SharedWorkQueue
+
+
+def make_pdfs(folder, count, pages=1):
+    """Cria PDFs mínimos (só a árvore de páginas) numa pasta."""
+    os.makedirs(folder, exist_ok=True)
+    names = []
+    for i in range(count):
+        name = f"cert_{i:03d}.pdf"
+        with open(os.path.join(folder, name), 'wb') as f:
+            f.write(b'%PDF-1.4\n2 0 obj\n<< /Type /Pages /Count ' + str(pages + i).encode()
+                    + b' >>\nendobj\n%%EOF')
+        names.append(name)
+    return names
+
+
+def expire(queue):
+    """Envelhece todas as posses como se seus processos tivessem parado."""
+    old = time.time() - queue.lease_seconds - 60
+    folder = os.path.join(queue.queue_dir, 'em_andamento')
+    for name in os.listdir(folder):
+        os.utime(os.path.join(folder, name), (old, old))
+
+
+@pytest.fixture
+def queue_env(tmp_path):
+    source = tmp_path / 'pdfs'
+    names = make_pdfs(str(source), 5)
+    queue = SharedWorkQueue(str(tmp_path / 'fila'), worker_id='a', lease_seconds=60)
+    assert queue.enqueue(str(source)) == 5
+    return queue, str(source), names
+
+
+def test_enqueue_is_idempotent(queue_env):
+    queue, source, _ = queue_env
+    assert queue.enqueue(source) == 0
+    assert queue.counts() == {'pendentes': 5, 'em_andamento': 0, 'concluidos': 0}
+
+
+def test_enqueue_rejects_other_folder(queue_env, tmp_path):
+    queue, _, _ = queue_env
+    with pytest.raises(ValueError):
+        queue.enqueue(str(tmp_path))
+
+
+def test_renamed_outputs_are_not_enqueued_again(queue_env):
+    queue, source, _ = queue_env
+    writer = ResultWriter(queue.results_folder, run_id='20250101_000000')
+    organizer = FileOrganizer(source, run_id='20250101_000000',
+                              journal_folder=queue.results_folder, exclusive=True)
+
+    # Um arquivo com resultado gravado e outro só com a renomeação no diário
+    for nome, curso in (('Ana', 'Python'), ('Bia', 'SQL')):
+        task = queue.lease()
+        new_path = organizer.plan(os.path.join(source, task['arquivo']),
+                                  {'nome': nome, 'curso': curso, 'data': '2024-01-01'})
+        organizer.apply()
+        if nome == 'Ana':
+            writer.write_success(CertificateRecord(nome=nome, arquivo_original=task['arquivo'],
+                                                   arquivo_novo=os.path.basename(new_path)))
+        queue.complete()
+    writer.close()
+    organizer.close()
+
+    assert 'Ana - Python - 2024.pdf' in os.listdir(source)
+    assert 'Bia - SQL - 2024.pdf' in os.listdir(source)
+    assert queue.enqueue(source) == 0
+
+    # Um PDF realmente novo continua entrando
+    make_pdfs(source, 6)
+    assert queue.enqueue(source) == 1
+
+
+def test_ljf_order(queue_env):
+    queue, _, _ = queue_env
+    leased = []
+    while (task := queue.lease()) is not None:
+        leased.append(task)
+        queue.complete()
+    # Mais páginas primeiro
+    assert [task['paginas'] for task in leased] == [5, 4, 3, 2, 1]
+
+
+def test_each_task_leased_once(queue_env):
+    queue, _, names = queue_env
+    other = SharedWorkQueue(queue.queue_dir, worker_id='b', lease_seconds=60)
+    seen = []
+    for worker in [queue, other] * 5:
+        task = worker.lease()
+        if task:
+            seen.append(task['arquivo'])
+    assert sorted(seen) == names
+    assert queue.lease() is None and other.lease() is None
+    assert queue.has_active()
+
+
+def test_expired_lease_is_taken_over(queue_env):
+    queue, _, _ = queue_env
+    other = SharedWorkQueue(queue.queue_dir, worker_id='b', lease_seconds=60)
+    task = queue.lease()
+    while other.lease():
+        other.complete()
+
+    expire(queue)
+    stolen = other.lease()
+    assert stolen['arquivo'] == task['arquivo']
+    assert other.complete()
+    # O dono original perdeu a posse e não conclui a tarefa
+    assert not queue.complete()
+    assert queue.counts() == {'pendentes': 0, 'em_andamento': 0, 'concluidos': 5}
+
+
+def test_live_lease_is_not_taken(queue_env):
+    queue, _, _ = queue_env
+    other = SharedWorkQueue(queue.queue_dir, worker_id='b', lease_seconds=60)
+    queue.lease()
+    while other.lease():
+        other.complete()
+    assert other.lease() is None
+
+
+def test_release_returns_task(queue_env):
+    queue, _, _ = queue_env
+    task = queue.lease()
+    queue.release()
+    assert queue.counts()['pendentes'] == 5
+    other = SharedWorkQueue(queue.queue_dir, worker_id='b')
+    assert other.lease()['id'] == task['id']
+
+
+def test_merge_prefers_first_success(queue_env, tmp_path):
+    queue, _, _ = queue_env
+    other = SharedWorkQueue(queue.queue_dir, worker_id='b')
+
+    first = ResultWriter(queue.results_folder, run_id='20250101_000000')
+    first.write_success(CertificateRecord(nome='Ana', arquivo_original='cert_000.pdf', status='sucesso'))
+    first.write_failure({'arquivo': 'cert_001.pdf', 'motivo': 'Tempo limite', 'timestamp': 'x'})
+    first.close()
+    second = ResultWriter(other.results_folder, run_id='20250101_000001')
+    second.write_success(CertificateRecord(nome='Outra', arquivo_original='cert_000.pdf', status='sucesso'))
+    second.write_success(CertificateRecord(nome='Bia', arquivo_original='cert_001.pdf', status='sucesso'))
+    second.write_failure({'arquivo': 'cert_002.pdf', 'motivo': 'Sem texto', 'timestamp': 'x'})
+    second.close()
+
+    (tmp_path / 'saida').mkdir()
+    merged = ResultWriter(str(tmp_path / 'saida'), run_id='20250101_000002')
+    assert queue.merge(merged) == (2, 1)
+    merged.close()
+
+    names = {row['arquivo_original']: row['nome'] for row in merged.iter_records('processados')}
+    assert names == {'cert_000.pdf': 'Ana', 'cert_001.pdf': 'Bia'}
+    assert [row['arquivo'] for row in merged.iter_records('falhas')] == ['cert_002.pdf']